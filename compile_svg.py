@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Compile SVG files into PonSVG's binary .psvg form for fast startup.
+
+Compiled files carry the symbol table and the zstd-compressed source behind a
+versioned header. Loading one skips the SVG parse until something actually has to
+be rendered, and rasters already in the PonSVG disk cache are served without
+parsing at all. The output renders exactly like the source, because rendering
+still goes through the same parser.
+
+Compilation runs inside a headless Godot with the PonSVG extension loaded, so the
+symbol table is built by the same code the game uses.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# GDScript run by Godot; arguments after "--" are input/output path pairs
+COMPILE_SCRIPT = '''
+extends SceneTree
+
+func _init():
+    var args = OS.get_cmdline_user_args()
+    var failed = 0
+    for i in range(0, args.size() - 1, 2):
+        var resource = PonSVGResource.new()
+        if resource.load_from_file(args[i]) != OK:
+            printerr("Failed to load " + args[i])
+            failed += 1
+            continue
+        var data = resource.compile()
+        var file = FileAccess.open(args[i + 1], FileAccess.WRITE)
+        if data.is_empty() or file == null:
+            printerr("Failed to compile " + args[i])
+            failed += 1
+            continue
+        file.store_buffer(data)
+        file.close()
+    quit(1 if failed > 0 else 0)
+'''
+
+def find_sources(inputs):
+    """Expand files and directories into the list of SVG files to compile"""
+    sources = []
+    for path in inputs:
+        path = Path(path)
+        if path.is_dir():
+            sources.extend(sorted(path.rglob("*.svg")))
+        elif path.suffix.lower() == ".svg":
+            sources.append(path)
+        else:
+            print(f"⚠️ Skipping {path}: not an SVG file or directory")
+    return sources
+
+def output_path_for(source, inputs_root, output_dir):
+    """Place the .psvg next to the source, or mirror the input tree under output_dir"""
+    if output_dir is None:
+        return source.with_suffix(".psvg")
+    try:
+        relative = source.resolve().relative_to(inputs_root)
+    except ValueError:
+        relative = Path(source.name)
+    return Path(output_dir) / relative.with_suffix(".psvg")
+
+def is_up_to_date(source, target):
+    return target.exists() and target.stat().st_mtime >= source.stat().st_mtime
+
+def compile_files(godot, project, pairs):
+    """Run one headless Godot over every (source, target) pair"""
+    with tempfile.NamedTemporaryFile("w", suffix=".gd", delete=False) as script:
+        script.write(COMPILE_SCRIPT)
+        script_path = script.name
+
+    try:
+        command = [godot, "--headless", "--path", str(project), "--script", script_path, "--"]
+        for source, target in pairs:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            command.extend([str(source.resolve()), str(target.resolve())])
+        result = subprocess.run(command)
+        return result.returncode == 0
+    finally:
+        os.unlink(script_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile SVG files into PonSVG .psvg files")
+    parser.add_argument("inputs", nargs="+", help="SVG files or directories to compile")
+    parser.add_argument("-o", "--output", help="Output directory (default: next to each source)")
+    parser.add_argument("--godot", default=os.environ.get("GODOT", "godot"), help="Godot executable (default: $GODOT or godot)")
+    parser.add_argument("--project", default=".", help="Godot project that has the PonSVG extension installed")
+    parser.add_argument("--force", action="store_true", help="Recompile files that are up to date")
+    args = parser.parse_args()
+
+    sources = find_sources(args.inputs)
+    if not sources:
+        print("No SVG files to compile")
+        return 0
+
+    inputs_root = Path(os.path.commonpath([str(Path(p).resolve()) for p in args.inputs]))
+    if inputs_root.is_file():
+        inputs_root = inputs_root.parent
+
+    pairs = []
+    for source in sources:
+        target = output_path_for(source, inputs_root, args.output)
+        if args.force or not is_up_to_date(source, target):
+            pairs.append((source, target))
+
+    if not pairs:
+        print(f"✅ All {len(sources)} files up to date")
+        return 0
+
+    print(f"Compiling {len(pairs)} of {len(sources)} SVG files...")
+    if not compile_files(args.godot, args.project, pairs):
+        print("❌ Compilation failed")
+        return 1
+
+    print(f"✅ Compiled {len(pairs)} files")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,23 @@
 #include "lunasvg_integration.h"
 #include <godot_cpp/classes/file_access.hpp>
+#include <godot_cpp/classes/worker_thread_pool.hpp>
 #include <godot_cpp/variant/utility_functions.hpp>
 
+#include "svg_image_pool.h"
+#include "svg_render_stats.h"
+
+#include <cstdio>
+#include <cstring>
+
+// SIMD paths assume little-endian pixel words, which holds for every target that has them
+#if defined(__SSE2__) || defined(_M_X64) || (defined(_M_IX86_FP) && _M_IX86_FP >= 2)
+#include <emmintrin.h>
+#define PONSVG_SIMD_SSE2 1
+#elif (defined(__aarch64__) || defined(_M_ARM64)) && (!defined(__BYTE_ORDER__) || __BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__)
+#include <arm_neon.h>
+#define PONSVG_SIMD_NEON 1
+#endif
+
 using namespace godot;
 
 void LunaSVGIntegration::_bind_methods() {
@@ -9,8 +25,18 @@ void LunaSVGIntegration::_bind_methods() {
 }
 
 std::unique_ptr<lunasvg::Document> LunaSVGIntegration::load_svg_from_string(const String& svg_data) {
-    std::string std_string = svg_data.utf8().get_data();
-    return lunasvg::Document::loadFromData(std_string);
+    CharString utf8 = svg_data.utf8();
+    return load_svg_from_data(reinterpret_cast<const uint8_t*>(utf8.get_data()), utf8.length());
+}
+
+std::unique_ptr<lunasvg::Document> LunaSVGIntegration::load_svg_from_data(const uint8_t* data, int64_t size) {
+    // A UTF-8 byte order mark is not part of the markup
+    if (size >= 3 && data[0] == 0xEF && data[1] == 0xBB && data[2] == 0xBF) {
+        data += 3;
+        size -= 3;
+    }
+    PonSVGScopedTimer timer(PonSVGRenderStats::TIMING_PARSE);
+    return lunasvg::Document::loadFromData(reinterpret_cast<const char*>(data), size);
 }
 
 std::unique_ptr<lunasvg::Document> LunaSVGIntegration::load_svg_from_file(const String& file_path) {
@@ -20,34 +46,232 @@ std::unique_ptr<lunasvg::Document> LunaSVGIntegration::load_svg_from_file(const
         return nullptr;
     }
     
-    String content = file->get_as_text();
+    PackedByteArray content = file->get_buffer(file->get_length());
     file->close();
     
-    return load_svg_from_string(content);
+    return load_svg_from_data(content.ptr(), content.size());
+}
+
+Ref<Image> LunaSVGIntegration::rasterize_document(lunasvg::Document* document, const Vector2i& target_size, uint32_t background_color, bool premultiplied) {
+    Ref<Image> image = PonSVGImagePool::acquire(target_size.x, target_size.y, Image::FORMAT_RGBA8);
+    if (!render_document_into(document, image, background_color, premultiplied)) {
+        PonSVGImagePool::release(image);
+        return Ref<Image>();
+    }
+    return image;
+}
+
+Ref<Image> LunaSVGIntegration::rasterize_element(lunasvg::Element element, const Vector2i& target_size, uint32_t background_color, bool premultiplied) {
+    Ref<Image> image = PonSVGImagePool::acquire(target_size.x, target_size.y, Image::FORMAT_RGBA8);
+    if (!render_element_into(element, image, background_color, premultiplied)) {
+        PonSVGImagePool::release(image);
+        return Ref<Image>();
+    }
+    return image;
+}
+
+bool LunaSVGIntegration::_is_render_target(const Ref<Image>& image) {
+    ERR_FAIL_COND_V_MSG(image.is_null() || image->is_empty(), false, "Render target image is empty");
+    ERR_FAIL_COND_V_MSG(image->get_format() != Image::FORMAT_RGBA8 || image->has_mipmaps(), false, "Render target must be RGBA8 without mipmaps");
+    return true;
+}
+
+// Content of a document (or of one element when document is null) scaled onto a virtual
+// target, rendered as independent rectangles that may live in one buffer or in separate images
+struct TileRenderJob {
+    lunasvg::Document* document = nullptr;
+    lunasvg::Element element;
+    lunasvg::Matrix matrix;       // Content -> virtual target
+    uint32_t background_color = 0;
+    bool premultiplied = false;
+    Vector<Rect2i> rects;         // In virtual target coordinates
+    Vector<uint8_t*> pixels;      // Destination of each rect's top-left pixel
+    Vector<int> strides;
+};
+
+static bool _get_content_matrix(lunasvg::Document* document, const lunasvg::Element& element, const Vector2i& full_size, lunasvg::Matrix& r_matrix) {
+    if (document) {
+        if (document->width() <= 0 || document->height() <= 0) {
+            ERR_PRINT("Document has no size");
+            return false;
+        }
+        r_matrix = lunasvg::Matrix(full_size.x / document->width(), 0, 0, full_size.y / document->height(), 0, 0);
+        return true;
+    }
+
+    if (element.isNull()) {
+        ERR_PRINT("Element is null");
+        return false;
+    }
+
+    // Same mapping as Element::renderToBitmap: the element's bounds fill the target
+    lunasvg::Box bounds = element.getLocalBoundingBox();
+    if (bounds.w <= 0 || bounds.h <= 0) {
+        ERR_PRINT("Element has empty bounds");
+        return false;
+    }
+    float x_scale = full_size.x / bounds.w;
+    float y_scale = full_size.y / bounds.h;
+    r_matrix = lunasvg::Matrix(x_scale, 0, 0, y_scale, -bounds.x * x_scale, -bounds.y * y_scale);
+    return true;
+}
+
+static void _render_tile(void* p_userdata, uint32_t p_index) {
+    const TileRenderJob* job = static_cast<const TileRenderJob*>(p_userdata);
+    const Rect2i& rect = job->rects[p_index];
+    uint8_t* pixels = job->pixels[p_index];
+    int stride = job->strides[p_index];
+
+    {
+        PonSVGScopedTimer timer(PonSVGRenderStats::TIMING_RENDER);
+        // The bitmap covers just this rect; the stride steps over the rest of a shared buffer
+        lunasvg::Bitmap bitmap(pixels, rect.size.x, rect.size.y, stride);
+        bitmap.clear(job->background_color);
+        const lunasvg::Matrix& m = job->matrix;
+        lunasvg::Matrix tile_matrix(m.a, m.b, m.c, m.d, m.e - rect.position.x, m.f - rect.position.y);
+        if (job->document) {
+            job->document->render(bitmap, tile_matrix);
+        } else {
+            job->element.render(bitmap, tile_matrix);
+        }
+    }
+
+    PonSVGScopedTimer timer(PonSVGRenderStats::TIMING_CONVERT);
+    for (int y = 0; y < rect.size.y; y++) {
+        LunaSVGIntegration::convert_argb_premultiplied_to_rgba(reinterpret_cast<uint32_t*>(pixels + int64_t(y) * stride), rect.size.x, job->premultiplied);
+    }
+}
+
+static void _render_remaining_tile(void* p_userdata, uint32_t p_index) {
+    _render_tile(p_userdata, p_index + 1);
+}
+
+static void _run_tile_job(TileRenderJob& job) {
+    int count = job.rects.size();
+    if (count == 0) {
+        return;
+    }
+
+    // The first tile renders on the calling thread so any lazily built layout exists
+    // before worker threads read the (otherwise unmodified) document tree concurrently
+    _render_tile(&job, 0);
+    if (count == 1) {
+        return;
+    }
+
+    WorkerThreadPool* pool = WorkerThreadPool::get_singleton();
+    int64_t group_id = pool->add_native_group_task(&_render_remaining_tile, &job, count - 1, -1, true, "PonSVG tiled render");
+    pool->wait_for_group_task_completion(group_id);
+}
+
+// Large areas are split into tiles rendered in parallel into sub-rectangles of the one buffer
+static bool _render_into(lunasvg::Document* document, const lunasvg::Element& element, const Ref<Image>& image, const Rect2i& area, uint32_t background_color, bool premultiplied) {
+    int width = image->get_width();
+    int height = image->get_height();
+
+    TileRenderJob job;
+    job.document = document;
+    job.element = element;
+    job.background_color = background_color;
+    job.premultiplied = premultiplied;
+    if (!_get_content_matrix(document, element, Vector2i(width, height), job.matrix)) {
+        return false;
+    }
+
+    uint8_t* pixels = image->ptrw();
+    int stride = width * 4;
+    int64_t area_pixels = int64_t(area.size.x) * area.size.y;
+    int tile_size = area_pixels >= LunaSVGIntegration::TILED_RENDER_MIN_PIXELS ? LunaSVGIntegration::RENDER_TILE_SIZE : MAX(area.size.x, area.size.y);
+    for (int y = area.position.y; y < area.get_end().y; y += tile_size) {
+        for (int x = area.position.x; x < area.get_end().x; x += tile_size) {
+            job.rects.push_back(Rect2i(x, y, MIN(tile_size, area.get_end().x - x), MIN(tile_size, area.get_end().y - y)));
+            job.pixels.push_back(pixels + int64_t(y) * stride + int64_t(x) * 4);
+            job.strides.push_back(stride);
+        }
+    }
+
+    _run_tile_job(job);
+    return true;
 }
 
-Ref<Image> LunaSVGIntegration::rasterize_document(lunasvg::Document* document, const Vector2i& target_size, uint32_t background_color) {
+// LunaSVG renders straight into the image's pixel memory, which is then converted in place
+bool LunaSVGIntegration::render_document_into(lunasvg::Document* document, const Ref<Image>& image, uint32_t background_color, bool premultiplied) {
     if (!document) {
         ERR_PRINT("Document is null");
-        return Ref<Image>();
+        return false;
     }
-    
-    // Use LunaSVG to render to bitmap
-    lunasvg::Bitmap bitmap = document->renderToBitmap(target_size.x, target_size.y, background_color);
-    
-    return lunasvg_bitmap_to_godot_image(bitmap);
+
+    if (!_is_render_target(image)) {
+        return false;
+    }
+
+    return _render_into(document, lunasvg::Element(), image, Rect2i(Vector2i(), image->get_size()), background_color, premultiplied);
+}
+
+bool LunaSVGIntegration::render_document_region_into(lunasvg::Document* document, const Ref<Image>& image, const Rect2i& region, uint32_t background_color, bool premultiplied) {
+    if (!document) {
+        ERR_PRINT("Document is null");
+        return false;
+    }
+
+    if (!_is_render_target(image)) {
+        return false;
+    }
+
+    Rect2i area = region.intersection(Rect2i(Vector2i(), image->get_size()));
+    if (area.size.x <= 0 || area.size.y <= 0) {
+        return true;
+    }
+    return _render_into(document, lunasvg::Element(), image, area, background_color, premultiplied);
 }
 
-Ref<Image> LunaSVGIntegration::rasterize_element(lunasvg::Element element, const Vector2i& target_size, uint32_t background_color) {
+bool LunaSVGIntegration::render_element_into(lunasvg::Element element, const Ref<Image>& image, uint32_t background_color, bool premultiplied) {
     if (element.isNull()) {
         ERR_PRINT("Element is null");
-        return Ref<Image>();
+        return false;
     }
-    
-    // Use LunaSVG to render element to bitmap
-    lunasvg::Bitmap bitmap = element.renderToBitmap(target_size.x, target_size.y, background_color);
-    
-    return lunasvg_bitmap_to_godot_image(bitmap);
+
+    if (!_is_render_target(image)) {
+        return false;
+    }
+
+    return _render_into(nullptr, element, image, Rect2i(Vector2i(), image->get_size()), background_color, premultiplied);
+}
+
+Vector<Ref<Image>> LunaSVGIntegration::rasterize_regions(lunasvg::Document* document, lunasvg::Element element, const Vector2i& full_size, const Vector<Rect2i>& regions, uint32_t background_color, bool premultiplied) {
+    Vector<Ref<Image>> images;
+    images.resize(regions.size());
+
+    TileRenderJob job;
+    job.document = document;
+    job.element = element;
+    job.background_color = background_color;
+    job.premultiplied = premultiplied;
+    if (!_get_content_matrix(document, element, full_size, job.matrix)) {
+        return images;
+    }
+
+    // Every region gets its own image, so no buffer ever spans the whole virtual target
+    Rect2i bounds(Vector2i(), full_size);
+    for (int i = 0; i < regions.size(); i++) {
+        Rect2i rect = regions[i].intersection(bounds);
+        if (rect.size.x <= 0 || rect.size.y <= 0) {
+            continue;
+        }
+        Ref<Image> image = PonSVGImagePool::acquire(rect.size.x, rect.size.y, Image::FORMAT_RGBA8);
+        images.write[i] = image;
+        job.rects.push_back(rect);
+        job.pixels.push_back(image->ptrw());
+        job.strides.push_back(rect.size.x * 4);
+    }
+
+    _run_tile_job(job);
+    return images;
+}
+
+void LunaSVGIntegration::_convert_image_in_place(const Ref<Image>& image, bool premultiplied) {
+    PonSVGScopedTimer timer(PonSVGRenderStats::TIMING_CONVERT);
+    convert_argb_premultiplied_to_rgba(reinterpret_cast<uint32_t*>(image->ptrw()), int64_t(image->get_width()) * image->get_height(), premultiplied);
 }
 
 lunasvg::Element LunaSVGIntegration::find_element_by_id(lunasvg::Document* document, const String& id) {
@@ -93,7 +317,10 @@ void LunaSVGIntegration::set_element_attribute(lunasvg::Element& element, const
     
     std::string attr_name = attribute_name.utf8().get_data();
     std::string attr_value = value.utf8().get_data();
-    element.setAttribute(attr_name, attr_value);
+    // Setting an attribute re-parses it; an unchanged value needs no work
+    if (element.getAttribute(attr_name) != attr_value) {
+        element.setAttribute(attr_name, attr_value);
+    }
 }
 
 bool LunaSVGIntegration::has_element_attribute(const lunasvg::Element& element, const String& attribute_name) {
@@ -105,50 +332,120 @@ bool LunaSVGIntegration::has_element_attribute(const lunasvg::Element& element,
     return element.hasAttribute(attr_name);
 }
 
-void LunaSVGIntegration::apply_fill_color(lunasvg::Element& element, const Color& color) {
+bool LunaSVGIntegration::has_style_sheet(const uint8_t* data, int64_t size) {
+    // "<style" or a prefixed "<svg:style"; a false positive only costs the partial re-render
+    static const char tag[] = "style";
+    const int64_t tag_length = sizeof(tag) - 1;
+    for (int64_t i = 1; i + tag_length <= size; i++) {
+        if ((data[i - 1] == '<' || data[i - 1] == ':') && memcmp(data + i, tag, tag_length) == 0) {
+            return true;
+        }
+    }
+    return false;
+}
+
+// Plain numbers and px only; percentages and font-relative units depend on context we do not resolve
+static bool _parse_user_length(const String& value, float& r_length) {
+    String number = value.strip_edges();
+    if (number.ends_with("px")) {
+        number = number.substr(0, number.length() - 2).strip_edges();
+    }
+    if (!number.is_valid_float()) {
+        return false;
+    }
+    r_length = number.to_float();
+    return true;
+}
+
+bool LunaSVGIntegration::get_element_paint_bounds(const lunasvg::Element& element, const HashSet<String>& referenced_ids, Rect2& r_bounds) {
     if (element.isNull()) {
-        return;
+        return false;
     }
-    
-    // Convert Godot Color to CSS color string with alpha support
-    String color_str;
+
+    // An inline style can set any of these (or stroke-width) without the attributes showing it
+    static const char* unbounded_attributes[] = { "filter", "marker-start", "marker-mid", "marker-end", "style" };
+    float stroke_width = -1.0f;
+    float miter_limit = -1.0f;
+    for (lunasvg::Element current = element; !current.isNull(); current = current.parentElement()) {
+        // Content reached through use, gradients, patterns, clip paths or masks paints elsewhere too
+        String id = get_element_attribute(current, "id");
+        if (!id.is_empty() && referenced_ids.has(id)) {
+            return false;
+        }
+        for (const char* attribute : unbounded_attributes) {
+            if (has_element_attribute(current, attribute)) {
+                return false;
+            }
+        }
+        // Both are inherited, so the nearest value wins
+        if (stroke_width < 0.0f) {
+            String width = get_element_attribute(current, "stroke-width");
+            if (!width.is_empty() && !_parse_user_length(width, stroke_width)) {
+                return false;
+            }
+        }
+        if (miter_limit < 0.0f) {
+            String limit = get_element_attribute(current, "stroke-miterlimit");
+            if (!limit.is_empty() && !_parse_user_length(limit, miter_limit)) {
+                return false;
+            }
+        }
+    }
+    if (stroke_width < 0.0f) {
+        stroke_width = 1.0f;
+    }
+    if (miter_limit < 0.0f) {
+        miter_limit = 4.0f;
+    }
+
+    // The bounding box covers the geometry only. A miter join reaches at most miterlimit * width / 2
+    // from the path, and a square cap sqrt(2) * width / 2
+    lunasvg::Box box = element.getGlobalBoundingBox();
+    lunasvg::Matrix matrix = element.getGlobalMatrix();
+    float scale = MAX(Math::abs(matrix.a) + Math::abs(matrix.c), Math::abs(matrix.b) + Math::abs(matrix.d));
+    float reach = MAX(miter_limit, (float)Math_SQRT2) * MAX(stroke_width, 0.0f) * 0.5f;
+    r_bounds = Rect2(box.x, box.y, box.w, box.h).grow(reach * scale);
+    return true;
+}
+
+// Paint values are formatted straight into the std::string lunasvg reads, with no Godot String
+// or UTF-8 round-trip, and written only when they differ from the current attribute, so
+// re-applying an unchanged override skips lunasvg's CSS parsing entirely
+static void _set_paint_attribute(lunasvg::Element& element, const std::string& attribute, const Color& color) {
+    int r = CLAMP((int)(color.r * 255), 0, 255);
+    int g = CLAMP((int)(color.g * 255), 0, 255);
+    int b = CLAMP((int)(color.b * 255), 0, 255);
+
+    char value[32];
     if (color.a < 1.0f) {
-        color_str = String("rgba(") + 
-                   String::num_int64((int)(color.r * 255)) + "," +
-                   String::num_int64((int)(color.g * 255)) + "," +
-                   String::num_int64((int)(color.b * 255)) + "," +
-                   String::num(color.a) + ")";
+        // Fixed-point alpha: %f would follow the C locale's decimal separator
+        int alpha = CLAMP((int)Math::round(color.a * 1000.0f), 0, 1000);
+        snprintf(value, sizeof(value), "rgba(%d,%d,%d,%d.%03d)", r, g, b, alpha / 1000, alpha % 1000);
     } else {
-        color_str = String("rgb(") + 
-                   String::num_int64((int)(color.r * 255)) + "," +
-                   String::num_int64((int)(color.g * 255)) + "," +
-                   String::num_int64((int)(color.b * 255)) + ")";
+        snprintf(value, sizeof(value), "#%02x%02x%02x", r, g, b);
+    }
+
+    if (element.getAttribute(attribute) != value) {
+        element.setAttribute(attribute, value);
     }
-    
-    set_element_attribute(element, "fill", color_str);
 }
 
-void LunaSVGIntegration::apply_stroke_color(lunasvg::Element& element, const Color& color) {
+void LunaSVGIntegration::apply_fill_color(lunasvg::Element& element, const Color& color) {
     if (element.isNull()) {
         return;
     }
-    
-    // Convert Godot Color to CSS color string with alpha support
-    String color_str;
-    if (color.a < 1.0f) {
-        color_str = String("rgba(") + 
-                   String::num_int64((int)(color.r * 255)) + "," +
-                   String::num_int64((int)(color.g * 255)) + "," +
-                   String::num_int64((int)(color.b * 255)) + "," +
-                   String::num(color.a) + ")";
-    } else {
-        color_str = String("rgb(") + 
-                   String::num_int64((int)(color.r * 255)) + "," +
-                   String::num_int64((int)(color.g * 255)) + "," +
-                   String::num_int64((int)(color.b * 255)) + ")";
+
+    static const std::string fill("fill");
+    _set_paint_attribute(element, fill, color);
+}
+
+void LunaSVGIntegration::apply_stroke_color(lunasvg::Element& element, const Color& color) {
+    if (element.isNull()) {
+        return;
     }
-    
-    set_element_attribute(element, "stroke", color_str);
+
+    static const std::string stroke("stroke");
+    _set_paint_attribute(element, stroke, color);
 }
 
 void LunaSVGIntegration::apply_style_overrides(lunasvg::Element element, const Dictionary& style_overrides) {
@@ -232,7 +529,7 @@ lunasvg::Bitmap LunaSVGIntegration::to_lunasvg_bitmap(const lunasvg::Bitmap& bit
     return bitmap;
 }
 
-Ref<Image> LunaSVGIntegration::lunasvg_bitmap_to_godot_image(const lunasvg::Bitmap& bitmap) {
+Ref<Image> LunaSVGIntegration::lunasvg_bitmap_to_godot_image(const lunasvg::Bitmap& bitmap, bool premultiplied) {
     if (bitmap.isNull()) {
         ERR_PRINT("LunaSVG bitmap is null");
         return Ref<Image>();
@@ -240,46 +537,204 @@ Ref<Image> LunaSVGIntegration::lunasvg_bitmap_to_godot_image(const lunasvg::Bitm
     
     int width = bitmap.width();
     int height = bitmap.height();
-    uint8_t* data = bitmap.data();
+    const uint8_t* data = bitmap.data();
     
     if (!data) {
         ERR_PRINT("LunaSVG bitmap data is null");
         return Ref<Image>();
     }
     
-    // LunaSVG uses ARGB32 Premultiplied format
-    // We need to convert to Godot's expected RGBA8 format
-    PackedByteArray godot_data;
-    godot_data.resize(width * height * 4);
-    
-    for (int i = 0; i < width * height; i++) {
-        int src_offset = i * 4;
-        int dst_offset = i * 4;
-        
-        // LunaSVG format: ARGB (byte order depends on endianness)
-        // Godot format: RGBA
-        uint8_t a = data[src_offset + 3];
-        uint8_t r = data[src_offset + 2]; 
-        uint8_t g = data[src_offset + 1];
-        uint8_t b = data[src_offset + 0];
-        
-        // Convert from premultiplied alpha if needed
-        if (a > 0 && a < 255) {
-            r = (r * 255) / a;
-            g = (g * 255) / a;
-            b = (b * 255) / a;
+    // One bulk copy (row by row only if LunaSVG padded the rows), then convert in place
+    Ref<Image> image = PonSVGImagePool::acquire(width, height, Image::FORMAT_RGBA8);
+    uint8_t* dst = image->ptrw();
+    int row_size = width * 4;
+    if (bitmap.stride() == row_size) {
+        memcpy(dst, data, int64_t(row_size) * height);
+    } else {
+        for (int y = 0; y < height; y++) {
+            memcpy(dst + int64_t(y) * row_size, data + int64_t(y) * bitmap.stride(), row_size);
         }
-        
-        godot_data[dst_offset + 0] = r;
-        godot_data[dst_offset + 1] = g;
-        godot_data[dst_offset + 2] = b;
-        godot_data[dst_offset + 3] = a;
     }
     
-    Ref<Image> image = Image::create_from_data(width, height, false, Image::FORMAT_RGBA8, godot_data);
+    _convert_image_in_place(image, premultiplied);
     return image;
 }
 
+// Reciprocal table for un-premultiplying: c * 255 / a == (c * table[a] + 0x8000) >> 16
+struct UnpremultiplyTable {
+    uint32_t reciprocal[256];
+    
+    UnpremultiplyTable() {
+        reciprocal[0] = 0;
+        for (uint32_t a = 1; a < 256; a++) {
+            reciprocal[a] = ((255u << 16) + a / 2) / a;
+        }
+    }
+};
+
+static const UnpremultiplyTable unpremultiply_table;
+
+// Reorders a 0xAARRGGBB word so its bytes in memory read R, G, B, A regardless of endianness
+static inline uint32_t _swizzle_pixel(uint32_t argb) {
+    uint8_t bytes[4] = { uint8_t(argb >> 16), uint8_t(argb >> 8), uint8_t(argb), uint8_t(argb >> 24) };
+    uint32_t rgba;
+    memcpy(&rgba, bytes, 4);
+    return rgba;
+}
+
+static inline uint32_t _convert_pixel(uint32_t argb) {
+    uint32_t a = argb >> 24;
+    uint32_t r = (argb >> 16) & 0xFF;
+    uint32_t g = (argb >> 8) & 0xFF;
+    uint32_t b = argb & 0xFF;
+    
+    if (a == 0) {
+        r = g = b = 0;
+    } else if (a < 255) {
+        uint32_t reciprocal = unpremultiply_table.reciprocal[a];
+        r = MIN((r * reciprocal + 0x8000) >> 16, 255u);
+        g = MIN((g * reciprocal + 0x8000) >> 16, 255u);
+        b = MIN((b * reciprocal + 0x8000) >> 16, 255u);
+    }
+    
+    // Pack so the bytes in memory read R, G, B, A regardless of endianness
+    uint8_t bytes[4] = { uint8_t(r), uint8_t(g), uint8_t(b), uint8_t(a) };
+    uint32_t rgba;
+    memcpy(&rgba, bytes, 4);
+    return rgba;
+}
+
+// LunaSVG pixels are native-endian 0xAARRGGBB words with premultiplied color; Godot's
+// RGBA8 wants bytes R, G, B, A with straight color. Groups of four pixels that are fully
+// opaque (only a red/blue swap) or fully transparent (all zero) take the SIMD path.
+// With premultiplied set the color stays premultiplied and every group is a plain swap.
+void LunaSVGIntegration::convert_argb_premultiplied_to_rgba(uint32_t* pixels, int64_t count, bool premultiplied) {
+    int64_t i = 0;
+    
+#if defined(PONSVG_SIMD_SSE2)
+    const __m128i alpha_mask = _mm_set1_epi32(int(0xFF000000));
+    const __m128i green_alpha_mask = _mm_set1_epi32(int(0xFF00FF00));
+    const __m128i low_byte_mask = _mm_set1_epi32(0xFF);
+    const __m128i zero = _mm_setzero_si128();
+    for (; i + 4 <= count; i += 4) {
+        __m128i v = _mm_loadu_si128(reinterpret_cast<const __m128i*>(pixels + i));
+        __m128i alpha = _mm_and_si128(v, alpha_mask);
+        int opaque = _mm_movemask_epi8(_mm_cmpeq_epi32(alpha, alpha_mask));
+        if (premultiplied || opaque == 0xFFFF) {
+            __m128i swapped = _mm_or_si128(_mm_and_si128(v, green_alpha_mask),
+                    _mm_or_si128(_mm_and_si128(_mm_srli_epi32(v, 16), low_byte_mask),
+                            _mm_slli_epi32(_mm_and_si128(v, low_byte_mask), 16)));
+            _mm_storeu_si128(reinterpret_cast<__m128i*>(pixels + i), swapped);
+        } else if (_mm_movemask_epi8(_mm_cmpeq_epi32(alpha, zero)) == 0xFFFF) {
+            _mm_storeu_si128(reinterpret_cast<__m128i*>(pixels + i), zero);
+        } else {
+            for (int64_t j = i; j < i + 4; j++) {
+                pixels[j] = _convert_pixel(pixels[j]);
+            }
+        }
+    }
+#elif defined(PONSVG_SIMD_NEON)
+    const uint32x4_t green_alpha_mask = vdupq_n_u32(0xFF00FF00);
+    const uint32x4_t low_byte_mask = vdupq_n_u32(0xFF);
+    for (; i + 4 <= count; i += 4) {
+        uint32x4_t v = vld1q_u32(pixels + i);
+        uint32x4_t alpha = vshrq_n_u32(v, 24);
+        if (premultiplied || vminvq_u32(alpha) == 255) {
+            uint32x4_t swapped = vorrq_u32(vandq_u32(v, green_alpha_mask),
+                    vorrq_u32(vandq_u32(vshrq_n_u32(v, 16), low_byte_mask),
+                            vshlq_n_u32(vandq_u32(v, low_byte_mask), 16)));
+            vst1q_u32(pixels + i, swapped);
+        } else if (vmaxvq_u32(alpha) == 0) {
+            vst1q_u32(pixels + i, vdupq_n_u32(0));
+        } else {
+            for (int64_t j = i; j < i + 4; j++) {
+                pixels[j] = _convert_pixel(pixels[j]);
+            }
+        }
+    }
+#endif
+    
+    if (premultiplied) {
+        for (; i < count; i++) {
+            pixels[i] = _swizzle_pixel(pixels[i]);
+        }
+        return;
+    }
+    
+    for (; i < count; i++) {
+        pixels[i] = _convert_pixel(pixels[i]);
+    }
+}
+
+// Returns a new image of target_size; the source is never modified since it may be a shared cache entry.
+// Shrinking uses a box filter over raw pixels, which is much cheaper than a Lanczos resize.
+// Straight color is weighted by alpha to avoid dark fringes around transparent edges;
+// premultiplied color is already weighted and is averaged as is.
+Ref<Image> LunaSVGIntegration::resample_image(const Ref<Image>& image, const Vector2i& target_size, bool premultiplied) {
+    ERR_FAIL_COND_V(image.is_null(), Ref<Image>());
+    ERR_FAIL_COND_V(target_size.x <= 0 || target_size.y <= 0, Ref<Image>());
+
+    int src_width = image->get_width();
+    int src_height = image->get_height();
+
+    // Upscaling (e.g. a LOD bias below 1) or foreign formats go through Godot's resize
+    if (image->get_format() != Image::FORMAT_RGBA8 || image->has_mipmaps() || target_size.x > src_width || target_size.y > src_height) {
+        Ref<Image> resized = image->duplicate();
+        resized->resize(target_size.x, target_size.y, Image::INTERPOLATE_BILINEAR);
+        return resized;
+    }
+
+    const uint8_t *src = image->ptr();
+
+    Ref<Image> result = PonSVGImagePool::acquire(target_size.x, target_size.y, Image::FORMAT_RGBA8);
+    uint8_t *dst = result->ptrw();
+
+    // Source column span of every destination column
+    Vector<int> x_starts;
+    x_starts.resize(target_size.x + 1);
+    int *x_starts_ptr = x_starts.ptrw();
+    for (int x = 0; x <= target_size.x; x++) {
+        x_starts_ptr[x] = int((int64_t)x * src_width / target_size.x);
+    }
+
+    for (int y = 0; y < target_size.y; y++) {
+        int y0 = int((int64_t)y * src_height / target_size.y);
+        int y1 = MAX(y0 + 1, int((int64_t)(y + 1) * src_height / target_size.y));
+
+        for (int x = 0; x < target_size.x; x++) {
+            int x0 = x_starts_ptr[x];
+            int x1 = MAX(x0 + 1, x_starts_ptr[x + 1]);
+
+            uint64_t sum_r = 0, sum_g = 0, sum_b = 0, sum_a = 0;
+            for (int sy = y0; sy < y1; sy++) {
+                const uint8_t *row = src + ((int64_t)sy * src_width + x0) * 4;
+                for (int sx = x0; sx < x1; sx++, row += 4) {
+                    uint32_t a = row[3];
+                    uint32_t weight = premultiplied ? 1 : a;
+                    sum_r += row[0] * weight;
+                    sum_g += row[1] * weight;
+                    sum_b += row[2] * weight;
+                    sum_a += a;
+                }
+            }
+
+            uint8_t *out = dst + ((int64_t)y * target_size.x + x) * 4;
+            uint32_t count = uint32_t(x1 - x0) * uint32_t(y1 - y0);
+            if (sum_a == 0) {
+                out[0] = out[1] = out[2] = out[3] = 0;
+                continue;
+            }
+            uint64_t divisor = premultiplied ? count : sum_a;
+            out[0] = uint8_t((sum_r + divisor / 2) / divisor);
+            out[1] = uint8_t((sum_g + divisor / 2) / divisor);
+            out[2] = uint8_t((sum_b + divisor / 2) / divisor);
+            out[3] = uint8_t((sum_a + count / 2) / count);
+        }
+    }
+
+    return result;
+}
+
 LunaSVGIntegration::LunaSVGIntegration() {
     // Constructor
 }
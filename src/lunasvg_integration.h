@@ -7,6 +7,10 @@
 #include <godot_cpp/classes/resource.hpp>
 #include <godot_cpp/classes/texture2d.hpp>
 #include <godot_cpp/classes/image.hpp>
+#include <godot_cpp/templates/hash_set.hpp>
+#include <godot_cpp/templates/vector.hpp>
+#include <godot_cpp/variant/rect2.hpp>
+#include <godot_cpp/variant/rect2i.hpp>
 
 // Include LunaSVG headers
 #include "lunasvg.h"
@@ -16,17 +20,38 @@ using namespace godot;
 class LunaSVGIntegration : public RefCounted {
     GDCLASS(LunaSVGIntegration, RefCounted);
 
+private:
+    static bool _is_render_target(const Ref<Image>& image);
+    static void _convert_image_in_place(const Ref<Image>& image, bool premultiplied);
+
 protected:
     static void _bind_methods();
 
 public:
+    // Targets with at least this many pixels are rendered as tiles in parallel
+    static constexpr int64_t TILED_RENDER_MIN_PIXELS = 1024 * 1024;
+    static constexpr int RENDER_TILE_SIZE = 512;
+
     // Static utility functions for SVG operations
     static std::unique_ptr<lunasvg::Document> load_svg_from_string(const String& svg_data);
+    // Parses UTF-8 bytes as they are, without going through a String
+    static std::unique_ptr<lunasvg::Document> load_svg_from_data(const uint8_t* data, int64_t size);
+    // Whether the source has a <style> element, whose rules attributes alone do not reveal
+    static bool has_style_sheet(const uint8_t* data, int64_t size);
     static std::unique_ptr<lunasvg::Document> load_svg_from_file(const String& file_path);
     
     // Rasterization functions
-    static Ref<Image> rasterize_document(lunasvg::Document* document, const Vector2i& target_size, uint32_t background_color = 0x00000000);
-    static Ref<Image> rasterize_element(lunasvg::Element element, const Vector2i& target_size, uint32_t background_color = 0x00000000);
+    // With premultiplied set, the returned RGBA8 image keeps LunaSVG's premultiplied color
+    static Ref<Image> rasterize_document(lunasvg::Document* document, const Vector2i& target_size, uint32_t background_color = 0x00000000, bool premultiplied = false);
+    static Ref<Image> rasterize_element(lunasvg::Element element, const Vector2i& target_size, uint32_t background_color = 0x00000000, bool premultiplied = false);
+    // Render into an existing RGBA8 image of the desired size, overwriting every pixel
+    static bool render_document_into(lunasvg::Document* document, const Ref<Image>& image, uint32_t background_color = 0x00000000, bool premultiplied = false);
+    static bool render_element_into(lunasvg::Element element, const Ref<Image>& image, uint32_t background_color = 0x00000000, bool premultiplied = false);
+    // Re-render one rectangle of a full-image document render, leaving the other pixels untouched
+    static bool render_document_region_into(lunasvg::Document* document, const Ref<Image>& image, const Rect2i& region, uint32_t background_color = 0x00000000, bool premultiplied = false);
+    // Render parts of a virtual full_size render, each into its own image, in parallel.
+    // Renders the element when document is null. Regions outside full_size yield null images.
+    static Vector<Ref<Image>> rasterize_regions(lunasvg::Document* document, lunasvg::Element element, const Vector2i& full_size, const Vector<Rect2i>& regions, uint32_t background_color = 0x00000000, bool premultiplied = false);
     
     // Element manipulation and attribute access
     static lunasvg::Element find_element_by_id(lunasvg::Document* document, const String& id);
@@ -34,6 +59,9 @@ public:
     static String get_element_attribute(const lunasvg::Element& element, const String& attribute_name);
     static void set_element_attribute(lunasvg::Element& element, const String& attribute_name, const String& value);
     static bool has_element_attribute(const lunasvg::Element& element, const String& attribute_name);
+    // Area the element paints in document coordinates, stroke included. Returns false when a paint
+    // change can show outside it: filters, markers, or the element being rendered by reference.
+    static bool get_element_paint_bounds(const lunasvg::Element& element, const HashSet<String>& referenced_ids, Rect2& r_bounds);
     
     // Style manipulation
     static void apply_fill_color(lunasvg::Element& element, const Color& color);
@@ -44,7 +72,9 @@ public:
     
     // Conversion utilities
     static lunasvg::Bitmap to_lunasvg_bitmap(const lunasvg::Bitmap& bitmap);
-    static Ref<Image> lunasvg_bitmap_to_godot_image(const lunasvg::Bitmap& bitmap);
+    static Ref<Image> lunasvg_bitmap_to_godot_image(const lunasvg::Bitmap& bitmap, bool premultiplied = false);
+    static void convert_argb_premultiplied_to_rgba(uint32_t* pixels, int64_t count, bool premultiplied = false);
+    static Ref<Image> resample_image(const Ref<Image>& image, const Vector2i& target_size, bool premultiplied = false);
 
     LunaSVGIntegration();
     ~LunaSVGIntegration();
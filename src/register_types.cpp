@@ -4,27 +4,118 @@
 #include <godot_cpp/core/defs.hpp>
 #include <godot_cpp/core/class_db.hpp>
 #include <godot_cpp/godot.hpp>
+#include <godot_cpp/classes/editor_plugin_registration.hpp>
+#include <godot_cpp/classes/engine.hpp>
+#include <godot_cpp/classes/project_settings.hpp>
+#include <godot_cpp/classes/resource_loader.hpp>
+#include <godot_cpp/classes/resource_saver.hpp>
 
+#include "svg_atlas.h"
+#include "svg_cache_manager.h"
+#include "svg_image_pool.h"
+#include "svg_import_plugin.h"
+#include "svg_render_scheduler.h"
+#include "svg_render_stats.h"
 #include "svg_resource.h"
+#include "svg_resource_loader.h"
 #include "svg_texture.h"
 #include "svg_sprite.h"
 
 using namespace godot;
 
+static PonSVGCacheManager *cache_manager = nullptr;
+static PonSVGRenderScheduler *render_scheduler = nullptr;
+static Ref<PonSVGResourceFormatLoader> resource_loader;
+static Ref<PonSVGResourceFormatSaver> resource_saver;
+
+// Registers a project setting with its default value so it shows up in the editor
+static void _define_project_setting(const String &p_name, const Variant &p_default, PropertyHint p_hint = PROPERTY_HINT_NONE, const String &p_hint_string = String()) {
+    ProjectSettings *settings = ProjectSettings::get_singleton();
+    if (!settings->has_setting(p_name)) {
+        settings->set_setting(p_name, p_default);
+    }
+    settings->set_initial_value(p_name, p_default);
+
+    Dictionary info;
+    info["name"] = p_name;
+    info["type"] = p_default.get_type();
+    info["hint"] = p_hint;
+    info["hint_string"] = p_hint_string;
+    settings->add_property_info(info);
+}
+
 void initialize_ponsvg_module(ModuleInitializationLevel p_level) {
+    if (p_level == MODULE_INITIALIZATION_LEVEL_EDITOR) {
+        ClassDB::register_class<PonSVGImportPlugin>();
+        ClassDB::register_class<PonSVGEditorPlugin>();
+        EditorPlugins::add_by_type<PonSVGEditorPlugin>();
+        return;
+    }
     if (p_level != MODULE_INITIALIZATION_LEVEL_SCENE) {
         return;
     }
 
+    _define_project_setting(PonSVGCacheManager::SETTING_MEMORY_BUDGET_MB, PonSVGCacheManager::DEFAULT_MEMORY_BUDGET_MB, PROPERTY_HINT_RANGE, "0,4096,1,or_greater,suffix:MiB");
+    _define_project_setting(PonSVGDiskCache::SETTING_ENABLED, false);
+    _define_project_setting(PonSVGDiskCache::SETTING_PATH, PonSVGDiskCache::DEFAULT_PATH, PROPERTY_HINT_DIR);
+    _define_project_setting(PonSVGDiskCache::SETTING_MAX_SIZE_MB, PonSVGDiskCache::DEFAULT_MAX_SIZE_MB, PROPERTY_HINT_RANGE, "1,16384,1,or_greater,suffix:MiB");
+    _define_project_setting(PonSVGRenderScheduler::SETTING_FRAME_BUDGET_MSEC, PonSVGRenderScheduler::DEFAULT_FRAME_BUDGET_MSEC, PROPERTY_HINT_RANGE, "0,100,0.1,or_greater,suffix:ms");
+    _define_project_setting(PonSVGRenderScheduler::SETTING_HARD_REALTIME, false);
+
+    ClassDB::register_class<PonSVGCacheManager>();
+    ClassDB::register_class<PonSVGRenderScheduler>();
     ClassDB::register_class<PonSVGResource>();
     ClassDB::register_class<PonSVGTexture>();
+    ClassDB::register_class<PonSVGAtlas>();
     ClassDB::register_class<PonSVGSprite2D>();
+    ClassDB::register_class<PonSVGResourceFormatLoader>();
+    ClassDB::register_class<PonSVGResourceFormatSaver>();
+
+    cache_manager = memnew(PonSVGCacheManager);
+    Engine::get_singleton()->register_singleton("PonSVGCacheManager", cache_manager);
+    render_scheduler = memnew(PonSVGRenderScheduler);
+    Engine::get_singleton()->register_singleton("PonSVGRenderScheduler", render_scheduler);
+
+    PonSVGRenderStats::register_monitors();
+
+    // Behind the importer, so imported .svg files keep loading as their imported textures
+    resource_loader.instantiate();
+    ResourceLoader::get_singleton()->add_resource_format_loader(resource_loader);
+    resource_saver.instantiate();
+    ResourceSaver::get_singleton()->add_resource_format_saver(resource_saver);
 }
 
 void uninitialize_ponsvg_module(ModuleInitializationLevel p_level) {
+    if (p_level == MODULE_INITIALIZATION_LEVEL_EDITOR) {
+        EditorPlugins::remove_by_type<PonSVGEditorPlugin>();
+        return;
+    }
     if (p_level != MODULE_INITIALIZATION_LEVEL_SCENE) {
         return;
     }
+
+    PonSVGRenderStats::unregister_monitors();
+
+    ResourceLoader::get_singleton()->remove_resource_format_loader(resource_loader);
+    resource_loader.unref();
+    ResourceSaver::get_singleton()->remove_resource_format_saver(resource_saver);
+    resource_saver.unref();
+
+    if (render_scheduler) {
+        Engine::get_singleton()->unregister_singleton("PonSVGRenderScheduler");
+        memdelete(render_scheduler);
+        render_scheduler = nullptr;
+    }
+    // Dropped in-flight results may have gone back to the pool
+    PonSVGImagePool::clear();
+
+    if (cache_manager) {
+        Engine::get_singleton()->unregister_singleton("PonSVGCacheManager");
+        memdelete(cache_manager);
+        cache_manager = nullptr;
+    }
+    // Evicted rasters land in the pool; free them while the engine is still up
+    PonSVGImagePool::clear();
 }
 
 extern "C" {
@@ -0,0 +1,531 @@
+#include "svg_atlas.h"
+
+#include <godot_cpp/classes/engine.hpp>
+#include <godot_cpp/core/class_db.hpp>
+
+#include <algorithm>
+
+#include "svg_render_scheduler.h"
+#include "svg_render_stats.h"
+
+using namespace godot;
+
+PonSVGAtlas::PonSVGAtlas() {
+    page_size = DEFAULT_PAGE_SIZE;
+    padding = DEFAULT_PADDING;
+    premultiplied = false;
+    update_queued = false;
+}
+
+PonSVGAtlas::~PonSVGAtlas() {
+    if (PonSVGRenderScheduler::get_singleton()) {
+        PonSVGRenderScheduler::get_singleton()->cancel(this);
+    }
+    if (svg_resource.is_valid()) {
+        svg_resource->disconnect("changed", callable_mp(this, &PonSVGAtlas::_on_resource_changed));
+    }
+}
+
+void PonSVGAtlas::_bind_methods() {
+    ClassDB::bind_method(D_METHOD("set_ponsvg_resource", "resource"), &PonSVGAtlas::set_ponsvg_resource);
+    ClassDB::bind_method(D_METHOD("get_ponsvg_resource"), &PonSVGAtlas::get_ponsvg_resource);
+    ClassDB::bind_method(D_METHOD("set_page_size", "size"), &PonSVGAtlas::set_page_size);
+    ClassDB::bind_method(D_METHOD("get_page_size"), &PonSVGAtlas::get_page_size);
+    ClassDB::bind_method(D_METHOD("set_padding", "padding"), &PonSVGAtlas::set_padding);
+    ClassDB::bind_method(D_METHOD("get_padding"), &PonSVGAtlas::get_padding);
+    
+    ClassDB::bind_method(D_METHOD("add_symbol", "symbol_id", "size"), &PonSVGAtlas::add_symbol);
+    ClassDB::bind_method(D_METHOD("add_symbols", "symbol_ids", "size"), &PonSVGAtlas::add_symbols);
+    ClassDB::bind_method(D_METHOD("has_symbol", "symbol_id", "size"), &PonSVGAtlas::has_symbol);
+    ClassDB::bind_method(D_METHOD("request_symbol", "symbol_id", "size"), &PonSVGAtlas::request_symbol);
+    ClassDB::bind_static_method("PonSVGAtlas", D_METHOD("quantize_size", "size"), &PonSVGAtlas::quantize_size);
+    ClassDB::bind_method(D_METHOD("clear"), &PonSVGAtlas::clear);
+    
+    ClassDB::bind_method(D_METHOD("get_page_count"), &PonSVGAtlas::get_page_count);
+    ClassDB::bind_method(D_METHOD("get_page_texture", "page"), &PonSVGAtlas::get_page_texture);
+    ClassDB::bind_method(D_METHOD("get_region", "symbol_id", "size"), &PonSVGAtlas::get_region);
+    ClassDB::bind_method(D_METHOD("get_page", "symbol_id", "size"), &PonSVGAtlas::get_page);
+    ClassDB::bind_method(D_METHOD("get_atlas_texture", "symbol_id", "size"), &PonSVGAtlas::get_atlas_texture);
+    ClassDB::bind_method(D_METHOD("is_premultiplied"), &PonSVGAtlas::is_premultiplied);
+    
+    ADD_PROPERTY(PropertyInfo(Variant::OBJECT, "ponsvg_resource", PROPERTY_HINT_RESOURCE_TYPE, "PonSVGResource"), "set_ponsvg_resource", "get_ponsvg_resource");
+    ADD_PROPERTY(PropertyInfo(Variant::INT, "page_size", PROPERTY_HINT_RANGE, "64,8192,1,suffix:px"), "set_page_size", "get_page_size");
+    ADD_PROPERTY(PropertyInfo(Variant::INT, "padding", PROPERTY_HINT_RANGE, "0,16,1,suffix:px"), "set_padding", "get_padding");
+}
+
+String PonSVGAtlas::_make_key(const StringName &p_symbol_id, const Vector2i &p_size) {
+    return String(p_symbol_id) + String("_") + String::num_int64(p_size.x) + String("x") + String::num_int64(p_size.y);
+}
+
+// Places the entry on an open shelf of an existing page, or on a new page if allowed
+bool PonSVGAtlas::_allocate(Entry &r_entry, bool p_add_pages) {
+    Vector2i cell = r_entry.size + Vector2i(padding, padding) * 2;
+    if (cell.x > page_size || cell.y > page_size) {
+        ERR_PRINT(vformat("Atlas entry %s does not fit a %d px page", _make_key(r_entry.symbol_id, r_entry.size), page_size));
+        return false;
+    }
+    
+    for (int i = 0; i <= pages.size(); i++) {
+        if (i == pages.size()) {
+            if (!p_add_pages) {
+                return false;
+            }
+            Page page;
+            page.image = Image::create_empty(page_size, page_size, false, Image::FORMAT_RGBA8);
+            pages.push_back(page);
+        }
+        
+        Page &page = pages.write[i];
+        Vector2i position;
+        if (page.cursor_x + cell.x <= page_size && page.shelf_y + MAX(page.shelf_height, cell.y) <= page_size && (cell.y <= page.shelf_height || page.cursor_x == 0)) {
+            // Fits on the open shelf; an empty shelf takes the height of its first entry
+            position = Vector2i(page.cursor_x, page.shelf_y);
+            page.shelf_height = MAX(page.shelf_height, cell.y);
+            page.cursor_x += cell.x;
+        } else if (page.shelf_y + page.shelf_height + cell.y <= page_size) {
+            page.shelf_y += page.shelf_height;
+            page.shelf_height = cell.y;
+            position = Vector2i(0, page.shelf_y);
+            page.cursor_x = cell.x;
+        } else {
+            continue;
+        }
+        
+        r_entry.page = i;
+        r_entry.region = Rect2i(position + Vector2i(padding, padding), r_entry.size);
+        return true;
+    }
+    return false;
+}
+
+// Freed space is reclaimed by the next repack
+void PonSVGAtlas::_remove_entries(const HashSet<int> &p_indices) {
+    Vector<Entry> kept;
+    for (int i = 0; i < entries.size(); i++) {
+        if (!p_indices.has(i)) {
+            kept.push_back(entries[i]);
+        }
+    }
+    entries = kept;
+    entry_indices.clear();
+    for (int i = 0; i < entries.size(); i++) {
+        entry_indices.insert(_make_key(entries[i].symbol_id, entries[i].size), i);
+    }
+}
+
+void PonSVGAtlas::_add_requested() {
+    if (requested.is_empty()) {
+        return;
+    }
+    uint64_t frame = Engine::get_singleton()->get_process_frames();
+    for (int i = 0; i < requested.size(); i++) {
+        Entry entry = requested[i];
+        entry.last_used_frame = frame;
+        entry_indices.insert(_make_key(entry.symbol_id, entry.size), entries.size());
+        entries.push_back(entry);
+    }
+    requested.clear();
+    requested_keys.clear();
+    
+    // Sizes no sprite drew for a while go, and beyond the cap a symbol keeps its most recently drawn sizes
+    HashSet<int> evicted;
+    HashMap<StringName, Vector<int>> sizes_by_symbol;
+    for (int i = 0; i < entries.size(); i++) {
+        const Entry &entry = entries[i];
+        if (entry.pinned) {
+            continue;
+        }
+        if (frame - entry.last_used_frame > UNUSED_EVICTION_FRAMES) {
+            evicted.insert(i);
+        } else {
+            sizes_by_symbol[entry.symbol_id].push_back(i);
+        }
+    }
+    for (KeyValue<StringName, Vector<int>> &E : sizes_by_symbol) {
+        Vector<int> &sizes = E.value;
+        while (sizes.size() > MAX_REQUESTED_SIZES) {
+            int oldest = 0;
+            for (int j = 1; j < sizes.size(); j++) {
+                if (entries[sizes[j]].last_used_frame < entries[sizes[oldest]].last_used_frame) {
+                    oldest = j;
+                }
+            }
+            evicted.insert(sizes[oldest]);
+            sizes.remove_at(oldest);
+        }
+    }
+    if (!evicted.is_empty()) {
+        _remove_entries(evicted);
+    }
+    
+    // New entries go on the open shelves; when one does not fit, a repack also reclaims the evicted space
+    for (int i = 0; i < entries.size(); i++) {
+        Vector2i cell = entries[i].size + Vector2i(padding, padding) * 2;
+        if (entries[i].page >= 0 || cell.x > page_size || cell.y > page_size) {
+            continue;
+        }
+        if (!_allocate(entries.write[i], false)) {
+            _repack();
+            break;
+        }
+    }
+}
+
+// Tallest entries first keeps shelves tight; pages are reused and cleared
+void PonSVGAtlas::_repack() {
+    Vector<int> order;
+    for (int i = 0; i < entries.size(); i++) {
+        order.push_back(i);
+    }
+    struct TallestFirst {
+        const Vector<Entry> *entries;
+        bool operator()(int p_a, int p_b) const {
+            const Vector2i &a = (*entries)[p_a].size;
+            const Vector2i &b = (*entries)[p_b].size;
+            return a.y != b.y ? a.y > b.y : a.x > b.x;
+        }
+    };
+    std::sort(order.ptrw(), order.ptrw() + order.size(), TallestFirst{ &entries });
+    
+    for (int i = 0; i < pages.size(); i++) {
+        Page &page = pages.write[i];
+        page.image->fill(Color(0, 0, 0, 0));
+        page.shelf_y = 0;
+        page.shelf_height = 0;
+        page.cursor_x = 0;
+        page.dirty = true;
+    }
+    
+    // Entries that no longer fit (a smaller page, more padding) stay unplaced instead of keeping stale regions
+    for (int i = 0; i < entries.size(); i++) {
+        Entry &entry = entries.write[i];
+        entry.page = -1;
+        entry.region = Rect2i();
+        entry.rendered = false;
+    }
+    for (int i = 0; i < order.size(); i++) {
+        _allocate(entries.write[order[i]], true);
+    }
+    
+    // Pages the packing no longer reaches are dropped
+    int used_pages = 0;
+    for (int i = 0; i < entries.size(); i++) {
+        if (entries[i].page >= 0) {
+            used_pages = MAX(used_pages, entries[i].page + 1);
+        }
+    }
+    pages.resize(used_pages);
+}
+
+// All entries render in one batch on the worker pool, through the resource's raster cache
+void PonSVGAtlas::_render_entries(const Vector<int> &p_indices) {
+    if (svg_resource.is_null() || p_indices.is_empty()) {
+        return;
+    }
+    
+    // Unplaced entries have nowhere to go
+    Vector<int> indices;
+    for (int i = 0; i < p_indices.size(); i++) {
+        if (entries[p_indices[i]].page >= 0) {
+            indices.push_back(p_indices[i]);
+        }
+    }
+    if (indices.is_empty()) {
+        return;
+    }
+    
+    Array requests;
+    for (int i = 0; i < indices.size(); i++) {
+        Entry &entry = entries.write[indices[i]];
+        // Taken before rendering, so a change arriving meanwhile still marks the entry stale
+        entry.content_revision = svg_resource->get_content_revision(entry.symbol_id);
+        entry.rendered = true;
+        Array request;
+        request.push_back(entry.symbol_id);
+        request.push_back(entry.size);
+        requests.push_back(request);
+    }
+    Array results = svg_resource->rasterize_batch(requests);
+    
+    for (int i = 0; i < results.size() && i < indices.size(); i++) {
+        const Entry &entry = entries[indices[i]];
+        Ref<Image> image = Dictionary(results[i]).get("image", Ref<Image>());
+        if (image.is_null()) {
+            continue;
+        }
+        Page &page = pages.write[entry.page];
+        page.image->blit_rect(image, Rect2i(Vector2i(), entry.size), entry.region.position);
+        page.dirty = true;
+    }
+    _upload_pages();
+}
+
+void PonSVGAtlas::_upload_pages() {
+    PonSVGScopedTimer timer(PonSVGRenderStats::TIMING_UPLOAD);
+    for (int i = 0; i < pages.size(); i++) {
+        Page &page = pages.write[i];
+        if (!page.dirty) {
+            continue;
+        }
+        if (page.texture.is_null()) {
+            page.texture = ImageTexture::create_from_image(page.image);
+        } else {
+            page.texture->update(page.image);
+        }
+        page.dirty = false;
+        PonSVGRenderStats::record_upload_bytes(Image::get_image_data_size(page_size, page_size, Image::FORMAT_RGBA8, false));
+    }
+}
+
+// Renders the entries that are new, moved, or whose symbol changed since they were rendered
+void PonSVGAtlas::_render_stale() {
+    if (svg_resource.is_null()) {
+        return;
+    }
+    
+    premultiplied = svg_resource->is_premultiplied_output();
+    Vector<int> indices;
+    for (int i = 0; i < entries.size(); i++) {
+        const Entry &entry = entries[i];
+        if (!entry.rendered || entry.content_revision != svg_resource->get_content_revision(entry.symbol_id)) {
+            indices.push_back(i);
+        }
+    }
+    if (indices.is_empty()) {
+        return;
+    }
+    _render_entries(indices);
+    emit_changed();
+}
+
+void PonSVGAtlas::_queue_update() {
+    if (update_queued) {
+        return;
+    }
+    update_queued = true;
+    
+    PonSVGRenderScheduler *scheduler = PonSVGRenderScheduler::get_singleton();
+    int64_t render_pixels = 0;
+    for (int i = 0; i < entries.size(); i++) {
+        render_pixels += int64_t(entries[i].size.x) * entries[i].size.y;
+    }
+    if (!scheduler || !scheduler->schedule(this, callable_mp(this, &PonSVGAtlas::_process_update), 0, render_pixels, render_pixels)) {
+        callable_mp(this, &PonSVGAtlas::_process_update).call_deferred(false);
+    }
+}
+
+void PonSVGAtlas::_process_update(bool p_background) {
+    // Atlas batches already render on the worker pool, so there is no background variant
+    update_queued = false;
+    _add_requested();
+    _render_stale();
+}
+
+void PonSVGAtlas::_on_resource_changed() {
+    if (svg_resource.is_null()) {
+        emit_changed();
+        return;
+    }
+    
+    // Animated overrides emit every frame; they collapse into one re-render of the touched symbols
+    _queue_update();
+}
+
+void PonSVGAtlas::set_ponsvg_resource(const Ref<PonSVGResource> &p_resource) {
+    if (svg_resource == p_resource) {
+        return;
+    }
+    
+    if (svg_resource.is_valid()) {
+        svg_resource->disconnect("changed", callable_mp(this, &PonSVGAtlas::_on_resource_changed));
+    }
+    
+    svg_resource = p_resource;
+    
+    // Revisions of another resource say nothing about these pixels
+    for (int i = 0; i < entries.size(); i++) {
+        entries.write[i].rendered = false;
+    }
+    
+    if (svg_resource.is_valid()) {
+        svg_resource->connect("changed", callable_mp(this, &PonSVGAtlas::_on_resource_changed));
+        _render_stale();
+    }
+}
+
+Ref<PonSVGResource> PonSVGAtlas::get_ponsvg_resource() const {
+    return svg_resource;
+}
+
+void PonSVGAtlas::set_page_size(int p_size) {
+    p_size = CLAMP(p_size, 64, 8192);
+    if (page_size == p_size) {
+        return;
+    }
+    page_size = p_size;
+    pages.clear();
+    _repack();
+    _render_stale();
+}
+
+int PonSVGAtlas::get_page_size() const {
+    return page_size;
+}
+
+void PonSVGAtlas::set_padding(int p_padding) {
+    p_padding = CLAMP(p_padding, 0, 16);
+    if (padding == p_padding) {
+        return;
+    }
+    padding = p_padding;
+    _repack();
+    _render_stale();
+}
+
+int PonSVGAtlas::get_padding() const {
+    return padding;
+}
+
+bool PonSVGAtlas::add_symbol(const StringName &p_symbol_id, const Vector2i &p_size) {
+    ERR_FAIL_COND_V_MSG(svg_resource.is_null(), false, "Atlas has no PonSVGResource");
+    ERR_FAIL_COND_V_MSG(p_size.x <= 0 || p_size.y <= 0, false, "Invalid atlas entry size");
+    ERR_FAIL_COND_V_MSG(!p_symbol_id.is_empty() && !svg_resource->has_symbol(p_symbol_id), false, "Symbol not found: " + String(p_symbol_id));
+    
+    String key = _make_key(p_symbol_id, p_size);
+    if (entry_indices.has(key)) {
+        return true;
+    }
+    
+    ERR_FAIL_COND_V_MSG(p_size.x + padding * 2 > page_size || p_size.y + padding * 2 > page_size, false, "Atlas entry does not fit a page: " + key);
+    Entry entry;
+    entry.symbol_id = p_symbol_id;
+    entry.size = p_size;
+    entry_indices.insert(key, entries.size());
+    entries.push_back(entry);
+    
+    if (!_allocate(entries.write[entries.size() - 1], false)) {
+        // Growth: repacking everything may avoid a new page; regions move, so everything renders
+        _repack();
+    }
+    _render_stale();
+    return true;
+}
+
+bool PonSVGAtlas::add_symbols(const PackedStringArray &p_symbol_ids, const Vector2i &p_size) {
+    ERR_FAIL_COND_V_MSG(svg_resource.is_null(), false, "Atlas has no PonSVGResource");
+    ERR_FAIL_COND_V_MSG(p_size.x <= 0 || p_size.y <= 0, false, "Invalid atlas entry size");
+    
+    // One packing pass and one batch render for the whole set
+    bool added = true;
+    for (int i = 0; i < p_symbol_ids.size(); i++) {
+        StringName symbol_id = p_symbol_ids[i];
+        String key = _make_key(symbol_id, p_size);
+        if (entry_indices.has(key)) {
+            continue;
+        }
+        if (!symbol_id.is_empty() && !svg_resource->has_symbol(symbol_id)) {
+            ERR_PRINT("Symbol not found: " + String(symbol_id));
+            added = false;
+            continue;
+        }
+        Entry entry;
+        entry.symbol_id = symbol_id;
+        entry.size = p_size;
+        entry_indices.insert(key, entries.size());
+        entries.push_back(entry);
+    }
+    
+    _repack();
+    _render_stale();
+    return added;
+}
+
+bool PonSVGAtlas::has_symbol(const StringName &p_symbol_id, const Vector2i &p_size) const {
+    return entry_indices.has(_make_key(p_symbol_id, p_size));
+}
+
+void PonSVGAtlas::request_symbol(const StringName &p_symbol_id, const Vector2i &p_size) {
+    String key = _make_key(p_symbol_id, p_size);
+    if (svg_resource.is_null() || entry_indices.has(key) || requested_keys.has(key)) {
+        return;
+    }
+    if (p_size.x <= 0 || p_size.y <= 0 || p_size.x + padding * 2 > page_size || p_size.y + padding * 2 > page_size) {
+        return;
+    }
+    if (!p_symbol_id.is_empty() && !svg_resource->has_symbol(p_symbol_id)) {
+        return;
+    }
+    
+    Entry entry;
+    entry.symbol_id = p_symbol_id;
+    entry.size = p_size;
+    entry.pinned = false;
+    requested.push_back(entry);
+    requested_keys.insert(key);
+    _queue_update();
+}
+
+Vector2i PonSVGAtlas::quantize_size(const Vector2i &p_size) {
+    int step = 8;
+    while (step * 8 < MAX(p_size.x, p_size.y)) {
+        step *= 2;
+    }
+    return Vector2i((p_size.x + step - 1) / step * step, (p_size.y + step - 1) / step * step);
+}
+
+void PonSVGAtlas::clear() {
+    entries.clear();
+    entry_indices.clear();
+    requested.clear();
+    requested_keys.clear();
+    pages.clear();
+    emit_changed();
+}
+
+int PonSVGAtlas::get_page_count() const {
+    return pages.size();
+}
+
+Ref<Texture2D> PonSVGAtlas::get_page_texture(int p_page) const {
+    ERR_FAIL_INDEX_V(p_page, pages.size(), Ref<Texture2D>());
+    return pages[p_page].texture;
+}
+
+Rect2i PonSVGAtlas::get_region(const StringName &p_symbol_id, const Vector2i &p_size) const {
+    const int *index = entry_indices.getptr(_make_key(p_symbol_id, p_size));
+    return index ? entries[*index].region : Rect2i();
+}
+
+int PonSVGAtlas::get_page(const StringName &p_symbol_id, const Vector2i &p_size) const {
+    const int *index = entry_indices.getptr(_make_key(p_symbol_id, p_size));
+    return index ? entries[*index].page : -1;
+}
+
+Ref<AtlasTexture> PonSVGAtlas::get_atlas_texture(const StringName &p_symbol_id, const Vector2i &p_size) const {
+    const int *index = entry_indices.getptr(_make_key(p_symbol_id, p_size));
+    ERR_FAIL_COND_V_MSG(!index, Ref<AtlasTexture>(), "Atlas has no entry " + _make_key(p_symbol_id, p_size));
+    const Entry &entry = entries[*index];
+    ERR_FAIL_COND_V(entry.page < 0, Ref<AtlasTexture>());
+    
+    // Follows the page texture, but keeps the region it was created with: fetch a new one after repacking
+    Ref<AtlasTexture> texture;
+    texture.instantiate();
+    texture->set_atlas(pages[entry.page].texture);
+    texture->set_region(Rect2(entry.region));
+    return texture;
+}
+
+bool PonSVGAtlas::find_entry(const StringName &p_symbol_id, const Vector2i &p_size, RID &r_texture, Rect2 &r_region) {
+    const int *index = entry_indices.getptr(_make_key(p_symbol_id, p_size));
+    if (!index) {
+        return false;
+    }
+    Entry &entry = entries.write[*index];
+    if (entry.page < 0 || !entry.rendered || pages[entry.page].texture.is_null()) {
+        return false;
+    }
+    entry.last_used_frame = Engine::get_singleton()->get_process_frames();
+    r_texture = pages[entry.page].texture->get_rid();
+    r_region = Rect2(entry.region);
+    return true;
+}
@@ -0,0 +1,113 @@
+#ifndef PONSVG_ATLAS_H
+#define PONSVG_ATLAS_H
+
+#include <godot_cpp/classes/atlas_texture.hpp>
+#include <godot_cpp/classes/image_texture.hpp>
+#include <godot_cpp/classes/resource.hpp>
+#include <godot_cpp/templates/hash_map.hpp>
+#include <godot_cpp/templates/hash_set.hpp>
+#include <godot_cpp/templates/vector.hpp>
+
+using namespace godot;
+#include "svg_resource.h"
+
+// Symbol rasters of one PonSVGResource packed into a few shared page textures,
+// so sprites drawing from it batch into a few draw calls instead of one per sprite.
+// Entries are (symbol_id, size) pairs, "" being the full document. Pages are filled
+// shelf by shelf; an entry that no longer fits makes the atlas repack every entry
+// tallest first, adding pages only if that is still not enough. Changes to the
+// resource are coalesced: once per frame (or through the render scheduler) the
+// entries whose symbols the changes touched re-render in one batch.
+// Sprites only draw entries that exist; the quantized sizes they miss are
+// requested and added with the next deferred update, at most a few per symbol,
+// and dropped again once no sprite has drawn them for a while.
+class PonSVGAtlas : public Resource {
+    GDCLASS(PonSVGAtlas, Resource);
+
+public:
+    static constexpr int DEFAULT_PAGE_SIZE = 1024;
+    static constexpr int DEFAULT_PADDING = 2;  // Transparent border so filtering never samples a neighbour
+    static constexpr int MAX_REQUESTED_SIZES = 4;  // Per symbol; the least recently drawn size makes room
+    static constexpr uint64_t UNUSED_EVICTION_FRAMES = 600;
+
+private:
+    struct Entry {
+        StringName symbol_id;
+        Vector2i size;
+        int page = -1;
+        Rect2i region;  // Without padding
+        bool rendered = false;
+        uint64_t content_revision = 0;  // Resource content revision of the pixels on the page
+        bool pinned = true;             // Added explicitly; requested entries can be evicted
+        uint64_t last_used_frame = 0;
+    };
+
+    // Pages fill in shelves: entries left to right on the open shelf, a new shelf below when full
+    struct Page {
+        Ref<Image> image;
+        Ref<ImageTexture> texture;
+        int shelf_y = 0;
+        int shelf_height = 0;
+        int cursor_x = 0;
+        bool dirty = false;  // Image changed since the last upload
+    };
+
+    Ref<PonSVGResource> svg_resource;
+    Vector<Entry> entries;
+    HashMap<String, int> entry_indices;
+    Vector<Entry> requested;        // Misses reported by drawing, added with the next update
+    HashSet<String> requested_keys;
+    Vector<Page> pages;
+    int page_size;
+    int padding;
+    bool premultiplied;
+    bool update_queued;  // A re-render of stale entries is deferred or with the scheduler
+
+    static String _make_key(const StringName &p_symbol_id, const Vector2i &p_size);
+    bool _allocate(Entry &r_entry, bool p_add_pages);
+    void _remove_entries(const HashSet<int> &p_indices);
+    void _add_requested();
+    void _repack();
+    void _render_entries(const Vector<int> &p_indices);
+    void _render_stale();
+    void _upload_pages();
+    void _queue_update();
+    void _process_update(bool p_background);
+    void _on_resource_changed();
+
+protected:
+    static void _bind_methods();
+
+public:
+    PonSVGAtlas();
+    ~PonSVGAtlas();
+
+    void set_ponsvg_resource(const Ref<PonSVGResource> &p_resource);
+    Ref<PonSVGResource> get_ponsvg_resource() const;
+    void set_page_size(int p_size);
+    int get_page_size() const;
+    void set_padding(int p_padding);
+    int get_padding() const;
+
+    // Adds and renders the entry if it is new; false if it cannot be packed or rendered
+    bool add_symbol(const StringName &p_symbol_id, const Vector2i &p_size);
+    bool add_symbols(const PackedStringArray &p_symbol_ids, const Vector2i &p_size);
+    bool has_symbol(const StringName &p_symbol_id, const Vector2i &p_size) const;
+    void clear();
+    // Deferred add for drawing code: never renders or repacks during the call
+    void request_symbol(const StringName &p_symbol_id, const Vector2i &p_size);
+    // Sizes requested on demand are rounded up to steps of about an eighth, so continuous resizing reuses entries
+    static Vector2i quantize_size(const Vector2i &p_size);
+
+    int get_page_count() const;
+    Ref<Texture2D> get_page_texture(int p_page) const;
+    Rect2i get_region(const StringName &p_symbol_id, const Vector2i &p_size) const;
+    int get_page(const StringName &p_symbol_id, const Vector2i &p_size) const;
+    Ref<AtlasTexture> get_atlas_texture(const StringName &p_symbol_id, const Vector2i &p_size) const;
+    bool is_premultiplied() const { return premultiplied; }
+
+    // For drawing: the page texture and the entry's region in it; marks the entry as used
+    bool find_entry(const StringName &p_symbol_id, const Vector2i &p_size, RID &r_texture, Rect2 &r_region);
+};
+
+#endif // PONSVG_ATLAS_H
@@ -0,0 +1,122 @@
+#ifndef PONSVG_CACHE_MANAGER_H
+#define PONSVG_CACHE_MANAGER_H
+
+#include <godot_cpp/classes/object.hpp>
+#include <godot_cpp/classes/image.hpp>
+#include <godot_cpp/templates/hash_map.hpp>
+#include <godot_cpp/templates/hash_set.hpp>
+#include <godot_cpp/templates/vector.hpp>
+#include <godot_cpp/variant/dictionary.hpp>
+#include <godot_cpp/variant/vector2i.hpp>
+#include <memory>
+#include <mutex>
+
+#include "svg_disk_cache.h"
+
+using namespace godot;
+
+// Cache entry for rendered SVG content
+struct PonSVGCacheEntry {
+    Ref<Image> image;
+    Vector2i size;
+    String cache_key;
+    String content_id;    // "full_svg" or "symbol_<id>", used for dependency invalidation
+    uint64_t owner_id;
+    uint64_t timestamp;   // Last access time in usec, refreshed on every hit
+    uint64_t byte_size;
+    bool is_dirty;
+
+    // Intrusive LRU links, maintained by PonSVGCacheManager
+    PonSVGCacheEntry *lru_prev;
+    PonSVGCacheEntry *lru_next;
+
+    PonSVGCacheEntry() : owner_id(0), timestamp(0), byte_size(0), is_dirty(true), lru_prev(nullptr), lru_next(nullptr) {}
+};
+
+// Process-wide raster cache shared by every PonSVGResource.
+// Entries are grouped per owner (the content key of the rendering
+// resources, so identical resources share rasters) for cheap invalidation, and linked into a single LRU list so the
+// least recently used raster is evicted first once the byte budget is
+// exceeded, regardless of which resource produced it.
+// When enabled, an optional PonSVGDiskCache sits behind the in-memory cache.
+class PonSVGCacheManager : public Object {
+    GDCLASS(PonSVGCacheManager, Object);
+
+public:
+    static constexpr const char *SETTING_MEMORY_BUDGET_MB = "ponsvg/cache/memory_budget_mb";
+    static constexpr int DEFAULT_MEMORY_BUDGET_MB = 128;
+
+private:
+    struct OwnerEntries {
+        HashMap<String, PonSVGCacheEntry *> entries;
+        uint64_t memory_usage = 0;
+    };
+
+    static PonSVGCacheManager *singleton;
+
+    mutable std::mutex mutex;
+    HashMap<uint64_t, OwnerEntries> owners;
+    // Entries holding each raster; a raster shared by several owners is budgeted once
+    HashMap<const Image *, uint32_t> image_refs;
+    PonSVGCacheEntry *lru_head; // Most recently used
+    PonSVGCacheEntry *lru_tail; // Least recently used
+    uint64_t memory_budget;
+    uint64_t memory_usage;
+    uint32_t entry_count;
+    uint64_t eviction_count;
+    std::shared_ptr<PonSVGDiskCache> disk_cache;
+
+    // Worker tasks writing rasters to the disk cache, reaped once completed
+    std::mutex disk_write_mutex;
+    Vector<int64_t> disk_write_tasks;
+
+    std::shared_ptr<PonSVGDiskCache> _get_disk_cache() const;
+    static void _disk_write_task(void *p_userdata);
+    void _reap_disk_writes(bool p_wait_all);
+    void _lru_unlink(PonSVGCacheEntry *p_entry);
+    void _lru_push_front(PonSVGCacheEntry *p_entry);
+    void _attach_entry(PonSVGCacheEntry *p_entry);
+    void _detach_entry(PonSVGCacheEntry *p_entry);
+    void _insert_entry(PonSVGCacheEntry *p_entry);
+    void _remove_entry(PonSVGCacheEntry *p_entry);
+    void _free_entry(PonSVGCacheEntry *p_entry);
+    void _evict_to_budget(uint64_t p_budget);
+
+protected:
+    static void _bind_methods();
+
+public:
+    static PonSVGCacheManager *get_singleton();
+
+    PonSVGCacheManager();
+    ~PonSVGCacheManager();
+
+    // Internal API used by PonSVGResource
+    Ref<Image> get_image(uint64_t p_owner_id, const String &p_cache_key, const Vector2i &p_size);
+    // Removes the raster from the cache and hands it to the caller
+    Ref<Image> take_image(uint64_t p_owner_id, const String &p_cache_key, const Vector2i &p_size);
+    void store_image(uint64_t p_owner_id, const String &p_cache_key, const String &p_content_id, const Vector2i &p_size, const Ref<Image> &p_image);
+    void invalidate_contents(uint64_t p_owner_id, const HashSet<String> &p_content_ids);
+    void migrate_owner(uint64_t p_from_owner_id, uint64_t p_to_owner_id, const HashSet<String> &p_excluded_contents, bool p_move, const HashSet<String> &p_retained_contents = HashSet<String>());
+    void clear_owner(uint64_t p_owner_id);
+    int get_owner_entry_count(uint64_t p_owner_id) const;
+    int64_t get_owner_memory_usage(uint64_t p_owner_id) const;
+    Ref<Image> load_disk_image(uint64_t p_owner_id, const String &p_cache_key);
+    // Queues the write on a worker thread; p_image must not be modified afterwards
+    void store_disk_image(uint64_t p_owner_id, const String &p_cache_key, const Ref<Image> &p_image);
+
+    // Budget and statistics
+    void set_memory_budget(int64_t p_bytes);
+    int64_t get_memory_budget() const;
+    int64_t get_memory_usage() const;
+    int get_entry_count() const;
+    Dictionary get_stats() const;
+    void clear();
+
+    // Persistent cache
+    void set_disk_cache_enabled(bool p_enabled);
+    bool is_disk_cache_enabled() const;
+    void clear_disk_cache();
+};
+
+#endif // PONSVG_CACHE_MANAGER_H
@@ -0,0 +1,265 @@
+#include "svg_disk_cache.h"
+
+#include <godot_cpp/classes/dir_access.hpp>
+#include <godot_cpp/classes/file_access.hpp>
+#include <godot_cpp/templates/vector.hpp>
+
+#include "lunasvg.h"
+#include "svg_document_store.h"
+
+using namespace godot;
+
+static const char *ENTRY_EXTENSION = ".psvgc";
+static const char *VERSION_STAMP_FILE = "cache_version";
+
+PonSVGDiskCache::PonSVGDiskCache(const String &p_cache_dir, uint64_t p_max_size) {
+    cache_dir = p_cache_dir;
+    max_size = p_max_size;
+    total_size = 0;
+    directory_ready = false;
+    size_scanned = false;
+    hits = 0;
+    misses = 0;
+    writes = 0;
+}
+
+String PonSVGDiskCache::_get_version_stamp() const {
+    return String("ponsvg-") + String::num_int64(FORMAT_VERSION) + String("-lunasvg-") + String(LUNASVG_VERSION_STRING);
+}
+
+String PonSVGDiskCache::_get_entry_path(uint64_t p_content_key, const String &p_cache_key) const {
+    uint64_t file_hash = PonSVGDocumentStore::hash_combine(p_content_key, p_cache_key.hash());
+    return cache_dir.path_join(String::num_uint64(file_hash, 16) + ENTRY_EXTENSION);
+}
+
+// Creates the cache directory and wipes it if it was written by another format or LunaSVG version
+bool PonSVGDiskCache::_ensure_directory() {
+    if (directory_ready) {
+        return true;
+    }
+
+    if (DirAccess::make_dir_recursive_absolute(cache_dir) != OK) {
+        ERR_PRINT("PonSVG disk cache: cannot create directory " + cache_dir);
+        return false;
+    }
+
+    String stamp_path = cache_dir.path_join(VERSION_STAMP_FILE);
+    String stamp = _get_version_stamp();
+    if (!FileAccess::file_exists(stamp_path) || FileAccess::get_file_as_string(stamp_path) != stamp) {
+        _remove_all_entries();
+        Ref<FileAccess> stamp_file = FileAccess::open(stamp_path, FileAccess::WRITE);
+        if (stamp_file.is_null()) {
+            ERR_PRINT("PonSVG disk cache: cannot write version stamp in " + cache_dir);
+            return false;
+        }
+        stamp_file->store_string(stamp);
+        stamp_file->close();
+        total_size = 0;
+        size_scanned = true;
+    }
+
+    directory_ready = true;
+    return true;
+}
+
+void PonSVGDiskCache::_remove_all_entries() {
+    PackedStringArray files = DirAccess::get_files_at(cache_dir);
+    for (int i = 0; i < files.size(); i++) {
+        if (files[i].ends_with(ENTRY_EXTENSION)) {
+            DirAccess::remove_absolute(cache_dir.path_join(files[i]));
+        }
+    }
+    total_size = 0;
+}
+
+// On-disk (compressed) length, 0 when the file does not exist
+static uint64_t _get_file_size(const String &p_path) {
+    if (!FileAccess::file_exists(p_path)) {
+        return 0;
+    }
+    Ref<FileAccess> file = FileAccess::open(p_path, FileAccess::READ);
+    return file.is_valid() ? file->get_length() : 0;
+}
+
+// Sums the on-disk size lazily, on the first write; warm starts that only read never pay for it
+void PonSVGDiskCache::_scan_size() {
+    if (size_scanned) {
+        return;
+    }
+
+    total_size = 0;
+    PackedStringArray files = DirAccess::get_files_at(cache_dir);
+    for (int i = 0; i < files.size(); i++) {
+        if (!files[i].ends_with(ENTRY_EXTENSION)) {
+            continue;
+        }
+        Ref<FileAccess> file = FileAccess::open(cache_dir.path_join(files[i]), FileAccess::READ);
+        if (file.is_valid()) {
+            total_size += file->get_length();
+        }
+    }
+    size_scanned = true;
+}
+
+// Deletes the oldest entries until the cache is back under 90% of its cap
+void PonSVGDiskCache::_enforce_size_cap() {
+    if (total_size <= max_size) {
+        return;
+    }
+
+    struct DiskEntry {
+        String path;
+        uint64_t modified_time;
+        uint64_t size;
+    };
+    struct OlderFirst {
+        bool operator()(const DiskEntry &p_a, const DiskEntry &p_b) const {
+            return p_a.modified_time < p_b.modified_time;
+        }
+    };
+
+    Vector<DiskEntry> entries;
+    PackedStringArray files = DirAccess::get_files_at(cache_dir);
+    for (int i = 0; i < files.size(); i++) {
+        if (!files[i].ends_with(ENTRY_EXTENSION)) {
+            continue;
+        }
+        DiskEntry entry;
+        entry.path = cache_dir.path_join(files[i]);
+        entry.modified_time = FileAccess::get_modified_time(entry.path);
+        Ref<FileAccess> file = FileAccess::open(entry.path, FileAccess::READ);
+        entry.size = file.is_valid() ? file->get_length() : 0;
+        entries.push_back(entry);
+    }
+    entries.sort_custom<OlderFirst>();
+
+    uint64_t target_size = max_size - max_size / 10;
+    for (int i = 0; i < entries.size() && total_size > target_size; i++) {
+        if (DirAccess::remove_absolute(entries[i].path) == OK) {
+            total_size -= MIN(total_size, entries[i].size);
+        }
+    }
+}
+
+Ref<Image> PonSVGDiskCache::load_image(uint64_t p_content_key, const String &p_cache_key) {
+    std::lock_guard<std::mutex> lock(mutex);
+
+    if (!_ensure_directory()) {
+        return Ref<Image>();
+    }
+
+    String path = _get_entry_path(p_content_key, p_cache_key);
+    if (!FileAccess::file_exists(path)) {
+        misses++;
+        return Ref<Image>();
+    }
+
+    Ref<FileAccess> file = FileAccess::open_compressed(path, FileAccess::READ, FileAccess::COMPRESSION_ZSTD);
+    if (file.is_null()) {
+        misses++;
+        return Ref<Image>();
+    }
+
+    // Header must match exactly; anything else is treated as a miss
+    bool valid = file->get_32() == FILE_MAGIC &&
+                 file->get_32() == FORMAT_VERSION &&
+                 file->get_32() == (uint32_t)LUNASVG_VERSION &&
+                 file->get_64() == p_content_key &&
+                 file->get_pascal_string() == p_cache_key;
+    if (!valid) {
+        file->close();
+        uint64_t stale_size = _get_file_size(path);
+        if (DirAccess::remove_absolute(path) == OK && size_scanned) {
+            total_size -= MIN(total_size, stale_size);
+        }
+        misses++;
+        return Ref<Image>();
+    }
+
+    int32_t width = file->get_32();
+    int32_t height = file->get_32();
+    Image::Format format = (Image::Format)file->get_32();
+    uint64_t data_size = file->get_64();
+    if (width <= 0 || height <= 0 || data_size != (uint64_t)Image::get_image_data_size(width, height, format, false)) {
+        misses++;
+        return Ref<Image>();
+    }
+
+    PackedByteArray data = file->get_buffer(data_size);
+    if ((uint64_t)data.size() != data_size) {
+        misses++;
+        return Ref<Image>();
+    }
+
+    hits++;
+    return Image::create_from_data(width, height, false, format, data);
+}
+
+void PonSVGDiskCache::store_image(uint64_t p_content_key, const String &p_cache_key, const Ref<Image> &p_image) {
+    if (p_image.is_null() || p_image->has_mipmaps()) {
+        return;
+    }
+
+    std::lock_guard<std::mutex> lock(mutex);
+
+    if (!_ensure_directory()) {
+        return;
+    }
+    _scan_size();
+
+    // Write to a temporary file first so an interrupted write never leaves a truncated entry
+    String path = _get_entry_path(p_content_key, p_cache_key);
+    String temp_path = path + ".tmp";
+    Ref<FileAccess> file = FileAccess::open_compressed(temp_path, FileAccess::WRITE, FileAccess::COMPRESSION_ZSTD);
+    if (file.is_null()) {
+        return;
+    }
+
+    PackedByteArray data = p_image->get_data();
+    file->store_32(FILE_MAGIC);
+    file->store_32(FORMAT_VERSION);
+    file->store_32((uint32_t)LUNASVG_VERSION);
+    file->store_64(p_content_key);
+    file->store_pascal_string(p_cache_key);
+    file->store_32(p_image->get_width());
+    file->store_32(p_image->get_height());
+    file->store_32(p_image->get_format());
+    file->store_64(data.size());
+    file->store_buffer(data);
+    file->close();
+
+    // A rewritten entry replaces the old file, whose length no longer counts
+    uint64_t replaced_size = _get_file_size(path);
+    if (DirAccess::rename_absolute(temp_path, path) != OK) {
+        DirAccess::remove_absolute(temp_path);
+        return;
+    }
+
+    total_size -= MIN(total_size, replaced_size);
+    total_size += _get_file_size(path);
+    writes++;
+
+    _enforce_size_cap();
+}
+
+void PonSVGDiskCache::clear() {
+    std::lock_guard<std::mutex> lock(mutex);
+    if (DirAccess::dir_exists_absolute(cache_dir)) {
+        _remove_all_entries();
+    }
+    size_scanned = true;
+}
+
+Dictionary PonSVGDiskCache::get_stats() {
+    std::lock_guard<std::mutex> lock(mutex);
+
+    Dictionary stats;
+    stats["path"] = cache_dir;
+    stats["max_bytes"] = (int64_t)max_size;
+    stats["bytes"] = size_scanned ? (int64_t)total_size : (int64_t)-1;
+    stats["hits"] = (int64_t)hits;
+    stats["misses"] = (int64_t)misses;
+    stats["writes"] = (int64_t)writes;
+    stats["version"] = _get_version_stamp();
+    return stats;
+}
@@ -0,0 +1,56 @@
+#ifndef PONSVG_DISK_CACHE_H
+#define PONSVG_DISK_CACHE_H
+
+#include <godot_cpp/classes/image.hpp>
+#include <godot_cpp/variant/dictionary.hpp>
+#include <godot_cpp/variant/string.hpp>
+#include <mutex>
+
+using namespace godot;
+
+// Persistent raster cache so warm starts skip LunaSVG entirely.
+// One zstd-compressed file per raster, named after a hash of the content key
+// and the cache key. The directory carries a version stamp combining the
+// PonSVG raster format and the LunaSVG version; a mismatch wipes the
+// directory. Files are only read on an in-memory cache miss.
+class PonSVGDiskCache {
+public:
+    static constexpr const char *SETTING_ENABLED = "ponsvg/disk_cache/enabled";
+    static constexpr const char *SETTING_PATH = "ponsvg/disk_cache/path";
+    static constexpr const char *SETTING_MAX_SIZE_MB = "ponsvg/disk_cache/max_size_mb";
+    static constexpr const char *DEFAULT_PATH = "user://ponsvg_cache";
+    static constexpr int DEFAULT_MAX_SIZE_MB = 256;
+
+    // Bump whenever the stored pixel layout or the rasterization output changes
+    static constexpr uint32_t FORMAT_VERSION = 2;
+
+private:
+    static constexpr uint32_t FILE_MAGIC = 0x43565350; // "PSVC"
+
+    std::mutex mutex;
+    String cache_dir;
+    uint64_t max_size;
+    uint64_t total_size;
+    bool directory_ready;
+    bool size_scanned;
+    uint64_t hits;
+    uint64_t misses;
+    uint64_t writes;
+
+    String _get_version_stamp() const;
+    String _get_entry_path(uint64_t p_content_key, const String &p_cache_key) const;
+    bool _ensure_directory();
+    void _remove_all_entries();
+    void _scan_size();
+    void _enforce_size_cap();
+
+public:
+    PonSVGDiskCache(const String &p_cache_dir, uint64_t p_max_size);
+
+    Ref<Image> load_image(uint64_t p_content_key, const String &p_cache_key);
+    void store_image(uint64_t p_content_key, const String &p_cache_key, const Ref<Image> &p_image);
+    void clear();
+    Dictionary get_stats();
+};
+
+#endif // PONSVG_DISK_CACHE_H
@@ -0,0 +1,86 @@
+#include "svg_document_store.h"
+
+using namespace godot;
+
+std::mutex PonSVGDocumentStore::mutex;
+std::unordered_map<uint64_t, std::weak_ptr<PonSVGParsedDocument>> PonSVGDocumentStore::documents;
+
+std::shared_ptr<PonSVGParsedDocument> PonSVGDocumentStore::find(uint64_t p_key) {
+    std::lock_guard<std::mutex> lock(mutex);
+
+    auto it = documents.find(p_key);
+    if (it == documents.end()) {
+        return nullptr;
+    }
+
+    std::shared_ptr<PonSVGParsedDocument> document = it->second.lock();
+    if (!document) {
+        documents.erase(it);
+    }
+    return document;
+}
+
+std::shared_ptr<PonSVGParsedDocument> PonSVGDocumentStore::insert(uint64_t p_key, const std::shared_ptr<PonSVGParsedDocument> &p_document) {
+    std::lock_guard<std::mutex> lock(mutex);
+
+    // Another thread may have parsed the same content in the meantime
+    auto it = documents.find(p_key);
+    if (it != documents.end()) {
+        std::shared_ptr<PonSVGParsedDocument> existing = it->second.lock();
+        if (existing) {
+            return existing;
+        }
+    }
+
+    documents[p_key] = p_document;
+
+    // Drop references to documents nobody uses anymore
+    for (auto expired = documents.begin(); expired != documents.end();) {
+        if (expired->second.expired()) {
+            expired = documents.erase(expired);
+        } else {
+            ++expired;
+        }
+    }
+
+    return p_document;
+}
+
+void PonSVGDocumentStore::rekey(uint64_t p_old_key, uint64_t p_new_key, const std::shared_ptr<PonSVGParsedDocument> &p_document) {
+    std::lock_guard<std::mutex> lock(mutex);
+
+    auto it = documents.find(p_old_key);
+    if (it != documents.end() && it->second.lock() == p_document) {
+        documents.erase(it);
+    }
+    documents[p_new_key] = p_document;
+}
+
+int PonSVGDocumentStore::get_document_count() {
+    std::lock_guard<std::mutex> lock(mutex);
+
+    int count = 0;
+    for (const auto &entry : documents) {
+        if (!entry.second.expired()) {
+            count++;
+        }
+    }
+    return count;
+}
+
+uint64_t PonSVGDocumentStore::hash_bytes(const char *p_data, int64_t p_length) {
+    uint64_t hash = 14695981039346656037ULL;
+    for (int64_t i = 0; i < p_length; i++) {
+        hash ^= (uint8_t)p_data[i];
+        hash *= 1099511628211ULL;
+    }
+    return hash;
+}
+
+uint64_t PonSVGDocumentStore::hash_combine(uint64_t p_hash, uint64_t p_value) {
+    // splitmix64 finalizer over the combined value
+    uint64_t x = p_hash ^ (p_value + 0x9e3779b97f4a7c15ULL + (p_hash << 6) + (p_hash >> 2));
+    x = (x ^ (x >> 30)) * 0xbf58476d1ce4e5b9ULL;
+    x = (x ^ (x >> 27)) * 0x94d049bb133111ebULL;
+    return x ^ (x >> 31);
+}
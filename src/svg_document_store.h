@@ -0,0 +1,96 @@
+#ifndef PONSVG_DOCUMENT_STORE_H
+#define PONSVG_DOCUMENT_STORE_H
+
+#include <godot_cpp/templates/hash_map.hpp>
+#include <godot_cpp/templates/hash_set.hpp>
+#include <godot_cpp/templates/vector.hpp>
+#include <godot_cpp/variant/dictionary.hpp>
+#include <godot_cpp/variant/packed_string_array.hpp>
+#include <godot_cpp/variant/rect2.hpp>
+#include <godot_cpp/variant/string.hpp>
+#include <godot_cpp/variant/string_name.hpp>
+#include <memory>
+#include <mutex>
+#include <shared_mutex>
+#include <unordered_map>
+
+#include "lunasvg.h"
+
+using namespace godot;
+
+// An override change that repainted only part of the document: a full raster of the
+// earlier state becomes one of the new state by re-rendering dirty_bounds
+struct PonSVGDocumentPatch {
+    uint64_t base_key = 0;
+    Rect2 dirty_bounds;  // Document coordinates
+};
+
+// Symbol table entry, resolved once when the document is set up
+struct PonSVGSymbol {
+    lunasvg::Element element;
+    String content_id;  // "symbol_<id>", the raster cache's name for the symbol
+    String view_box;
+    Rect2 bounds;
+    // Override keys (element ids and ".class" keys) the symbol's raster depends on
+    HashSet<String> dependencies;
+};
+
+// Element carrying a class attribute, with what class overrides need to know about it
+struct PonSVGClassMember {
+    lunasvg::Element element;
+    String id;                   // Overrides on the id win over class overrides
+    Vector<StringName> classes;  // Every class of the element
+};
+
+// Parsed SVG document plus the data derived from its structure.
+// Shared between every PonSVGResource whose source and override state match.
+struct PonSVGParsedDocument {
+    std::unique_ptr<lunasvg::Document> document;
+    // Element handles stay valid for the document's lifetime: overrides edit attributes, never the tree
+    HashMap<StringName, lunasvg::Element> elements_by_id;
+    HashMap<StringName, Vector<PonSVGClassMember>> elements_by_class;  // Class name -> members, document order
+    HashMap<StringName, PonSVGSymbol> symbols;
+    PackedStringArray symbol_ids;  // Document order
+    // Ids referenced from elsewhere in the document (use, paint servers, clip paths, masks)
+    HashSet<String> referenced_ids;
+    // Style rules can give elements strokes and filters their attributes do not show
+    bool has_style_sheet = false;
+    // Most recent first, so patches[0..i] together lead from state patches[i].base_key to this one
+    Vector<PonSVGDocumentPatch> patches;
+    // Override state the tree currently reflects; rasters rendered from it are cached under this key
+    uint64_t content_key = 0;
+    // Renders and lookups hold it shared. Writes to the tree (in-place override changes) hold it
+    // exclusively and leave the layout up to date, so readers never run lunasvg's lazy layout.
+    std::shared_mutex mutex;
+
+    lunasvg::Element find_element(const StringName &p_id) const {
+        const lunasvg::Element *element = elements_by_id.getptr(p_id);
+        return element ? *element : lunasvg::Element();
+    }
+    const PonSVGSymbol *find_symbol(const StringName &p_id) const {
+        return symbols.getptr(p_id);
+    }
+};
+
+// Process-wide, content-addressed store of parsed documents.
+// Keys combine the hash of the SVG source with the hash of the effective
+// override state. The store only holds weak references: a document lives
+// exactly as long as some resource uses it.
+class PonSVGDocumentStore {
+    static std::mutex mutex;
+    static std::unordered_map<uint64_t, std::weak_ptr<PonSVGParsedDocument>> documents;
+
+public:
+    static std::shared_ptr<PonSVGParsedDocument> find(uint64_t p_key);
+    // Registers p_document unless a live document already exists for p_key; returns the one in use
+    static std::shared_ptr<PonSVGParsedDocument> insert(uint64_t p_key, const std::shared_ptr<PonSVGParsedDocument> &p_document);
+    // Moves an exclusively owned document to the key of its new override state
+    static void rekey(uint64_t p_old_key, uint64_t p_new_key, const std::shared_ptr<PonSVGParsedDocument> &p_document);
+    static int get_document_count();
+
+    // 64-bit FNV-1a, stable across runs so keys can also address persistent data
+    static uint64_t hash_bytes(const char *p_data, int64_t p_length);
+    static uint64_t hash_combine(uint64_t p_hash, uint64_t p_value);
+};
+
+#endif // PONSVG_DOCUMENT_STORE_H
@@ -0,0 +1,80 @@
+#include "svg_image_pool.h"
+
+using namespace godot;
+
+std::mutex PonSVGImagePool::mutex;
+HashMap<uint64_t, Vector<Ref<Image>>> PonSVGImagePool::free_images;
+uint64_t PonSVGImagePool::pooled_bytes = 0;
+uint64_t PonSVGImagePool::reuse_count = 0;
+uint64_t PonSVGImagePool::allocation_count = 0;
+
+uint64_t PonSVGImagePool::_make_key(int p_width, int p_height, Image::Format p_format) {
+    return (uint64_t(p_width) << 40) | (uint64_t(p_height) << 16) | uint64_t(p_format);
+}
+
+Ref<Image> PonSVGImagePool::acquire(int p_width, int p_height, Image::Format p_format) {
+    ERR_FAIL_COND_V(p_width <= 0 || p_height <= 0, Ref<Image>());
+
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        Vector<Ref<Image>> *images = free_images.getptr(_make_key(p_width, p_height, p_format));
+        if (images && !images->is_empty()) {
+            Ref<Image> image = (*images)[images->size() - 1];
+            images->remove_at(images->size() - 1);
+            pooled_bytes -= Image::get_image_data_size(p_width, p_height, p_format, false);
+            reuse_count++;
+            return image;
+        }
+        allocation_count++;
+    }
+
+    return Image::create_empty(p_width, p_height, false, p_format);
+}
+
+void PonSVGImagePool::release(const Ref<Image> &p_image) {
+    // Anyone else still holding the image may read it; only unshared images are recycled
+    if (p_image.is_null() || p_image->get_reference_count() != 1 || p_image->has_mipmaps() || p_image->is_empty()) {
+        return;
+    }
+
+    uint64_t byte_size = Image::get_image_data_size(p_image->get_width(), p_image->get_height(), p_image->get_format(), false);
+
+    std::lock_guard<std::mutex> lock(mutex);
+    if (pooled_bytes + byte_size > MAX_POOLED_BYTES) {
+        return;
+    }
+
+    uint64_t key = _make_key(p_image->get_width(), p_image->get_height(), p_image->get_format());
+    if (!free_images.has(key)) {
+        free_images.insert(key, Vector<Ref<Image>>());
+    }
+    Vector<Ref<Image>> *images = free_images.getptr(key);
+    if (images->size() >= MAX_IMAGES_PER_SIZE) {
+        return;
+    }
+
+    images->push_back(p_image);
+    pooled_bytes += byte_size;
+}
+
+void PonSVGImagePool::clear() {
+    std::lock_guard<std::mutex> lock(mutex);
+    free_images.clear();
+    pooled_bytes = 0;
+}
+
+Dictionary PonSVGImagePool::get_stats() {
+    std::lock_guard<std::mutex> lock(mutex);
+
+    int image_count = 0;
+    for (const KeyValue<uint64_t, Vector<Ref<Image>>> &E : free_images) {
+        image_count += E.value.size();
+    }
+
+    Dictionary stats;
+    stats["images"] = image_count;
+    stats["bytes"] = (int64_t)pooled_bytes;
+    stats["reuses"] = (int64_t)reuse_count;
+    stats["allocations"] = (int64_t)allocation_count;
+    return stats;
+}
@@ -0,0 +1,39 @@
+#ifndef PONSVG_IMAGE_POOL_H
+#define PONSVG_IMAGE_POOL_H
+
+#include <godot_cpp/classes/image.hpp>
+#include <godot_cpp/templates/hash_map.hpp>
+#include <godot_cpp/templates/vector.hpp>
+#include <godot_cpp/variant/dictionary.hpp>
+#include <mutex>
+
+using namespace godot;
+
+// Recycles render target images by (width, height, format).
+// Images come back when their last user lets go of them (cache eviction,
+// a texture or sprite replacing its raster), so steady-state re-renders at
+// a stable size reuse the same pixel memory instead of allocating.
+class PonSVGImagePool {
+public:
+    static constexpr uint64_t MAX_POOLED_BYTES = 64 * 1024 * 1024;
+    static constexpr int MAX_IMAGES_PER_SIZE = 4;
+
+private:
+    static std::mutex mutex;
+    static HashMap<uint64_t, Vector<Ref<Image>>> free_images;
+    static uint64_t pooled_bytes;
+    static uint64_t reuse_count;
+    static uint64_t allocation_count;
+
+    static uint64_t _make_key(int p_width, int p_height, Image::Format p_format);
+
+public:
+    // Returns an image with undefined contents; callers overwrite every pixel
+    static Ref<Image> acquire(int p_width, int p_height, Image::Format p_format);
+    // Takes the image back only if the caller holds the last reference to it
+    static void release(const Ref<Image> &p_image);
+    static void clear();
+    static Dictionary get_stats();
+};
+
+#endif // PONSVG_IMAGE_POOL_H
@@ -0,0 +1,105 @@
+#include "svg_import_plugin.h"
+
+#include <godot_cpp/classes/file_access.hpp>
+
+#include "svg_resource.h"
+
+using namespace godot;
+
+static Dictionary _make_option(const String &p_name, const Variant &p_default, PropertyHint p_hint = PROPERTY_HINT_NONE, const String &p_hint_string = String()) {
+    Dictionary option;
+    option["name"] = p_name;
+    option["default_value"] = p_default;
+    option["property_hint"] = p_hint;
+    option["hint_string"] = p_hint_string;
+    return option;
+}
+
+String PonSVGImportPlugin::_get_importer_name() const {
+    return "ponsvg.resource";
+}
+
+String PonSVGImportPlugin::_get_visible_name() const {
+    return "PonSVG Resource";
+}
+
+PackedStringArray PonSVGImportPlugin::_get_recognized_extensions() const {
+    PackedStringArray extensions;
+    extensions.push_back("svg");
+    return extensions;
+}
+
+String PonSVGImportPlugin::_get_save_extension() const {
+    return "psvg";
+}
+
+String PonSVGImportPlugin::_get_resource_type() const {
+    return "PonSVGResource";
+}
+
+// Below the texture importer, so .svg files stay textures unless switched in the Import dock
+double PonSVGImportPlugin::_get_priority() const {
+    return 0.5;
+}
+
+int32_t PonSVGImportPlugin::_get_import_order() const {
+    return 0;
+}
+
+int32_t PonSVGImportPlugin::_get_preset_count() const {
+    return 1;
+}
+
+String PonSVGImportPlugin::_get_preset_name(int32_t p_preset_index) const {
+    return "Default";
+}
+
+TypedArray<Dictionary> PonSVGImportPlugin::_get_import_options(const String &p_path, int32_t p_preset_index) const {
+    TypedArray<Dictionary> options;
+    // Sizes are render sizes: lookups match them exactly, before LOD and size buckets would change them
+    options.push_back(_make_option(OPTION_DOCUMENT_SIZES, Array(), PROPERTY_HINT_TYPE_STRING, vformat("%d:", Variant::VECTOR2I)));
+    // {symbol_id: [Vector2i, ...]}
+    options.push_back(_make_option(OPTION_SYMBOL_SIZES, Dictionary()));
+    options.push_back(_make_option(OPTION_PREMULTIPLIED, false));
+    return options;
+}
+
+bool PonSVGImportPlugin::_get_option_visibility(const String &p_path, const StringName &p_option_name, const Dictionary &p_options) const {
+    return true;
+}
+
+Error PonSVGImportPlugin::_import(const String &p_source_file, const String &p_save_path, const Dictionary &p_options, const TypedArray<String> &p_platform_variants, const TypedArray<String> &p_gen_files) const {
+    Ref<PonSVGResource> resource;
+    resource.instantiate();
+    resource->set_premultiplied_output(p_options.get(OPTION_PREMULTIPLIED, false));
+    Error err = resource->load_from_file(p_source_file);
+    if (err != OK) {
+        return err;
+    }
+    ERR_FAIL_COND_V_MSG(!resource->get_document(), ERR_PARSE_ERROR, "Failed to parse SVG file: " + p_source_file);
+
+    Dictionary baked_sizes = Dictionary(p_options.get(OPTION_SYMBOL_SIZES, Dictionary())).duplicate();
+    Array document_sizes = p_options.get(OPTION_DOCUMENT_SIZES, Array());
+    if (!document_sizes.is_empty()) {
+        baked_sizes[""] = document_sizes;
+    }
+    PackedByteArray data = resource->compile(baked_sizes);
+    ERR_FAIL_COND_V(data.is_empty(), ERR_CANT_CREATE);
+
+    String path = p_save_path + "." + _get_save_extension();
+    Ref<FileAccess> file = FileAccess::open(path, FileAccess::WRITE);
+    ERR_FAIL_COND_V_MSG(file.is_null(), ERR_FILE_CANT_WRITE, "Cannot write imported SVG file: " + path);
+    file->store_buffer(data);
+    file->close();
+    return OK;
+}
+
+void PonSVGEditorPlugin::_enter_tree() {
+    import_plugin.instantiate();
+    add_import_plugin(import_plugin);
+}
+
+void PonSVGEditorPlugin::_exit_tree() {
+    remove_import_plugin(import_plugin);
+    import_plugin.unref();
+}
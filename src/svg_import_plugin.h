@@ -0,0 +1,53 @@
+#ifndef PONSVG_IMPORT_PLUGIN_H
+#define PONSVG_IMPORT_PLUGIN_H
+
+#include <godot_cpp/classes/editor_import_plugin.hpp>
+#include <godot_cpp/classes/editor_plugin.hpp>
+
+using namespace godot;
+
+// "PonSVG Resource" importer for .svg files, chosen per file in the Import dock.
+// The file is compiled to .psvg (see PonSVGResource::compile) together with rasters
+// baked at the sizes listed in the import options. At runtime, rasterizing a baked
+// symbol at a baked size is a lookup; other sizes still render live.
+class PonSVGImportPlugin : public EditorImportPlugin {
+    GDCLASS(PonSVGImportPlugin, EditorImportPlugin);
+
+public:
+    static constexpr const char *OPTION_DOCUMENT_SIZES = "bake/document_sizes";
+    static constexpr const char *OPTION_SYMBOL_SIZES = "bake/symbol_sizes";
+    static constexpr const char *OPTION_PREMULTIPLIED = "bake/premultiplied";
+
+protected:
+    static void _bind_methods() {}
+
+public:
+    virtual String _get_importer_name() const override;
+    virtual String _get_visible_name() const override;
+    virtual PackedStringArray _get_recognized_extensions() const override;
+    virtual String _get_save_extension() const override;
+    virtual String _get_resource_type() const override;
+    virtual double _get_priority() const override;
+    virtual int32_t _get_import_order() const override;
+    virtual int32_t _get_preset_count() const override;
+    virtual String _get_preset_name(int32_t p_preset_index) const override;
+    virtual TypedArray<Dictionary> _get_import_options(const String &p_path, int32_t p_preset_index) const override;
+    virtual bool _get_option_visibility(const String &p_path, const StringName &p_option_name, const Dictionary &p_options) const override;
+    virtual Error _import(const String &p_source_file, const String &p_save_path, const Dictionary &p_options, const TypedArray<String> &p_platform_variants, const TypedArray<String> &p_gen_files) const override;
+};
+
+// Registers the importer while the editor runs
+class PonSVGEditorPlugin : public EditorPlugin {
+    GDCLASS(PonSVGEditorPlugin, EditorPlugin);
+
+    Ref<PonSVGImportPlugin> import_plugin;
+
+protected:
+    static void _bind_methods() {}
+
+public:
+    virtual void _enter_tree() override;
+    virtual void _exit_tree() override;
+};
+
+#endif // PONSVG_IMPORT_PLUGIN_H
@@ -0,0 +1,207 @@
+#include "svg_render_scheduler.h"
+
+#include <godot_cpp/classes/engine.hpp>
+#include <godot_cpp/classes/project_settings.hpp>
+#include <godot_cpp/classes/scene_tree.hpp>
+#include <godot_cpp/classes/time.hpp>
+#include <godot_cpp/core/class_db.hpp>
+#include <godot_cpp/core/object.hpp>
+
+using namespace godot;
+
+PonSVGRenderScheduler *PonSVGRenderScheduler::singleton = nullptr;
+
+PonSVGRenderScheduler *PonSVGRenderScheduler::get_singleton() {
+    return singleton;
+}
+
+PonSVGRenderScheduler::PonSVGRenderScheduler() {
+    next_sequence = 0;
+    connected = false;
+    usec_per_pixel = DEFAULT_USEC_PER_PIXEL;
+    update_count = 0;
+    background_count = 0;
+    last_frame_usec = 0;
+    last_frame_updates = 0;
+
+    ProjectSettings *settings = ProjectSettings::get_singleton();
+    frame_budget_msec = MAX(double(settings->get_setting(SETTING_FRAME_BUDGET_MSEC, DEFAULT_FRAME_BUDGET_MSEC)), 0.0);
+    hard_realtime = settings->get_setting(SETTING_HARD_REALTIME, false);
+
+    singleton = this;
+}
+
+PonSVGRenderScheduler::~PonSVGRenderScheduler() {
+    if (singleton == this) {
+        singleton = nullptr;
+    }
+}
+
+void PonSVGRenderScheduler::_bind_methods() {
+    ClassDB::bind_method(D_METHOD("set_frame_budget_msec", "msec"), &PonSVGRenderScheduler::set_frame_budget_msec);
+    ClassDB::bind_method(D_METHOD("get_frame_budget_msec"), &PonSVGRenderScheduler::get_frame_budget_msec);
+    ClassDB::bind_method(D_METHOD("set_hard_realtime", "enabled"), &PonSVGRenderScheduler::set_hard_realtime);
+    ClassDB::bind_method(D_METHOD("is_hard_realtime"), &PonSVGRenderScheduler::is_hard_realtime);
+    ClassDB::bind_method(D_METHOD("get_pending_count"), &PonSVGRenderScheduler::get_pending_count);
+    ClassDB::bind_method(D_METHOD("flush"), &PonSVGRenderScheduler::flush);
+    ClassDB::bind_method(D_METHOD("get_stats"), &PonSVGRenderScheduler::get_stats);
+
+    ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "frame_budget_msec", PROPERTY_HINT_RANGE, "0,100,0.1,or_greater,suffix:ms"), "set_frame_budget_msec", "get_frame_budget_msec");
+    ADD_PROPERTY(PropertyInfo(Variant::BOOL, "hard_realtime"), "set_hard_realtime", "is_hard_realtime");
+}
+
+bool PonSVGRenderScheduler::_connect_frame() {
+    if (connected) {
+        return true;
+    }
+    // Ticking at the start of the frame lets the redraws queued by updates land in the same frame
+    SceneTree *tree = Object::cast_to<SceneTree>(Engine::get_singleton()->get_main_loop());
+    if (!tree) {
+        return false;
+    }
+    tree->connect("process_frame", callable_mp(this, &PonSVGRenderScheduler::_process_frame));
+    connected = true;
+    return true;
+}
+
+struct HigherPriorityFirst {
+    template <typename T>
+    bool operator()(const T &p_a, const T &p_b) const {
+        if (p_a.priority != p_b.priority) {
+            return p_a.priority > p_b.priority;
+        }
+        if (p_a.screen_area != p_b.screen_area) {
+            return p_a.screen_area > p_b.screen_area;
+        }
+        return p_a.sequence < p_b.sequence;
+    }
+};
+
+void PonSVGRenderScheduler::_process_frame() {
+    last_frame_usec = 0;
+    last_frame_updates = 0;
+    if (requests.is_empty()) {
+        return;
+    }
+
+    // Updates may queue new requests, which wait for the next frame
+    Vector<Request> order;
+    for (const KeyValue<uint64_t, Request> &E : requests) {
+        order.push_back(E.value);
+    }
+    order.sort_custom<HigherPriorityFirst>();
+
+    uint64_t budget_usec = uint64_t(frame_budget_msec * 1000.0);
+    uint64_t start_usec = Time::get_singleton()->get_ticks_usec();
+    for (int i = 0; i < order.size(); i++) {
+        const Request &request = order[i];
+        uint64_t used_usec = Time::get_singleton()->get_ticks_usec() - start_usec;
+        uint64_t estimate_usec = uint64_t(double(request.render_pixels) * usec_per_pixel);
+        bool background = false;
+
+        if (hard_realtime) {
+            if (estimate_usec > budget_usec) {
+                // Could never fit a frame; the consumer renders it on a worker thread
+                background = true;
+            } else if (used_usec + estimate_usec > budget_usec) {
+                // Smaller requests further down may still fit
+                continue;
+            }
+        } else if (last_frame_updates > 0 && used_usec >= budget_usec) {
+            // At least one update per frame, so the queue always drains
+            break;
+        }
+
+        requests.erase(request.consumer_id);
+        if (!ObjectDB::get_instance(request.consumer_id)) {
+            continue;
+        }
+
+        uint64_t update_start_usec = Time::get_singleton()->get_ticks_usec();
+        request.callback.call(background);
+        uint64_t update_usec = Time::get_singleton()->get_ticks_usec() - update_start_usec;
+
+        if (background) {
+            background_count++;
+        } else if (request.render_pixels > 0) {
+            usec_per_pixel = usec_per_pixel * 0.75 + (double(update_usec) / double(request.render_pixels)) * 0.25;
+        }
+        update_count++;
+        last_frame_updates++;
+    }
+    last_frame_usec = Time::get_singleton()->get_ticks_usec() - start_usec;
+}
+
+bool PonSVGRenderScheduler::schedule(Object *p_consumer, const Callable &p_callback, int p_priority, int64_t p_screen_area, int64_t p_render_pixels) {
+    ERR_FAIL_NULL_V(p_consumer, false);
+    if (frame_budget_msec <= 0.0 || !_connect_frame()) {
+        return false;
+    }
+
+    uint64_t consumer_id = p_consumer->get_instance_id();
+    Request *existing = requests.getptr(consumer_id);
+    if (existing) {
+        // Keeps its place among equals, with the latest priority and size
+        existing->callback = p_callback;
+        existing->priority = p_priority;
+        existing->screen_area = p_screen_area;
+        existing->render_pixels = p_render_pixels;
+        return true;
+    }
+
+    Request request;
+    request.consumer_id = consumer_id;
+    request.callback = p_callback;
+    request.priority = p_priority;
+    request.screen_area = p_screen_area;
+    request.render_pixels = p_render_pixels;
+    request.sequence = next_sequence++;
+    requests.insert(consumer_id, request);
+    return true;
+}
+
+void PonSVGRenderScheduler::cancel(Object *p_consumer) {
+    requests.erase(p_consumer->get_instance_id());
+}
+
+void PonSVGRenderScheduler::set_frame_budget_msec(double p_msec) {
+    frame_budget_msec = MAX(p_msec, 0.0);
+}
+
+double PonSVGRenderScheduler::get_frame_budget_msec() const {
+    return frame_budget_msec;
+}
+
+void PonSVGRenderScheduler::set_hard_realtime(bool p_enabled) {
+    hard_realtime = p_enabled;
+}
+
+bool PonSVGRenderScheduler::is_hard_realtime() const {
+    return hard_realtime;
+}
+
+int PonSVGRenderScheduler::get_pending_count() const {
+    return requests.size();
+}
+
+void PonSVGRenderScheduler::flush() {
+    while (!requests.is_empty()) {
+        Request request = requests.begin()->value;
+        requests.erase(request.consumer_id);
+        if (ObjectDB::get_instance(request.consumer_id)) {
+            request.callback.call(false);
+            update_count++;
+        }
+    }
+}
+
+Dictionary PonSVGRenderScheduler::get_stats() const {
+    Dictionary stats;
+    stats["pending"] = (int64_t)requests.size();
+    stats["updates"] = (int64_t)update_count;
+    stats["background_updates"] = (int64_t)background_count;
+    stats["last_frame_msec"] = double(last_frame_usec) / 1000.0;
+    stats["last_frame_updates"] = (int64_t)last_frame_updates;
+    stats["usec_per_pixel"] = usec_per_pixel;
+    return stats;
+}
@@ -0,0 +1,80 @@
+#ifndef PONSVG_RENDER_SCHEDULER_H
+#define PONSVG_RENDER_SCHEDULER_H
+
+#include <godot_cpp/classes/object.hpp>
+#include <godot_cpp/templates/hash_map.hpp>
+#include <godot_cpp/variant/callable.hpp>
+#include <godot_cpp/variant/dictionary.hpp>
+
+using namespace godot;
+
+// Spreads the re-rasterization of dirty sprites and textures over frames.
+// Consumers that already show a raster queue an update when they are drawn dirty
+// and keep showing the previous one; a first raster always renders right away.
+// Once per frame the queue is worked through, highest
+// priority and largest on-screen size first, until the frame budget is spent.
+// In hard real-time mode an update only starts when its estimated cost fits
+// the remaining budget, and updates that could never fit are rendered in the
+// background instead. Off (a zero budget) unless enabled. Main thread only.
+class PonSVGRenderScheduler : public Object {
+    GDCLASS(PonSVGRenderScheduler, Object);
+
+public:
+    static constexpr const char *SETTING_FRAME_BUDGET_MSEC = "ponsvg/scheduler/frame_budget_msec";
+    static constexpr const char *SETTING_HARD_REALTIME = "ponsvg/scheduler/hard_realtime";
+    static constexpr double DEFAULT_FRAME_BUDGET_MSEC = 0.0;
+    // Starting estimate of the render cost, refined from measured updates
+    static constexpr double DEFAULT_USEC_PER_PIXEL = 0.01;
+
+private:
+    struct Request {
+        uint64_t consumer_id = 0;
+        Callable callback;     // Called with true when the update should render in the background
+        int priority = 0;
+        int64_t screen_area = 0;     // On-screen pixels, ordering requests of equal priority
+        int64_t render_pixels = 0;   // Pixels the update rasterizes on this thread, for the cost estimate
+        uint64_t sequence = 0;
+    };
+
+    static PonSVGRenderScheduler *singleton;
+
+    HashMap<uint64_t, Request> requests;
+    uint64_t next_sequence;
+    double frame_budget_msec;
+    bool hard_realtime;
+    bool connected;
+    double usec_per_pixel;
+    uint64_t update_count;
+    uint64_t background_count;
+    uint64_t last_frame_usec;
+    uint32_t last_frame_updates;
+
+    bool _connect_frame();
+    void _process_frame();
+
+protected:
+    static void _bind_methods();
+
+public:
+    static PonSVGRenderScheduler *get_singleton();
+
+    PonSVGRenderScheduler();
+    ~PonSVGRenderScheduler();
+
+    // Internal API used by the consumers; false means the update should run right away
+    bool schedule(Object *p_consumer, const Callable &p_callback, int p_priority, int64_t p_screen_area, int64_t p_render_pixels);
+    void cancel(Object *p_consumer);
+
+    // A budget of zero turns scheduling off, so every update runs when drawn
+    void set_frame_budget_msec(double p_msec);
+    double get_frame_budget_msec() const;
+    void set_hard_realtime(bool p_enabled);
+    bool is_hard_realtime() const;
+
+    int get_pending_count() const;
+    // Runs every queued update now, ignoring the budget
+    void flush();
+    Dictionary get_stats() const;
+};
+
+#endif // PONSVG_RENDER_SCHEDULER_H
@@ -0,0 +1,179 @@
+#include "svg_render_stats.h"
+
+#include <godot_cpp/classes/engine.hpp>
+#include <godot_cpp/classes/performance.hpp>
+#include <godot_cpp/variant/callable_method_pointer.hpp>
+#include <godot_cpp/variant/packed_int64_array.hpp>
+
+using namespace godot;
+
+std::atomic<uint64_t> PonSVGRenderStats::cache_hits(0);
+std::atomic<uint64_t> PonSVGRenderStats::cache_misses(0);
+std::atomic<uint64_t> PonSVGRenderStats::upload_bytes(0);
+std::atomic<uint64_t> PonSVGRenderStats::partial_renders(0);
+std::mutex PonSVGRenderStats::mutex;
+PonSVGRenderStats::TimingData PonSVGRenderStats::timings[TIMING_MAX];
+uint64_t PonSVGRenderStats::current_frame = 0;
+
+static const char *TIMING_NAMES[PonSVGRenderStats::TIMING_MAX] = {
+    "parse",
+    "render",
+    "convert",
+    "upload",
+};
+
+static const char *MONITOR_IDS[] = {
+    "PonSVG/cache_hits",
+    "PonSVG/cache_misses",
+    "PonSVG/cache_hit_ratio",
+    "PonSVG/parse_msec_per_frame",
+    "PonSVG/render_msec_per_frame",
+    "PonSVG/convert_msec_per_frame",
+    "PonSVG/upload_msec_per_frame",
+    "PonSVG/uploads_per_frame",
+};
+
+// Moves the per-frame accumulators to "last frame" once the engine advanced - callers must hold the mutex
+void PonSVGRenderStats::_roll_frame() {
+    uint64_t frame = Engine::get_singleton()->get_process_frames();
+    if (frame == current_frame) {
+        return;
+    }
+
+    // Frames without any samples in between leave nothing to report
+    bool consecutive = frame == current_frame + 1;
+    for (int i = 0; i < TIMING_MAX; i++) {
+        TimingData &data = timings[i];
+        data.last_frame_usec = consecutive ? data.frame_usec : 0;
+        data.last_frame_count = consecutive ? data.frame_count : 0;
+        data.frame_usec = 0;
+        data.frame_count = 0;
+    }
+    current_frame = frame;
+}
+
+void PonSVGRenderStats::record_time(Timing p_timing, uint64_t p_usec) {
+    ERR_FAIL_INDEX(p_timing, TIMING_MAX);
+
+    int bucket = 0;
+    for (uint64_t value = p_usec; value > 1 && bucket < HISTOGRAM_BUCKETS - 1; value >>= 1) {
+        bucket++;
+    }
+
+    std::lock_guard<std::mutex> lock(mutex);
+    _roll_frame();
+
+    TimingData &data = timings[p_timing];
+    data.count++;
+    data.total_usec += p_usec;
+    data.max_usec = MAX(data.max_usec, p_usec);
+    data.frame_usec += p_usec;
+    data.frame_count++;
+    data.histogram[bucket]++;
+}
+
+Dictionary PonSVGRenderStats::get_stats() {
+    Dictionary stats;
+    uint64_t hits = cache_hits.load(std::memory_order_relaxed);
+    uint64_t misses = cache_misses.load(std::memory_order_relaxed);
+    stats["cache_hits"] = (int64_t)hits;
+    stats["cache_misses"] = (int64_t)misses;
+    stats["cache_hit_ratio"] = (hits + misses) > 0 ? double(hits) / double(hits + misses) : 0.0;
+    stats["upload_bytes"] = (int64_t)upload_bytes.load(std::memory_order_relaxed);
+    stats["partial_renders"] = (int64_t)partial_renders.load(std::memory_order_relaxed);
+
+    std::lock_guard<std::mutex> lock(mutex);
+    _roll_frame();
+
+    for (int i = 0; i < TIMING_MAX; i++) {
+        const TimingData &data = timings[i];
+
+        PackedInt64Array histogram;
+        histogram.resize(HISTOGRAM_BUCKETS);
+        for (int bucket = 0; bucket < HISTOGRAM_BUCKETS; bucket++) {
+            histogram.set(bucket, (int64_t)data.histogram[bucket]);
+        }
+
+        Dictionary timing;
+        timing["count"] = (int64_t)data.count;
+        timing["total_usec"] = (int64_t)data.total_usec;
+        timing["max_usec"] = (int64_t)data.max_usec;
+        timing["average_usec"] = data.count > 0 ? double(data.total_usec) / double(data.count) : 0.0;
+        timing["last_frame_usec"] = (int64_t)data.last_frame_usec;
+        timing["last_frame_count"] = (int64_t)data.last_frame_count;
+        timing["histogram_usec_log2"] = histogram;
+        stats[TIMING_NAMES[i]] = timing;
+    }
+
+    return stats;
+}
+
+void PonSVGRenderStats::reset() {
+    cache_hits.store(0, std::memory_order_relaxed);
+    cache_misses.store(0, std::memory_order_relaxed);
+    upload_bytes.store(0, std::memory_order_relaxed);
+    partial_renders.store(0, std::memory_order_relaxed);
+
+    std::lock_guard<std::mutex> lock(mutex);
+    for (int i = 0; i < TIMING_MAX; i++) {
+        timings[i] = TimingData();
+    }
+}
+
+double PonSVGRenderStats::_get_monitor_value(int p_monitor) {
+    switch (p_monitor) {
+        case MONITOR_CACHE_HITS:
+            return double(cache_hits.load(std::memory_order_relaxed));
+        case MONITOR_CACHE_MISSES:
+            return double(cache_misses.load(std::memory_order_relaxed));
+        case MONITOR_CACHE_HIT_RATIO: {
+            uint64_t hits = cache_hits.load(std::memory_order_relaxed);
+            uint64_t total = hits + cache_misses.load(std::memory_order_relaxed);
+            return total > 0 ? double(hits) / double(total) : 0.0;
+        }
+        default:
+            break;
+    }
+
+    std::lock_guard<std::mutex> lock(mutex);
+    _roll_frame();
+
+    switch (p_monitor) {
+        case MONITOR_PARSE_MSEC:
+            return timings[TIMING_PARSE].last_frame_usec / 1000.0;
+        case MONITOR_RENDER_MSEC:
+            return timings[TIMING_RENDER].last_frame_usec / 1000.0;
+        case MONITOR_CONVERT_MSEC:
+            return timings[TIMING_CONVERT].last_frame_usec / 1000.0;
+        case MONITOR_UPLOAD_MSEC:
+            return timings[TIMING_UPLOAD].last_frame_usec / 1000.0;
+        case MONITOR_UPLOADS:
+            return double(timings[TIMING_UPLOAD].last_frame_count);
+        default:
+            return 0.0;
+    }
+}
+
+void PonSVGRenderStats::register_monitors() {
+    Performance *performance = Performance::get_singleton();
+    for (int i = 0; i < MONITOR_MAX; i++) {
+        if (performance->has_custom_monitor(MONITOR_IDS[i])) {
+            continue;
+        }
+        Array arguments;
+        arguments.push_back(i);
+        performance->add_custom_monitor(MONITOR_IDS[i], callable_mp_static(&PonSVGRenderStats::_get_monitor_value), arguments);
+    }
+}
+
+void PonSVGRenderStats::unregister_monitors() {
+    Performance *performance = Performance::get_singleton();
+    if (!performance) {
+        return;
+    }
+    for (int i = 0; i < MONITOR_MAX; i++) {
+        if (performance->has_custom_monitor(MONITOR_IDS[i])) {
+            performance->remove_custom_monitor(MONITOR_IDS[i]);
+        }
+    }
+}
@@ -0,0 +1,90 @@
+#ifndef PONSVG_RENDER_STATS_H
+#define PONSVG_RENDER_STATS_H
+
+#include <godot_cpp/classes/time.hpp>
+#include <godot_cpp/variant/dictionary.hpp>
+#include <atomic>
+#include <mutex>
+
+using namespace godot;
+
+// Process-wide counters and timing histograms for the PonSVG hot paths.
+// Timings are accumulated per engine frame so the Performance monitors can
+// report the cost of the previous frame next to the running totals.
+class PonSVGRenderStats {
+public:
+    enum Timing {
+        TIMING_PARSE,    // LunaSVG document parsing
+        TIMING_RENDER,   // LunaSVG rasterization
+        TIMING_CONVERT,  // ARGB32 premultiplied -> RGBA8 conversion
+        TIMING_UPLOAD,   // texture_2d_update calls
+        TIMING_MAX
+    };
+
+    // Histogram bucket i counts samples in [2^i, 2^(i+1)) usec; the last bucket is open-ended
+    static constexpr int HISTOGRAM_BUCKETS = 20;
+
+private:
+    struct TimingData {
+        uint64_t count = 0;
+        uint64_t total_usec = 0;
+        uint64_t max_usec = 0;
+        uint64_t frame_usec = 0;       // Accumulated during the current frame
+        uint64_t last_frame_usec = 0;  // Total of the previous frame
+        uint32_t frame_count = 0;
+        uint32_t last_frame_count = 0;
+        uint64_t histogram[HISTOGRAM_BUCKETS] = {};
+    };
+
+    enum Monitor {
+        MONITOR_CACHE_HITS,
+        MONITOR_CACHE_MISSES,
+        MONITOR_CACHE_HIT_RATIO,
+        MONITOR_PARSE_MSEC,
+        MONITOR_RENDER_MSEC,
+        MONITOR_CONVERT_MSEC,
+        MONITOR_UPLOAD_MSEC,
+        MONITOR_UPLOADS,
+        MONITOR_MAX
+    };
+
+    static std::atomic<uint64_t> cache_hits;
+    static std::atomic<uint64_t> cache_misses;
+    static std::atomic<uint64_t> upload_bytes;
+    static std::atomic<uint64_t> partial_renders;
+
+    static std::mutex mutex;
+    static TimingData timings[TIMING_MAX];
+    static uint64_t current_frame;
+
+    static void _roll_frame();
+    static double _get_monitor_value(int p_monitor);
+
+public:
+    static void record_cache_hit() { cache_hits.fetch_add(1, std::memory_order_relaxed); }
+    static void record_cache_miss() { cache_misses.fetch_add(1, std::memory_order_relaxed); }
+    static void record_upload_bytes(uint64_t p_bytes) { upload_bytes.fetch_add(p_bytes, std::memory_order_relaxed); }
+    static void record_partial_render() { partial_renders.fetch_add(1, std::memory_order_relaxed); }
+    static void record_time(Timing p_timing, uint64_t p_usec);
+
+    static Dictionary get_stats();
+    static void reset();
+
+    static void register_monitors();
+    static void unregister_monitors();
+};
+
+// Records the lifetime of the enclosing scope under the given timing
+class PonSVGScopedTimer {
+    PonSVGRenderStats::Timing timing;
+    uint64_t start_usec;
+
+public:
+    explicit PonSVGScopedTimer(PonSVGRenderStats::Timing p_timing) :
+            timing(p_timing), start_usec(Time::get_singleton()->get_ticks_usec()) {}
+    ~PonSVGScopedTimer() {
+        PonSVGRenderStats::record_time(timing, Time::get_singleton()->get_ticks_usec() - start_usec);
+    }
+};
+
+#endif // PONSVG_RENDER_STATS_H
@@ -6,34 +6,64 @@
 #include <godot_cpp/classes/sub_viewport.hpp>
 #include <godot_cpp/classes/texture_rect.hpp>
 #include <godot_cpp/classes/image_texture.hpp>
+#include <godot_cpp/classes/os.hpp>
+#include <godot_cpp/classes/stream_peer_buffer.hpp>
 #include <godot_cpp/classes/viewport_texture.hpp>
+#include <godot_cpp/classes/worker_thread_pool.hpp>
+#include <godot_cpp/templates/hash_map.hpp>
 #include <godot_cpp/variant/utility_functions.hpp>
 
+#include <atomic>
+#include <cstring>
+#include <mutex>
+
 #include "lunasvg.h"
+#include "svg_atlas.h"
+#include "svg_image_pool.h"
+#include "svg_render_stats.h"
 
 using namespace godot;
 
 PonSVGResource::PonSVGResource() {
-    last_modification_time = 0;
-    needs_cache_clear = false;
+    svg_source_size = 0;
+    compress_source = false;
+    source_hash = 0;
+    content_key = 0;
+    parse_deferred = false;
+    baked_key = 0;
     cache_enabled = true;
     lod_enabled = false;
     lod_bias = 1.0f;
+    size_bucket_mode = SIZE_BUCKET_NONE;
+    size_bucket_step = 64;
+    premultiplied_output = false;
+    override_batch_depth = 0;
+    change_pending = false;
+    revision = 0;
+    all_contents_changed = false;
+    all_contents_revision = 0;
 }
 
 PonSVGResource::~PonSVGResource() {
-    _clear_cache();
+    // Rasters are shared by content; drop them only if no other resource renders this content
+    if (parsed && parsed.use_count() == 1) {
+        _clear_cache();
+    }
 }
 
 void PonSVGResource::_bind_methods() {
     // Core loading
     ClassDB::bind_method(D_METHOD("load_from_file", "path"), &PonSVGResource::load_from_file);
     ClassDB::bind_method(D_METHOD("load_from_string", "svg_string"), &PonSVGResource::load_from_string);
+    ClassDB::bind_method(D_METHOD("load_from_buffer", "buffer"), &PonSVGResource::load_from_buffer);
+    ClassDB::bind_method(D_METHOD("compile", "baked_sizes"), &PonSVGResource::compile, DEFVAL(Dictionary()));
+    ClassDB::bind_method(D_METHOD("load_compiled", "data"), &PonSVGResource::load_compiled);
     
     // Symbol management
     ClassDB::bind_method(D_METHOD("get_symbol_ids"), &PonSVGResource::get_symbol_ids);
     ClassDB::bind_method(D_METHOD("has_symbol", "id"), &PonSVGResource::has_symbol);
     ClassDB::bind_method(D_METHOD("get_symbol_data", "id"), &PonSVGResource::get_symbol_data);
+    ClassDB::bind_method(D_METHOD("get_symbol_dependencies", "id"), &PonSVGResource::get_symbol_dependencies);
     
     // Style overrides
     ClassDB::bind_method(D_METHOD("override_fill", "element_id", "color"), &PonSVGResource::override_fill);
@@ -52,8 +82,18 @@ void PonSVGResource::_bind_methods() {
     ClassDB::bind_method(D_METHOD("clear_shader_override", "element_id"), &PonSVGResource::clear_shader_override);
     ClassDB::bind_method(D_METHOD("clear_all_overrides"), &PonSVGResource::clear_all_overrides);
     
+    // Override transactions
+    ClassDB::bind_method(D_METHOD("begin_overrides"), &PonSVGResource::begin_overrides);
+    ClassDB::bind_method(D_METHOD("commit_overrides"), &PonSVGResource::commit_overrides);
+    ClassDB::bind_method(D_METHOD("apply_overrides", "overrides"), &PonSVGResource::apply_overrides);
+    ClassDB::bind_method(D_METHOD("get_revision"), &PonSVGResource::get_revision);
+    ClassDB::bind_method(D_METHOD("get_content_revision", "symbol_id"), &PonSVGResource::get_content_revision);
+    
     // Getters
     ClassDB::bind_method(D_METHOD("get_svg_data"), &PonSVGResource::get_svg_data);
+    ClassDB::bind_method(D_METHOD("get_svg_buffer"), &PonSVGResource::get_svg_buffer);
+    ClassDB::bind_method(D_METHOD("set_compress_source", "enabled"), &PonSVGResource::set_compress_source);
+    ClassDB::bind_method(D_METHOD("is_compress_source"), &PonSVGResource::is_compress_source);
     ClassDB::bind_method(D_METHOD("get_symbols"), &PonSVGResource::get_symbols);
     ClassDB::bind_method(D_METHOD("get_fill_overrides"), &PonSVGResource::get_fill_overrides);
     ClassDB::bind_method(D_METHOD("get_stroke_overrides"), &PonSVGResource::get_stroke_overrides);
@@ -62,11 +102,18 @@ void PonSVGResource::_bind_methods() {
     ClassDB::bind_method(D_METHOD("rasterize_full", "size"), &PonSVGResource::rasterize_full);
     ClassDB::bind_method(D_METHOD("rasterize_symbol", "symbol_id", "size"), &PonSVGResource::rasterize_symbol);
     ClassDB::bind_method(D_METHOD("rasterize_element_with_shader", "element_id", "size", "shader"), &PonSVGResource::rasterize_element_with_shader);
+    ClassDB::bind_method(D_METHOD("rasterize_batch", "requests"), &PonSVGResource::rasterize_batch);
+    ClassDB::bind_method(D_METHOD("build_atlas", "symbol_ids", "size"), &PonSVGResource::build_atlas);
+    ClassDB::bind_method(D_METHOD("rasterize_symbol_async", "symbol_id", "size"), &PonSVGResource::rasterize_symbol_async);
+    ClassDB::bind_method(D_METHOD("rasterize_tiles", "size", "tile_size", "symbol_id"), &PonSVGResource::rasterize_tiles, DEFVAL(String()));
+    ClassDB::bind_method(D_METHOD("rasterize_region", "size", "region", "symbol_id"), &PonSVGResource::rasterize_region, DEFVAL(String()));
       // Cache management
     ClassDB::bind_method(D_METHOD("clear_cache"), &PonSVGResource::clear_cache);
     ClassDB::bind_method(D_METHOD("get_cache_size"), &PonSVGResource::get_cache_size);
     ClassDB::bind_method(D_METHOD("set_cache_enabled", "enabled"), &PonSVGResource::set_cache_enabled);
     ClassDB::bind_method(D_METHOD("is_cache_enabled"), &PonSVGResource::is_cache_enabled);
+    ClassDB::bind_static_method("PonSVGResource", D_METHOD("get_render_stats"), &PonSVGResource::get_render_stats);
+    ClassDB::bind_static_method("PonSVGResource", D_METHOD("reset_render_stats"), &PonSVGResource::reset_render_stats);
     
     // LOD system
     ClassDB::bind_method(D_METHOD("set_lod_enabled", "enabled"), &PonSVGResource::set_lod_enabled);
@@ -75,9 +122,28 @@ void PonSVGResource::_bind_methods() {
     ClassDB::bind_method(D_METHOD("get_lod_bias"), &PonSVGResource::get_lod_bias);
     ClassDB::bind_method(D_METHOD("calculate_lod_size", "requested_size"), &PonSVGResource::calculate_lod_size);
     
+    // Size buckets
+    ClassDB::bind_method(D_METHOD("set_size_bucket_mode", "mode"), &PonSVGResource::set_size_bucket_mode);
+    ClassDB::bind_method(D_METHOD("get_size_bucket_mode"), &PonSVGResource::get_size_bucket_mode);
+    ClassDB::bind_method(D_METHOD("set_size_bucket_step", "step"), &PonSVGResource::set_size_bucket_step);
+    ClassDB::bind_method(D_METHOD("get_size_bucket_step"), &PonSVGResource::get_size_bucket_step);
+    
+    ClassDB::bind_method(D_METHOD("set_premultiplied_output", "enabled"), &PonSVGResource::set_premultiplied_output);
+    ClassDB::bind_method(D_METHOD("is_premultiplied_output"), &PonSVGResource::is_premultiplied_output);
+    
+    ADD_SIGNAL(MethodInfo("rasterization_completed", PropertyInfo(Variant::INT, "request_id"), PropertyInfo(Variant::STRING, "symbol_id"), PropertyInfo(Variant::OBJECT, "image", PROPERTY_HINT_RESOURCE_TYPE, "Image")));
+    
+    BIND_ENUM_CONSTANT(SIZE_BUCKET_NONE);
+    BIND_ENUM_CONSTANT(SIZE_BUCKET_POWER_OF_TWO);
+    BIND_ENUM_CONSTANT(SIZE_BUCKET_STEP);
+    
     ADD_PROPERTY(PropertyInfo(Variant::BOOL, "cache_enabled"), "set_cache_enabled", "is_cache_enabled");
     ADD_PROPERTY(PropertyInfo(Variant::BOOL, "lod_enabled"), "set_lod_enabled", "is_lod_enabled");
     ADD_PROPERTY(PropertyInfo(Variant::FLOAT, "lod_bias", PROPERTY_HINT_RANGE, "0.1,4.0,0.1"), "set_lod_bias", "get_lod_bias");
+    ADD_PROPERTY(PropertyInfo(Variant::INT, "size_bucket_mode", PROPERTY_HINT_ENUM, "None,Power Of Two,Step"), "set_size_bucket_mode", "get_size_bucket_mode");
+    ADD_PROPERTY(PropertyInfo(Variant::INT, "size_bucket_step", PROPERTY_HINT_RANGE, "1,1024,1,suffix:px"), "set_size_bucket_step", "get_size_bucket_step");
+    ADD_PROPERTY(PropertyInfo(Variant::BOOL, "premultiplied_output"), "set_premultiplied_output", "is_premultiplied_output");
+    ADD_PROPERTY(PropertyInfo(Variant::BOOL, "compress_source"), "set_compress_source", "is_compress_source");
 }
 
 Error PonSVGResource::load_from_file(const String &p_path) {
@@ -87,10 +153,11 @@ Error PonSVGResource::load_from_file(const String &p_path) {
         return ERR_FILE_CANT_OPEN;
     }
     
-    String content = file->get_as_text();
+    // One read into one buffer, which the parser reads directly and the resource keeps as its source
+    PackedByteArray content = file->get_buffer(file->get_length());
     file->close();
     
-    return load_from_string(content);
+    return load_from_buffer(content);
 }
 
 Error PonSVGResource::load_from_string(const String &p_svg_string) {
@@ -99,138 +166,774 @@ Error PonSVGResource::load_from_string(const String &p_svg_string) {
         return ERR_INVALID_PARAMETER;
     }
     
-    svg_data = p_svg_string;
+    return load_from_buffer(p_svg_string.to_utf8_buffer());
+}
+
+Error PonSVGResource::load_from_buffer(const PackedByteArray &p_buffer) {
+    if (p_buffer.is_empty()) {
+        ERR_PRINT("SVG data is empty");
+        return ERR_INVALID_PARAMETER;
+    }
+    
+    baked_rasters.clear();
+    svg_source_size = p_buffer.size();
+    source_hash = PonSVGDocumentStore::hash_bytes(reinterpret_cast<const char *>(p_buffer.ptr()), p_buffer.size());
+    svg_source = compress_source ? p_buffer.compress(FileAccess::COMPRESSION_ZSTD) : p_buffer;
     _parse_svg();
-    _extract_symbols();
     
-    emit_changed();
+    _notify_changed();
     return OK;
 }
 
+PackedByteArray PonSVGResource::get_svg_buffer() const {
+    if (compress_source && !svg_source.is_empty()) {
+        return svg_source.decompress(svg_source_size, FileAccess::COMPRESSION_ZSTD);
+    }
+    return svg_source;
+}
+
+String PonSVGResource::get_svg_data() const {
+    return get_svg_buffer().get_string_from_utf8();
+}
+
+// The source is only read again when an override change needs a fresh copy of the document,
+// so it can be kept compressed in between
+void PonSVGResource::set_compress_source(bool p_enabled) {
+    if (compress_source == p_enabled) {
+        return;
+    }
+    PackedByteArray source = get_svg_buffer();
+    compress_source = p_enabled;
+    if (!source.is_empty()) {
+        svg_source = compress_source ? source.compress(FileAccess::COMPRESSION_ZSTD) : source;
+    }
+}
+
+std::unique_ptr<lunasvg::Document> PonSVGResource::_load_source_document() const {
+    PackedByteArray source = get_svg_buffer();
+    return LunaSVGIntegration::load_svg_from_data(source.ptr(), source.size());
+}
+
 void PonSVGResource::_parse_svg() {
-    document = LunaSVGIntegration::load_svg_from_string(svg_data);
-    if (!document) {
+    content_key = _compute_content_key();
+    _set_parsed(_build_document());
+}
+
+// Document for the current source and override state, parsed unless another resource already has it
+std::shared_ptr<PonSVGParsedDocument> PonSVGResource::_build_document() const {
+    // Reuse the document of any resource with identical source and overrides
+    std::shared_ptr<PonSVGParsedDocument> shared = PonSVGDocumentStore::find(content_key);
+    if (shared) {
+        return shared;
+    }
+    
+    std::shared_ptr<PonSVGParsedDocument> document_data = std::make_shared<PonSVGParsedDocument>();
+    PackedByteArray source = get_svg_buffer();
+    document_data->document = LunaSVGIntegration::load_svg_from_data(source.ptr(), source.size());
+    if (!document_data->document) {
         ERR_PRINT("Failed to parse SVG data");
-    } else {
+        return nullptr;
+    }
+    document_data->has_style_sheet = LunaSVGIntegration::has_style_sheet(source.ptr(), source.size());
+    
+    // Parsing diagnostics only in verbose mode: copy-on-write clones run this path on every shared override
+    if (OS::get_singleton()->is_stdout_verbose()) {
         print_line("PonSVGResource: Successfully parsed SVG document");
-        _apply_stored_overrides();
     }
+    // Not published yet, so the tree can be written without locking
+    document_data->content_key = content_key;
+    _index_elements(*document_data);
+    _apply_stored_overrides(*document_data);
+    _extract_symbols(*document_data);
+    _collect_referenced_ids(*document_data);
+    document_data->document->updateLayout();
+    return PonSVGDocumentStore::insert(content_key, document_data);
+}
+
+std::shared_ptr<PonSVGParsedDocument> PonSVGResource::_get_parsed() const {
+    std::lock_guard<std::mutex> lock(parsed_mutex);
+    if (parse_deferred) {
+        // Concurrent first snapshots wait here for the one parse
+        parse_deferred = false;
+        symbol_table.reset();
+        parsed = _build_document();
+    }
+    return parsed;
+}
+
+void PonSVGResource::_set_parsed(const std::shared_ptr<PonSVGParsedDocument> &p_parsed) {
+    std::lock_guard<std::mutex> lock(parsed_mutex);
+    parse_deferred = false;
+    symbol_table.reset();
+    parsed = p_parsed;
+}
+
+// Symbol data of a compiled file is known without parsing it
+std::shared_ptr<PonSVGParsedDocument> PonSVGResource::_get_symbol_table() const {
+    {
+        std::lock_guard<std::mutex> lock(parsed_mutex);
+        if (parse_deferred) {
+            return symbol_table;
+        }
+    }
+    return _get_parsed();
 }
 
-void PonSVGResource::_extract_symbols() {
-    symbols.clear();
+PackedByteArray PonSVGResource::compile(const Dictionary &p_baked_sizes) const {
+    std::shared_ptr<PonSVGParsedDocument> document = _get_parsed();
+    ERR_FAIL_COND_V_MSG(!document, PackedByteArray(), "SVG document not loaded");
     
-    if (!document) {
-        return;
+    Ref<StreamPeerBuffer> stream;
+    stream.instantiate();
+    stream->put_u32(COMPILED_MAGIC);
+    stream->put_u32(COMPILED_FORMAT_VERSION);
+    stream->put_u64(source_hash);
+    
+    // Symbol data comes from the document structure, which overrides never change
+    stream->put_u32(document->symbol_ids.size());
+    for (int i = 0; i < document->symbol_ids.size(); i++) {
+        const PonSVGSymbol *symbol = document->find_symbol(document->symbol_ids[i]);
+        stream->put_utf8_string(document->symbol_ids[i]);
+        stream->put_utf8_string(symbol->view_box);
+        stream->put_float(symbol->bounds.position.x);
+        stream->put_float(symbol->bounds.position.y);
+        stream->put_float(symbol->bounds.size.x);
+        stream->put_float(symbol->bounds.size.y);
+        stream->put_u32(symbol->dependencies.size());
+        for (const String &key : symbol->dependencies) {
+            stream->put_utf8_string(key);
+        }
+    }
+    
+    PackedByteArray source = get_svg_buffer();
+    PackedByteArray compressed = source.compress(FileAccess::COMPRESSION_ZSTD);
+    stream->put_u64(source.size());
+    stream->put_u64(compressed.size());
+    stream->put_data(compressed);
+    
+    // Baked rasters show the source without overrides, which is what a loaded file starts out as
+    Ref<PonSVGResource> baker;
+    if (!p_baked_sizes.is_empty()) {
+        baker.instantiate();
+        baker->set_cache_enabled(false);
+        baker->load_from_buffer(source);
+    }
+    Array symbol_ids = p_baked_sizes.keys();
+    Vector<String> content_ids;
+    Vector<Vector2i> sizes;
+    Vector<PackedByteArray> encoded;
+    for (int i = 0; i < symbol_ids.size(); i++) {
+        StringName symbol_id = symbol_ids[i];
+        Array symbol_sizes = p_baked_sizes[symbol_ids[i]];
+        if (!symbol_id.is_empty() && !document->find_symbol(symbol_id)) {
+            ERR_PRINT("Cannot bake unknown symbol: " + String(symbol_id));
+            continue;
+        }
+        for (int j = 0; j < symbol_sizes.size(); j++) {
+            Vector2i size = symbol_sizes[j];
+            Ref<Image> image = symbol_id.is_empty() ? baker->rasterize_full_with_alpha(size, premultiplied_output) : baker->rasterize_symbol_with_alpha(symbol_id, size, premultiplied_output);
+            if (image.is_null()) {
+                continue;
+            }
+            content_ids.push_back(symbol_id.is_empty() ? String("full_svg") : "symbol_" + String(symbol_id));
+            sizes.push_back(size);
+            encoded.push_back(image->save_webp_to_buffer(true));
+        }
+    }
+    stream->put_u32(encoded.size());
+    stream->put_u8(premultiplied_output ? 1 : 0);
+    for (int i = 0; i < encoded.size(); i++) {
+        stream->put_utf8_string(content_ids[i]);
+        stream->put_u32(sizes[i].x);
+        stream->put_u32(sizes[i].y);
+        stream->put_u64(encoded[i].size());
+        stream->put_data(encoded[i]);
+    }
+    return stream->get_data_array();
+}
+
+Error PonSVGResource::load_compiled(const PackedByteArray &p_data) {
+    Ref<StreamPeerBuffer> stream;
+    stream.instantiate();
+    stream->set_data_array(p_data);
+    ERR_FAIL_COND_V_MSG(p_data.size() < 16 || stream->get_u32() != COMPILED_MAGIC, ERR_FILE_UNRECOGNIZED, "Data is not a compiled PonSVG document");
+    uint32_t version = stream->get_u32();
+    ERR_FAIL_COND_V_MSG(version != COMPILED_FORMAT_VERSION, ERR_FILE_UNRECOGNIZED, vformat("Compiled PonSVG document has format version %d, expected %d; compile it again", version, COMPILED_FORMAT_VERSION));
+    uint64_t hash = stream->get_u64();
+    
+    std::shared_ptr<PonSVGParsedDocument> table = std::make_shared<PonSVGParsedDocument>();
+    uint32_t symbol_count = stream->get_u32();
+    for (uint32_t i = 0; i < symbol_count && stream->get_available_bytes() > 0; i++) {
+        String symbol_id = stream->get_utf8_string();
+        PonSVGSymbol symbol;
+        symbol.content_id = "symbol_" + symbol_id;
+        symbol.view_box = stream->get_utf8_string();
+        symbol.bounds.position.x = stream->get_float();
+        symbol.bounds.position.y = stream->get_float();
+        symbol.bounds.size.x = stream->get_float();
+        symbol.bounds.size.y = stream->get_float();
+        uint32_t dependency_count = stream->get_u32();
+        for (uint32_t j = 0; j < dependency_count; j++) {
+            symbol.dependencies.insert(stream->get_utf8_string());
+        }
+        table->symbols.insert(symbol_id, symbol);
+        table->symbol_ids.push_back(symbol_id);
+    }
+    
+    int64_t source_size = stream->get_u64();
+    int64_t compressed_size = stream->get_u64();
+    int64_t position = stream->get_position();
+    ERR_FAIL_COND_V_MSG(table->symbol_ids.size() != int64_t(symbol_count) || compressed_size <= 0 || position + compressed_size > p_data.size(), ERR_FILE_CORRUPT, "Compiled PonSVG document is truncated");
+    PackedByteArray compressed = p_data.slice(position, position + compressed_size);
+    stream->seek(position + compressed_size);
+    
+    // Lossless WebP keeps baked rasters small on disk and decodes far faster than a render
+    HashMap<String, Ref<Image>> baked;
+    Vector<String> baked_content_ids;
+    Vector<String> baked_cache_keys;
+    uint32_t baked_count = stream->get_u32();
+    bool baked_premultiplied = stream->get_u8() != 0;
+    for (uint32_t i = 0; i < baked_count; i++) {
+        String content_id = stream->get_utf8_string();
+        Vector2i size(stream->get_u32(), stream->get_u32());
+        int64_t encoded_size = stream->get_u64();
+        position = stream->get_position();
+        ERR_FAIL_COND_V_MSG(encoded_size <= 0 || position + encoded_size > p_data.size(), ERR_FILE_CORRUPT, "Compiled PonSVG document is truncated");
+        Ref<Image> image;
+        image.instantiate();
+        if (image->load_webp_from_buffer(p_data.slice(position, position + encoded_size)) == OK && image->get_size() == size) {
+            if (image->get_format() != Image::FORMAT_RGBA8) {
+                image->convert(Image::FORMAT_RGBA8);
+            }
+            String cache_key = _generate_cache_key(content_id, size, baked_premultiplied);
+            baked.insert(cache_key, image);
+            baked_content_ids.push_back(content_id);
+            baked_cache_keys.push_back(cache_key);
+        }
+        stream->seek(position + encoded_size);
+    }
+    
+    svg_source_size = source_size;
+    source_hash = hash;
+    svg_source = compress_source ? compressed : compressed.decompress(source_size, FileAccess::COMPRESSION_ZSTD);
+    ERR_FAIL_COND_V_MSG(svg_source.is_empty(), ERR_FILE_CORRUPT, "Compiled PonSVG document has a corrupt source");
+    content_key = _compute_content_key();
+    baked_rasters = baked;
+    // Bakes are always of the override-free state, even when this resource already has overrides
+    baked_key = _compute_base_content_key();
+    {
+        std::lock_guard<std::mutex> lock(parsed_mutex);
+        // Another resource may already have parsed the same content
+        parsed = PonSVGDocumentStore::find(content_key);
+        parse_deferred = !parsed;
+        symbol_table = parse_deferred ? table : nullptr;
+    }
+    
+    // Seed the shared cache so resources of the same content find the baked rasters too
+    PonSVGCacheManager *cache = PonSVGCacheManager::get_singleton();
+    if (cache_enabled && cache) {
+        for (int i = 0; i < baked_cache_keys.size(); i++) {
+            const Ref<Image> &image = baked_rasters[baked_cache_keys[i]];
+            cache->store_image(baked_key, baked_cache_keys[i], baked_content_ids[i], image->get_size(), image);
+        }
+    }
+    
+    _notify_changed();
+    return OK;
+}
+
+// A raster cached in memory or on disk serves a compiled file without parsing it
+Ref<Image> PonSVGResource::_find_raster_before_parse(const StringName &p_symbol_id, const Vector2i &p_size, bool p_premultiplied) const {
+    uint64_t key;
+    {
+        std::lock_guard<std::mutex> lock(parsed_mutex);
+        if (!parse_deferred || (!p_symbol_id.is_empty() && !symbol_table->find_symbol(p_symbol_id))) {
+            return Ref<Image>();
+        }
+        key = content_key;
+    }
+    if (p_size.x <= 0 || p_size.y <= 0) {
+        return Ref<Image>();
+    }
+    
+    Vector2i render_size = _get_bucket_size(calculate_lod_size(p_size));
+    String content_id = p_symbol_id.is_empty() ? String("full_svg") : "symbol_" + String(p_symbol_id);
+    Ref<Image> source = _find_cached_source(key, content_id, render_size, p_premultiplied);
+    if (source.is_valid() && source->get_size() != p_size) {
+        return LunaSVGIntegration::resample_image(source, p_size, p_premultiplied);
+    }
+    return source;
+}
+
+void PonSVGResource::_commit_document_edit() {
+    parsed->content_key = content_key;
+    parsed->patches = pending_patches;
+    if (pending_patches.is_empty()) {
+        // Not a plain repaint: the edit may have changed ids or added references
+        _index_elements(*parsed);
+        _collect_referenced_ids(*parsed);
+    }
+    pending_patches.clear();
+    parsed->document->updateLayout();
+}
+
+static void _index_element(const lunasvg::Element &p_element, PonSVGParsedDocument &r_parsed) {
+    String id = LunaSVGIntegration::get_element_attribute(p_element, "id");
+    // The first element with an id wins, as with getElementById
+    if (!id.is_empty() && !r_parsed.elements_by_id.has(id)) {
+        r_parsed.elements_by_id.insert(id, p_element);
+    }
+    
+    PackedStringArray class_names = LunaSVGIntegration::get_element_attribute(p_element, "class").split(" ", false);
+    if (!class_names.is_empty()) {
+        PonSVGClassMember member;
+        member.element = p_element;
+        member.id = id;
+        for (int i = 0; i < class_names.size(); i++) {
+            member.classes.push_back(class_names[i]);
+        }
+        for (int i = 0; i < member.classes.size(); i++) {
+            if (!r_parsed.elements_by_class.has(member.classes[i])) {
+                r_parsed.elements_by_class.insert(member.classes[i], Vector<PonSVGClassMember>());
+            }
+            r_parsed.elements_by_class[member.classes[i]].push_back(member);
+        }
+    }
+    
+    for (const auto& child : p_element.children()) {
+        if (child.isElement()) {
+            _index_element(child.toElement(), r_parsed);
+        }
+    }
+}
+
+void PonSVGResource::_index_elements(PonSVGParsedDocument &r_parsed) const {
+    r_parsed.elements_by_id.clear();
+    r_parsed.elements_by_class.clear();
+    _index_element(r_parsed.document->documentElement(), r_parsed);
+}
+
+// Elements that have every class of a ".a.b" (or ".a b") class key, in document order
+static Vector<PonSVGClassMember> _get_class_members(const PonSVGParsedDocument &p_parsed, const String &p_class_key) {
+    PackedStringArray class_names = p_class_key.substr(1).replace(".", " ").split(" ", false);
+    if (class_names.is_empty()) {
+        return Vector<PonSVGClassMember>();
+    }
+    
+    // Start from the smallest class and keep the members that have the others too
+    const Vector<PonSVGClassMember> *smallest = nullptr;
+    for (int i = 0; i < class_names.size(); i++) {
+        const Vector<PonSVGClassMember> *members = p_parsed.elements_by_class.getptr(class_names[i]);
+        if (!members) {
+            return Vector<PonSVGClassMember>();
+        }
+        if (!smallest || members->size() < smallest->size()) {
+            smallest = members;
+        }
+    }
+    if (class_names.size() == 1) {
+        return *smallest;
     }
     
+    Vector<StringName> required;
+    for (int i = 0; i < class_names.size(); i++) {
+        required.push_back(class_names[i]);
+    }
+    Vector<PonSVGClassMember> result;
+    for (int i = 0; i < smallest->size(); i++) {
+        const PonSVGClassMember &member = (*smallest)[i];
+        bool matches = true;
+        for (int j = 0; j < required.size() && matches; j++) {
+            matches = member.classes.has(required[j]);
+        }
+        if (matches) {
+            result.push_back(member);
+        }
+    }
+    return result;
+}
+
+void PonSVGResource::_extract_symbols(PonSVGParsedDocument &r_parsed) const {
+    r_parsed.symbols.clear();
+    r_parsed.symbol_ids.clear();
+    
     // Query for all symbol elements
-    Vector<lunasvg::Element> symbol_elements = LunaSVGIntegration::query_elements(document.get(), "symbol");
+    Vector<lunasvg::Element> symbol_elements = LunaSVGIntegration::query_elements(r_parsed.document.get(), "symbol");
     
     for (const auto& element : symbol_elements) {
         // Get the ID attribute
         String symbol_id = LunaSVGIntegration::get_element_attribute(element, "id");
         
-        if (!symbol_id.is_empty()) {
-            Dictionary symbol_data;
-            
-            // Store element reference (as pointer for internal use)
-            symbol_data["has_element"] = true;
-            
-            // Get viewBox if available
-            String viewbox = LunaSVGIntegration::get_element_attribute(element, "viewBox");
-            if (!viewbox.is_empty()) {
-                symbol_data["viewBox"] = viewbox;
-            }
+        if (!symbol_id.is_empty() && !r_parsed.symbols.has(symbol_id)) {
+            PonSVGSymbol symbol;
+            symbol.element = element;
+            symbol.content_id = "symbol_" + symbol_id;
+            symbol.view_box = LunaSVGIntegration::get_element_attribute(element, "viewBox");
             
             // Calculate bounding box
             lunasvg::Box bbox = element.getBoundingBox();
-            Rect2 bounds(bbox.x, bbox.y, bbox.w, bbox.h);
-            symbol_data["bounds"] = bounds;
+            symbol.bounds = Rect2(bbox.x, bbox.y, bbox.w, bbox.h);
+            
+            // Record which override keys can change this symbol's raster
+            HashSet<String> visited;
+            _collect_dependencies(r_parsed, element, symbol.dependencies, visited);
             
-            symbols[symbol_id] = symbol_data;
-            print_line("Found symbol with ID: " + symbol_id);
+            r_parsed.symbols.insert(symbol_id, symbol);
+            r_parsed.symbol_ids.push_back(symbol_id);
+            if (OS::get_singleton()->is_stdout_verbose()) {
+                print_line("Found symbol with ID: " + symbol_id);
+            }
         }
     }
     
-    print_line("PonSVGResource: Extracted " + String::num_int64(symbols.size()) + " symbols");
+    if (OS::get_singleton()->is_stdout_verbose()) {
+        print_line("PonSVGResource: Extracted " + String::num_int64(r_parsed.symbols.size()) + " symbols");
+    }
 }
 
-PackedStringArray PonSVGResource::get_symbol_ids() const {
-    PackedStringArray ids;
-    Array keys = symbols.keys();
-    for (int i = 0; i < keys.size(); i++) {
-        ids.push_back(keys[i]);
+static Dictionary _get_symbol_dictionary(const PonSVGSymbol &p_symbol) {
+    Dictionary symbol_data;
+    symbol_data["has_element"] = true;
+    if (!p_symbol.view_box.is_empty()) {
+        symbol_data["viewBox"] = p_symbol.view_box;
+    }
+    symbol_data["bounds"] = p_symbol.bounds;
+    return symbol_data;
+}
+
+static const char *REFERENCE_ATTRIBUTES[] = { "href", "xlink:href", "fill", "stroke", "clip-path", "mask", "filter", "marker-start", "marker-mid", "marker-end" };
+
+// Extracts "id" from "#id" or "url(#id)" style references, empty if not a local reference
+static String _extract_reference_id(const String &p_value) {
+    if (p_value.begins_with("#")) {
+        return p_value.substr(1);
+    }
+    
+    int start = p_value.find("url(#");
+    if (start < 0) {
+        return String();
+    }
+    start += 5;
+    int end = p_value.find(")", start);
+    if (end < 0) {
+        return String();
     }
-    return ids;
+    return p_value.substr(start, end - start).strip_edges();
 }
 
-bool PonSVGResource::has_symbol(const String &p_id) const {
-    return symbols.has(p_id);
+void PonSVGResource::_collect_dependencies(const PonSVGParsedDocument &p_parsed, const lunasvg::Element &p_element, HashSet<String> &r_dependencies, HashSet<String> &r_visited) const {
+    if (p_element.isNull()) {
+        return;
+    }
+    
+    String element_id = LunaSVGIntegration::get_element_attribute(p_element, "id");
+    if (!element_id.is_empty()) {
+        // Guards against reference cycles and re-walking shared definitions
+        if (r_visited.has(element_id)) {
+            return;
+        }
+        r_visited.insert(element_id);
+        r_dependencies.insert(element_id);
+    }
+    
+    // Class overrides are keyed by the full class attribute as well as by each class name
+    String element_class = LunaSVGIntegration::get_element_attribute(p_element, "class");
+    if (!element_class.is_empty()) {
+        r_dependencies.insert("." + element_class);
+        PackedStringArray class_names = element_class.split(" ", false);
+        for (int i = 0; i < class_names.size(); i++) {
+            r_dependencies.insert("." + class_names[i]);
+        }
+    }
+    
+    // Follow references into content defined elsewhere (use, gradients, clip paths, masks, filters, markers)
+    for (const char *attribute : REFERENCE_ATTRIBUTES) {
+        String reference_id = _extract_reference_id(LunaSVGIntegration::get_element_attribute(p_element, attribute));
+        if (!reference_id.is_empty()) {
+            _collect_dependencies(p_parsed, p_parsed.find_element(reference_id), r_dependencies, r_visited);
+        }
+    }
+    
+    for (const auto& child : p_element.children()) {
+        if (child.isElement()) {
+            _collect_dependencies(p_parsed, child.toElement(), r_dependencies, r_visited);
+        }
+    }
 }
 
-Dictionary PonSVGResource::get_symbol_data(const String &p_id) const {
-    if (!has_symbol(p_id)) {
-        return Dictionary();
+static void _collect_references(const lunasvg::Element &p_element, HashSet<String> &r_ids) {
+    for (const char *attribute : REFERENCE_ATTRIBUTES) {
+        String reference_id = _extract_reference_id(LunaSVGIntegration::get_element_attribute(p_element, attribute));
+        if (!reference_id.is_empty()) {
+            r_ids.insert(reference_id);
+        }
+    }
+    
+    for (const auto& child : p_element.children()) {
+        if (child.isElement()) {
+            _collect_references(child.toElement(), r_ids);
+        }
     }
-    return symbols[p_id];
 }
 
-void PonSVGResource::override_fill(const String &p_element_id, const Color &p_color) {
-    fill_overrides[p_element_id] = p_color;
+void PonSVGResource::_collect_referenced_ids(PonSVGParsedDocument &r_parsed) const {
+    r_parsed.referenced_ids.clear();
+    _collect_references(r_parsed.document->documentElement(), r_parsed.referenced_ids);
+}
+
+// Union of the areas painted by the elements an override key targets.
+// Returns false when the change is not confined to those areas.
+bool PonSVGResource::_get_override_bounds(const PonSVGParsedDocument &p_parsed, const String &p_override_key, Rect2 &r_bounds) const {
+    // Without resolving the cascade, a sheet could widen any element's stroke
+    if (p_parsed.has_style_sheet) {
+        return false;
+    }
+    Vector<lunasvg::Element> elements;
+    if (p_override_key.begins_with(".")) {
+        Vector<PonSVGClassMember> members = _get_class_members(p_parsed, p_override_key);
+        for (int i = 0; i < members.size(); i++) {
+            elements.push_back(members[i].element);
+        }
+    } else {
+        lunasvg::Element element = p_parsed.find_element(p_override_key);
+        if (element.isNull()) {
+            // Nothing in the document carries the id, so nothing repaints
+            r_bounds = Rect2();
+            return true;
+        }
+        elements.push_back(element);
+    }
     
-    // Apply the override immediately if document is loaded
-    if (document) {
-        lunasvg::Element element = LunaSVGIntegration::find_element_by_id(document.get(), p_element_id);
-        if (!element.isNull()) {
-            LunaSVGIntegration::apply_fill_color(element, p_color);
+    r_bounds = Rect2();
+    for (int i = 0; i < elements.size(); i++) {
+        Rect2 element_bounds;
+        if (!LunaSVGIntegration::get_element_paint_bounds(elements[i], p_parsed.referenced_ids, element_bounds)) {
+            return false;
         }
+        r_bounds = r_bounds.has_area() ? r_bounds.merge(element_bounds) : element_bounds;
+    }
+    return true;
+}
+
+// Order-independent hash so equal override sets match regardless of the order they were applied in
+static uint64_t _hash_overrides(const Dictionary &p_overrides) {
+    uint64_t hash = 0;
+    Array keys = p_overrides.keys();
+    for (int i = 0; i < keys.size(); i++) {
+        Variant value = p_overrides[keys[i]];
+        uint64_t value_hash = value.get_type() == Variant::DICTIONARY ? _hash_overrides(value) : value.hash();
+        hash += PonSVGDocumentStore::hash_combine(keys[i].hash(), value_hash);
+    }
+    return hash;
+}
+
+uint64_t PonSVGResource::_compute_content_key() const {
+    // Shader overrides are applied after rasterization and do not change the document
+    uint64_t key = source_hash;
+    key = PonSVGDocumentStore::hash_combine(key, _hash_overrides(fill_overrides));
+    key = PonSVGDocumentStore::hash_combine(key, _hash_overrides(stroke_overrides));
+    key = PonSVGDocumentStore::hash_combine(key, _hash_overrides(css_overrides));
+    return key;
+}
+
+uint64_t PonSVGResource::_compute_base_content_key() const {
+    uint64_t no_overrides = _hash_overrides(Dictionary());
+    uint64_t key = source_hash;
+    key = PonSVGDocumentStore::hash_combine(key, no_overrides);
+    key = PonSVGDocumentStore::hash_combine(key, no_overrides);
+    key = PonSVGDocumentStore::hash_combine(key, no_overrides);
+    return key;
+}
+
+HashSet<String> PonSVGResource::_get_dependent_contents(const String &p_override_key) const {
+    // The full document depends on every element; symbols only on their own subtree
+    HashSet<String> affected;
+    affected.insert("full_svg");
+    if (!parsed) {
+        return affected;
     }
     
-    // Invalidate cache
-    needs_cache_clear = true;
-    emit_changed();
+    for (const KeyValue<StringName, PonSVGSymbol> &E : parsed->symbols) {
+        if (E.value.dependencies.has(p_override_key)) {
+            affected.insert(E.value.content_id);
+        }
+    }
+    return affected;
 }
 
-void PonSVGResource::override_stroke(const String &p_element_id, const Color &p_color) {
-    stroke_overrides[p_element_id] = p_color;
+// Moves the resource to the document and rasters of its new override state.
+// Removed overrides need the original attribute values, which only a re-parse brings back.
+// Returns true when the caller should apply the change to the current document in place,
+// false when the document already reflects it (shared, or re-parsed with all overrides).
+bool PonSVGResource::_update_content_key(const PendingOverrides &p_changes) {
+    uint64_t old_key = content_key;
+    {
+        // A deferred parse reads the key under this lock and picks up the new state when it happens
+        std::lock_guard<std::mutex> lock(parsed_mutex);
+        content_key = _compute_content_key();
+        if (parse_deferred) {
+            return false;
+        }
+    }
+    if (!parsed || content_key == old_key) {
+        return false;
+    }
     
-    // Apply the override immediately if document is loaded
-    if (document) {
-        lunasvg::Element element = LunaSVGIntegration::find_element_by_id(document.get(), p_element_id);
-        if (!element.isNull()) {
-            LunaSVGIntegration::apply_stroke_color(element, p_color);
+    bool was_shared = parsed.use_count() > 1;
+    bool mutate_in_place = false;
+    
+    // A repaint leaves the geometry alone, so the old tree tells where the new state differs
+    Vector<PonSVGDocumentPatch> patches;
+    if (p_changes.paint_only && !p_changes.all) {
+        std::shared_lock<std::shared_mutex> lock(parsed->mutex);
+        PonSVGDocumentPatch patch;
+        patch.base_key = old_key;
+        bool bounded = true;
+        for (const String &key : p_changes.keys) {
+            Rect2 key_bounds;
+            if (!_get_override_bounds(*parsed, key, key_bounds)) {
+                bounded = false;
+                break;
+            }
+            if (key_bounds.has_area()) {
+                patch.dirty_bounds = patch.dirty_bounds.has_area() ? patch.dirty_bounds.merge(key_bounds) : key_bounds;
+            }
+        }
+        if (bounded) {
+            patches.push_back(patch);
+            for (int i = 0; i < parsed->patches.size() && patches.size() < MAX_PATCH_HISTORY; i++) {
+                patches.push_back(parsed->patches[i]);
+            }
         }
     }
     
-    // Invalidate cache
-    needs_cache_clear = true;
-    emit_changed();
+    std::shared_ptr<PonSVGParsedDocument> existing = PonSVGDocumentStore::find(content_key);
+    if (existing) {
+        // Another resource already renders this exact state
+        _set_parsed(existing);
+    } else if (!was_shared && !p_changes.all && !p_changes.reparse) {
+        PonSVGDocumentStore::rekey(old_key, content_key, parsed);
+        pending_patches = patches;
+        mutate_in_place = true;
+    } else {
+        // Copy-on-write: other resources still render the previous state, or the change
+        // removes an override and the original attribute values are needed again
+        std::shared_ptr<PonSVGParsedDocument> detached = std::make_shared<PonSVGParsedDocument>();
+        detached->document = _load_source_document();
+        ERR_FAIL_COND_V_MSG(!detached->document, false, "Failed to re-parse SVG data for override change");
+        detached->content_key = content_key;
+        detached->patches = patches;
+        detached->has_style_sheet = parsed->has_style_sheet;
+        _index_elements(*detached);
+        // Same structure, so the symbol table carries over with handles into the new tree
+        detached->symbols = parsed->symbols;
+        detached->symbol_ids = parsed->symbol_ids;
+        for (KeyValue<StringName, PonSVGSymbol> &E : detached->symbols) {
+            E.value.element = detached->find_element(E.key);
+        }
+        _apply_stored_overrides(*detached);
+        _collect_referenced_ids(*detached);
+        detached->document->updateLayout();
+        // Renders still holding the previous document finish against the state they started with
+        _set_parsed(PonSVGDocumentStore::insert(content_key, detached));
+    }
+    
+    // Carry over the rasters this change cannot affect; move them when nobody renders the old state anymore.
+    // Full rasters of the old state stay behind when the new one can be patched from them.
+    PonSVGCacheManager *cache = PonSVGCacheManager::get_singleton();
+    HashSet<String> affected;
+    if (!p_changes.all) {
+        for (const String &key : p_changes.keys) {
+            for (const String &content_id : _get_dependent_contents(key)) {
+                affected.insert(content_id);
+                changed_contents.insert(content_id);
+            }
+        }
+    }
+    if (cache && !p_changes.all) {
+        HashSet<String> retained;
+        if (!patches.is_empty()) {
+            retained.insert("full_svg");
+        }
+        cache->migrate_owner(old_key, content_key, affected, !was_shared, retained);
+    } else if (cache && !was_shared) {
+        // Every content changed, so nothing carries over; rasters of a state nobody renders anymore go now
+        cache->clear_owner(old_key);
+    }
+    
+    return mutate_in_place;
+}
+
+// Symbol data never changes after a document is published, so queries only need a snapshot
+PackedStringArray PonSVGResource::get_symbol_ids() const {
+    std::shared_ptr<PonSVGParsedDocument> document = _get_symbol_table();
+    return document ? document->symbol_ids : PackedStringArray();
+}
+
+bool PonSVGResource::has_symbol(const StringName &p_id) const {
+    std::shared_ptr<PonSVGParsedDocument> document = _get_symbol_table();
+    return document && document->find_symbol(p_id);
+}
+
+Dictionary PonSVGResource::get_symbol_data(const StringName &p_id) const {
+    std::shared_ptr<PonSVGParsedDocument> document = _get_symbol_table();
+    const PonSVGSymbol *symbol = document ? document->find_symbol(p_id) : nullptr;
+    return symbol ? _get_symbol_dictionary(*symbol) : Dictionary();
+}
+
+Dictionary PonSVGResource::get_symbols() const {
+    Dictionary symbols;
+    std::shared_ptr<PonSVGParsedDocument> document = _get_symbol_table();
+    if (!document) {
+        return symbols;
+    }
+    for (int i = 0; i < document->symbol_ids.size(); i++) {
+        symbols[document->symbol_ids[i]] = _get_symbol_dictionary(*document->find_symbol(document->symbol_ids[i]));
+    }
+    return symbols;
+}
+
+PackedStringArray PonSVGResource::get_symbol_dependencies(const StringName &p_id) const {
+    PackedStringArray result;
+    std::shared_ptr<PonSVGParsedDocument> document = _get_symbol_table();
+    const PonSVGSymbol *symbol = document ? document->find_symbol(p_id) : nullptr;
+    if (symbol) {
+        for (const String &key : symbol->dependencies) {
+            result.push_back(key);
+        }
+    }
+    return result;
+}
+
+// Setters record the change; outside a transaction it is applied and announced right away
+void PonSVGResource::override_fill(const String &p_element_id, const Color &p_color) {
+    fill_overrides[p_element_id] = p_color;
+    _queue_override_change(p_element_id);
+}
+
+void PonSVGResource::override_stroke(const String &p_element_id, const Color &p_color) {
+    stroke_overrides[p_element_id] = p_color;
+    _queue_override_change(p_element_id);
 }
 
 void PonSVGResource::override_shader(const String &p_element_id, Ref<Shader> p_shader) {
     shader_overrides[p_element_id] = p_shader;
-    // Invalidate cache
-    needs_cache_clear = true;
-    emit_changed();
+    _notify_changed();
 }
 
 void PonSVGResource::clear_fill_override(const String &p_element_id) {
     fill_overrides.erase(p_element_id);
-    needs_cache_clear = true;
-    emit_changed();
+    _queue_override_change(p_element_id, true, true);
 }
 
 void PonSVGResource::clear_stroke_override(const String &p_element_id) {
     stroke_overrides.erase(p_element_id);
-    needs_cache_clear = true;
-    emit_changed();
+    _queue_override_change(p_element_id, true, true);
 }
 
 void PonSVGResource::clear_shader_override(const String &p_element_id) {
     shader_overrides.erase(p_element_id);
-    needs_cache_clear = true;
-    emit_changed();
+    _notify_changed();
 }
 
 void PonSVGResource::clear_all_overrides() {
@@ -238,28 +941,24 @@ void PonSVGResource::clear_all_overrides() {
     stroke_overrides.clear();
     shader_overrides.clear();
     css_overrides.clear();
-    needs_cache_clear = true;
-    emit_changed();
+    _queue_override_change(String(), false, true);
 }
 
 // Class-based override implementations
 void PonSVGResource::override_fill_by_class(const String &p_class_name, const Color &p_color) {
     String class_key = "." + p_class_name;
     fill_overrides[class_key] = p_color;
-    needs_cache_clear = true;
-    emit_changed();
+    _queue_override_change(class_key);
 }
 
 void PonSVGResource::override_stroke_by_class(const String &p_class_name, const Color &p_color) {
     String class_key = "." + p_class_name;
     stroke_overrides[class_key] = p_color;
-    needs_cache_clear = true;
-    emit_changed();
+    _queue_override_change(class_key);
 }
 
 void PonSVGResource::override_css_property(const String &p_element_id, const String &p_property, const String &p_value) {
     // Store CSS properties in a separate dictionary for more flexible styling
-    String css_key = p_element_id + String("::") + p_property;
     if (!css_overrides.has(p_element_id)) {
         css_overrides[p_element_id] = Dictionary();
     }
@@ -267,70 +966,217 @@ void PonSVGResource::override_css_property(const String &p_element_id, const Str
     element_css[p_property] = p_value;
     css_overrides[p_element_id] = element_css;
     
-    needs_cache_clear = true;
+    // Any property may move or resize the element, so the change is not confined to its old area
+    _queue_override_change(p_element_id, false);
+}
+
+void PonSVGResource::begin_overrides() {
+    override_batch_depth++;
+}
+
+void PonSVGResource::commit_overrides() {
+    ERR_FAIL_COND_MSG(override_batch_depth == 0, "commit_overrides() called without begin_overrides()");
+    override_batch_depth--;
+    if (override_batch_depth == 0 && (change_pending || pending_overrides.all || !pending_overrides.keys.is_empty())) {
+        _flush_override_changes();
+    }
+}
+
+// {"fill": {key: Color}, "stroke": {key: Color}, "css": {element_id: {property: value}}}.
+// Keys are element ids or ".class" keys; a null color clears that override.
+void PonSVGResource::apply_overrides(const Dictionary &p_overrides) {
+    begin_overrides();
+    
+    static const char *paint_kinds[] = { "fill", "stroke" };
+    for (const char *kind : paint_kinds) {
+        Dictionary paints = p_overrides.get(kind, Dictionary());
+        bool stroke = String(kind) == "stroke";
+        Array keys = paints.keys();
+        for (int i = 0; i < keys.size(); i++) {
+            String key = keys[i];
+            Variant value = paints[keys[i]];
+            if (value.get_type() == Variant::NIL) {
+                if (stroke) {
+                    clear_stroke_override(key);
+                } else {
+                    clear_fill_override(key);
+                }
+            } else if (key.begins_with(".")) {
+                if (stroke) {
+                    override_stroke_by_class(key.substr(1), value);
+                } else {
+                    override_fill_by_class(key.substr(1), value);
+                }
+            } else if (stroke) {
+                override_stroke(key, value);
+            } else {
+                override_fill(key, value);
+            }
+        }
+    }
+    
+    Dictionary css = p_overrides.get("css", Dictionary());
+    Array element_ids = css.keys();
+    for (int i = 0; i < element_ids.size(); i++) {
+        Dictionary properties = css[element_ids[i]];
+        Array names = properties.keys();
+        for (int j = 0; j < names.size(); j++) {
+            override_css_property(element_ids[i], names[j], properties[names[j]]);
+        }
+    }
+    
+    commit_overrides();
+}
+
+uint64_t PonSVGResource::get_revision() const {
+    return revision;
+}
+
+uint64_t PonSVGResource::get_content_revision(const StringName &p_symbol_id) const {
+    String content_id = p_symbol_id.is_empty() ? String("full_svg") : "symbol_" + String(p_symbol_id);
+    const uint64_t *content_revision = content_revisions.getptr(content_id);
+    return content_revision ? MAX(*content_revision, all_contents_revision) : all_contents_revision;
+}
+
+void PonSVGResource::_queue_override_change(const String &p_key, bool p_paint_only, bool p_reparse) {
+    if (p_key.is_empty()) {
+        pending_overrides.all = true;
+    } else {
+        pending_overrides.keys.insert(p_key);
+    }
+    pending_overrides.paint_only = pending_overrides.paint_only && p_paint_only;
+    pending_overrides.reparse = pending_overrides.reparse || p_reparse;
+    
+    if (override_batch_depth == 0) {
+        _flush_override_changes();
+    }
+}
+
+// Brings the document up to date with every queued change in one pass and announces it once
+void PonSVGResource::_flush_override_changes() {
+    PendingOverrides changes = pending_overrides;
+    pending_overrides = PendingOverrides();
+    
+    if ((changes.all || !changes.keys.is_empty()) && _update_content_key(changes)) {
+        std::unique_lock<std::shared_mutex> lock(parsed->mutex);
+        for (const String &key : changes.keys) {
+            _apply_key_overrides(*parsed, key);
+        }
+        _commit_document_edit();
+    }
+    
+    _notify_changed(!changes.all);
+}
+
+// Every change to what renders produce goes through here, so the revision counts them all
+void PonSVGResource::_notify_changed(bool p_contents_recorded) {
+    all_contents_changed = all_contents_changed || !p_contents_recorded;
+    if (override_batch_depth > 0) {
+        change_pending = true;
+        return;
+    }
+    change_pending = false;
+    revision++;
+    // Without a record of what changed (a reload, a new alpha mode, an override that skipped the key update) everything did
+    if (all_contents_changed || changed_contents.is_empty()) {
+        all_contents_revision = revision;
+    } else {
+        for (const String &content_id : changed_contents) {
+            content_revisions[content_id] = revision;
+        }
+    }
+    changed_contents.clear();
+    all_contents_changed = false;
     emit_changed();
 }
 
 void PonSVGResource::_clear_cache() const {
-    cache_entries.clear();
-    needs_cache_clear = false;
+    PonSVGCacheManager *cache = PonSVGCacheManager::get_singleton();
+    if (cache) {
+        cache->clear_owner(content_key);
+    }
 }
 
-String PonSVGResource::_generate_cache_key(const String &p_content_id, const Vector2i &p_size) const {
+String PonSVGResource::_generate_cache_key(const String &p_content_id, const Vector2i &p_size, bool p_premultiplied) const {
+    // Override state is not part of the key: overrides invalidate the affected entries directly
     String key = p_content_id + String("_") + String::num_int64(p_size.x) + String("x") + String::num_int64(p_size.y);
-      // Include override hashes in cache key
-    if (fill_overrides.size() > 0 || stroke_overrides.size() > 0 || shader_overrides.size() > 0 || css_overrides.size() > 0) {        key += String("_overrides_") + String::num_int64(fill_overrides.hash()) + 
-               String("_") + String::num_int64(stroke_overrides.hash()) +
-               String("_") + String::num_int64(shader_overrides.hash()) +
-               String("_") + String::num_int64(css_overrides.hash());
-    }
-    
-    return key;
+    return p_premultiplied ? key + String("_pm") : key;
 }
 
-Ref<Image> PonSVGResource::_get_cached_image(const String &p_cache_key, const Vector2i &p_size) const {
+Ref<Image> PonSVGResource::_get_cached_image(uint64_t p_owner, const String &p_cache_key, const String &p_content_id, const Vector2i &p_size) const {
+    // Baked rasters stay with the resource, so cache eviction never sends them back to LunaSVG
+    const Ref<Image> *baked = p_owner == baked_key ? baked_rasters.getptr(p_cache_key) : nullptr;
+    if (baked) {
+        PonSVGRenderStats::record_cache_hit();
+        return *baked;
+    }
+    
     if (!cache_enabled) {
         return Ref<Image>();
     }
     
-    if (needs_cache_clear) {
-        _clear_cache();
-    }
-      if (cache_entries.has(p_cache_key)) {
-        Dictionary entry = cache_entries[p_cache_key];
-        bool is_dirty = entry.get("is_dirty", true);
-        Vector2i size = entry.get("size", Vector2i());
-        Ref<Image> image = entry.get("image", Ref<Image>());
-        
-        if (!is_dirty && size == p_size && image.is_valid()) {
-            return image;
-        }
+    PonSVGCacheManager *cache = PonSVGCacheManager::get_singleton();
+    if (!cache) {
+        return Ref<Image>();
     }
     
+    Ref<Image> image = cache->get_image(p_owner, p_cache_key, p_size);
+    if (image.is_valid()) {
+        PonSVGRenderStats::record_cache_hit();
+        return image;
+    }
+
+    // Fall back to the persistent cache and promote hits into memory. Like _store_cached_image, only the
+    // override-free state is looked up there: override states are never persisted, and only they get patched
+    if (p_owner == _compute_base_content_key()) {
+        image = cache->load_disk_image(p_owner, p_cache_key);
+    }
+    if (image.is_valid() && image->get_size() == p_size) {
+        cache->store_image(p_owner, p_cache_key, p_content_id, p_size, image);
+        PonSVGRenderStats::record_cache_hit();
+        return image;
+    }
+    PonSVGRenderStats::record_cache_miss();
     return Ref<Image>();
 }
 
-void PonSVGResource::_store_cached_image(const String &p_cache_key, const Vector2i &p_size, const Ref<Image> &p_image) const {
+void PonSVGResource::_store_cached_image(uint64_t p_owner, const String &p_cache_key, const String &p_content_id, const Vector2i &p_size, const Ref<Image> &p_image, bool p_full_render) const {
     if (!cache_enabled) {
         return;
     }
-      Dictionary entry;
-    entry["image"] = p_image;
-    entry["size"] = p_size;
-    entry["cache_key"] = p_cache_key;
-    entry["timestamp"] = Time::get_singleton()->get_ticks_msec();
-    entry["is_dirty"] = false;
     
-    cache_entries[p_cache_key] = entry;
+    PonSVGCacheManager *cache = PonSVGCacheManager::get_singleton();
+    if (cache) {
+        cache->store_image(p_owner, p_cache_key, p_content_id, p_size, p_image);
+        // Override states are transient and patched rasters are derived from a cached render
+        if (p_full_render && p_owner == _compute_base_content_key()) {
+            cache->store_disk_image(p_owner, p_cache_key, p_image);
+        }
+    }
 }
 
 void PonSVGResource::clear_cache() {
     _clear_cache();
-    emit_changed();
+    _notify_changed();
 }
 
-int PonSVGResource::get_cache_size() const {
-    return cache_entries.size();
+Dictionary PonSVGResource::get_cache_size() const {
+    Dictionary result;
+    result["entries"] = 0;
+    result["bytes"] = 0;
+    
+    PonSVGCacheManager *cache = PonSVGCacheManager::get_singleton();
+    if (!cache) {
+        return result;
+    }
+    
+    // Usage of this content (shared with identical resources) plus the global picture
+    result["entries"] = cache->get_owner_entry_count(content_key);
+    result["bytes"] = cache->get_owner_memory_usage(content_key);
+    result["total_entries"] = cache->get_entry_count();
+    result["total_bytes"] = cache->get_memory_usage();
+    result["budget_bytes"] = cache->get_memory_budget();
+    return result;
 }
 
 void PonSVGResource::set_cache_enabled(bool p_enabled) {
@@ -344,97 +1190,486 @@ bool PonSVGResource::is_cache_enabled() const {
     return cache_enabled;
 }
 
-// Enhanced rasterization with caching and LOD support
+Dictionary PonSVGResource::get_render_stats() {
+    return PonSVGRenderStats::get_stats();
+}
+
+void PonSVGResource::reset_render_stats() {
+    PonSVGRenderStats::reset();
+}
+
+// Rasterization with caching, LOD and size buckets
 Ref<Image> PonSVGResource::rasterize_full(const Vector2i &p_size) const {
-    ERR_FAIL_COND_V_MSG(document == nullptr, Ref<Image>(), "SVG document not loaded");
+    return rasterize_full_with_alpha(p_size, premultiplied_output);
+}
+
+Ref<Image> PonSVGResource::rasterize_symbol(const StringName &p_symbol_id, const Vector2i &p_size) const {
+    return rasterize_symbol_with_alpha(p_symbol_id, p_size, premultiplied_output);
+}
+
+Ref<Image> PonSVGResource::rasterize_full_with_alpha(const Vector2i &p_size, bool p_premultiplied) const {
+    Ref<Image> cached = _find_raster_before_parse(StringName(), p_size, p_premultiplied);
+    if (cached.is_valid()) {
+        return cached;
+    }
+    std::shared_ptr<PonSVGParsedDocument> document = _get_parsed();
+    ERR_FAIL_COND_V_MSG(!document, Ref<Image>(), "SVG document not loaded");
     ERR_FAIL_COND_V_MSG(p_size.x <= 0 || p_size.y <= 0, Ref<Image>(), "Invalid size for rasterization");
-    
-    // Apply LOD if enabled
-    Vector2i actual_size = calculate_lod_size(p_size);
-    
-    String cache_key = _generate_cache_key("full_svg", actual_size);
-    Ref<Image> cached = _get_cached_image(cache_key, actual_size);
+
+    return _rasterize_content(document, nullptr, p_size, p_premultiplied);
+}
+
+Ref<Image> PonSVGResource::rasterize_symbol_with_alpha(const StringName &p_symbol_id, const Vector2i &p_size, bool p_premultiplied) const {
+    Ref<Image> cached = _find_raster_before_parse(p_symbol_id, p_size, p_premultiplied);
     if (cached.is_valid()) {
-        // If LOD changed the size, scale the cached image to requested size
-        if (actual_size != p_size && cached.is_valid()) {
-            cached = cached->duplicate();
-            cached->resize(p_size.x, p_size.y, Image::INTERPOLATE_LANCZOS);
-        }
         return cached;
     }
-    
-    Ref<Image> result = LunaSVGIntegration::rasterize_document(document.get(), actual_size);
-    if (result.is_valid()) {
-        _store_cached_image(cache_key, actual_size, result);
-        
-        // Scale to requested size if needed
-        if (actual_size != p_size) {
-            result = result->duplicate();
-            result->resize(p_size.x, p_size.y, Image::INTERPOLATE_LANCZOS);
+    std::shared_ptr<PonSVGParsedDocument> document = _get_parsed();
+    ERR_FAIL_COND_V_MSG(!document, Ref<Image>(), "SVG document not loaded");
+    ERR_FAIL_COND_V_MSG(p_size.x <= 0 || p_size.y <= 0, Ref<Image>(), "Invalid size for rasterization");
+    const PonSVGSymbol *symbol = document->find_symbol(p_symbol_id);
+    ERR_FAIL_COND_V_MSG(!symbol, Ref<Image>(), "Symbol not found: " + String(p_symbol_id));
+
+    return _rasterize_content(document, symbol, p_size, p_premultiplied);
+}
+
+// Renders p_symbol, or the full document when it is null; the symbol belongs to p_parsed
+Ref<Image> PonSVGResource::_rasterize_content(const std::shared_ptr<PonSVGParsedDocument> &p_parsed, const PonSVGSymbol *p_symbol, const Vector2i &p_size, bool p_premultiplied) const {
+    // LOD picks the detail level, buckets quantize it so nearby sizes share one raster
+    Vector2i render_size = _get_bucket_size(calculate_lod_size(p_size));
+    String content_id = p_symbol ? p_symbol->content_id : String("full_svg");
+
+    Ref<Image> source;
+    {
+        // The key is read under the lock so the raster is cached under the state it was rendered from
+        std::shared_lock<std::shared_mutex> lock(p_parsed->mutex);
+        source = _find_cached_source(p_parsed->content_key, content_id, render_size, p_premultiplied);
+        if (source.is_null() && !p_symbol) {
+            source = _patch_cached_render(*p_parsed, render_size, p_premultiplied);
+        }
+
+        if (source.is_null()) {
+            if (p_symbol) {
+                source = LunaSVGIntegration::rasterize_element(p_symbol->element, render_size, 0x00000000, p_premultiplied);
+            } else {
+                source = LunaSVGIntegration::rasterize_document(p_parsed->document.get(), render_size, 0x00000000, p_premultiplied);
+            }
+
+            if (source.is_null()) {
+                return source;
+            }
+            _store_cached_image(p_parsed->content_key, _generate_cache_key(content_id, render_size, p_premultiplied), content_id, render_size, source);
         }
     }
-    
-    return result;
+
+    // Cached rasters are shared, so resampling always produces a new image
+    if (source->get_size() != p_size) {
+        return LunaSVGIntegration::resample_image(source, p_size, p_premultiplied);
+    }
+    return source;
 }
 
-Ref<Image> PonSVGResource::rasterize_symbol(const String &p_symbol_id, const Vector2i &p_size) const {
-    ERR_FAIL_COND_V_MSG(document == nullptr, Ref<Image>(), "SVG document not loaded");
-    ERR_FAIL_COND_V_MSG(p_size.x <= 0 || p_size.y <= 0, Ref<Image>(), "Invalid size for rasterization");
-    ERR_FAIL_COND_V_MSG(!has_symbol(p_symbol_id), Ref<Image>(), "Symbol not found: " + p_symbol_id);
-    
-    // Apply LOD if enabled
-    Vector2i actual_size = calculate_lod_size(p_size);
-    
-    String cache_key = _generate_cache_key("symbol_" + p_symbol_id, actual_size);
-    Ref<Image> cached = _get_cached_image(cache_key, actual_size);
-    if (cached.is_valid()) {
-        // If LOD changed the size, scale the cached image to requested size
-        if (actual_size != p_size && cached.is_valid()) {
-            cached = cached->duplicate();
-            cached->resize(p_size.x, p_size.y, Image::INTERPOLATE_LANCZOS);
-        }
-        return cached;
+Ref<Image> PonSVGResource::_find_cached_source(uint64_t p_owner, const String &p_content_id, const Vector2i &p_render_size, bool p_premultiplied) const {
+    Ref<Image> source = _get_cached_image(p_owner, _generate_cache_key(p_content_id, p_render_size, p_premultiplied), p_content_id, p_render_size);
+
+    // A larger bucket that is already cached beats a fresh render
+    Vector2i probe_size = p_render_size;
+    for (int level = 0; source.is_null() && size_bucket_mode != SIZE_BUCKET_NONE && level < BUCKET_PROBE_LEVELS; level++) {
+        probe_size = _get_next_bucket_size(probe_size);
+        source = _get_cached_image(p_owner, _generate_cache_key(p_content_id, probe_size, p_premultiplied), p_content_id, probe_size);
     }
-      lunasvg::Element element = LunaSVGIntegration::find_element_by_id(document.get(), p_symbol_id);
-    if (element.isNull()) {
-        ERR_PRINT("Could not find symbol element with ID: " + p_symbol_id);
+    return source;
+}
+
+// Turns a cached full raster of an earlier state into one of this state by re-rendering only
+// what the override changes since then repainted. Call with the document locked shared.
+Ref<Image> PonSVGResource::_patch_cached_render(const PonSVGParsedDocument &p_parsed, const Vector2i &p_render_size, bool p_premultiplied) const {
+    PonSVGCacheManager *cache = PonSVGCacheManager::get_singleton();
+    lunasvg::Document *document = p_parsed.document.get();
+    if (!cache_enabled || !cache || p_parsed.patches.is_empty() || document->width() <= 0 || document->height() <= 0) {
         return Ref<Image>();
     }
     
-    // Apply style overrides before rasterization
-    _apply_overrides_to_element(element, p_symbol_id);
-    
-    Ref<Image> result = LunaSVGIntegration::rasterize_element(element, actual_size);
-    if (result.is_valid()) {
-        _store_cached_image(cache_key, actual_size, result);
+    String cache_key = _generate_cache_key("full_svg", p_render_size, p_premultiplied);
+    Rect2 dirty_bounds;
+    for (int i = 0; i < p_parsed.patches.size(); i++) {
+        const PonSVGDocumentPatch &patch = p_parsed.patches[i];
+        if (patch.dirty_bounds.has_area()) {
+            dirty_bounds = dirty_bounds.has_area() ? dirty_bounds.merge(patch.dirty_bounds) : patch.dirty_bounds;
+        }
+        
+        // A raster of a state nobody renders anymore is taken over rather than left to go stale
+        bool base_in_use = PonSVGDocumentStore::find(patch.base_key) != nullptr;
+        Ref<Image> base = base_in_use ? cache->get_image(patch.base_key, cache_key, p_render_size) : cache->take_image(patch.base_key, cache_key, p_render_size);
+        if (base.is_null()) {
+            continue;
+        }
+        
+        // Someone else may still be reading the base raster, so only an unshared one is written in place
+        // (decided before taking another reference, which would make every raster look shared)
+        bool in_place = base->get_reference_count() == 1;
+        Ref<Image> target = in_place ? base : PonSVGImagePool::acquire(p_render_size.x, p_render_size.y, Image::FORMAT_RGBA8);
+        if (!in_place) {
+            memcpy(target->ptrw(), base->ptr(), Image::get_image_data_size(p_render_size.x, p_render_size.y, Image::FORMAT_RGBA8, false));
+        }
+        
+        // Document -> render target, widened by a pixel of antialiasing on each side
+        Vector2 scale(p_render_size.x / document->width(), p_render_size.y / document->height());
+        Vector2 start = (dirty_bounds.position * scale).floor() - Vector2(1, 1);
+        Vector2 end = (dirty_bounds.get_end() * scale).ceil() + Vector2(1, 1);
+        Rect2i region(Vector2i(start), Vector2i(end - start));
+        if (dirty_bounds.has_area() && !LunaSVGIntegration::render_document_region_into(document, target, region, 0x00000000, p_premultiplied)) {
+            // Failures happen before any pixel is written, so a taken raster goes back untouched
+            // and the caller renders in full
+            if (!base_in_use) {
+                cache->store_image(patch.base_key, cache_key, "full_svg", p_render_size, base);
+            }
+            return Ref<Image>();
+        }
         
-        // Scale to requested size if needed
-        if (actual_size != p_size) {
-            result = result->duplicate();
-            result->resize(p_size.x, p_size.y, Image::INTERPOLATE_LANCZOS);
+        PonSVGRenderStats::record_partial_render();
+        _store_cached_image(p_parsed.content_key, cache_key, "full_svg", p_render_size, target, false);
+        return target;
+    }
+    return Ref<Image>();
+}
+
+// Async rasterization: the request captures the current document, the render runs on a
+// low-priority worker like any other reader, and completion is delivered on the main thread.
+// The low-priority cap of WorkerThreadPool keeps workers free for tiled and batch renders.
+struct PonSVGAsyncRender {
+    Ref<PonSVGResource> resource;  // Kept alive until completion
+    std::shared_ptr<PonSVGParsedDocument> parsed;
+    const PonSVGSymbol *symbol = nullptr;  // In parsed; null for the full document
+    int64_t request_id = 0;
+    int64_t task_id = -1;
+    StringName symbol_id;
+    Vector2i size;
+    bool premultiplied = false;
+    Callable callback;
+    Ref<Image> image;
+};
+
+static std::mutex async_mutex;
+static Vector<PonSVGAsyncRender *> completed_async_renders;
+static bool async_flush_queued = false;
+static std::atomic<int64_t> next_async_request_id(0);
+
+int64_t PonSVGResource::rasterize_symbol_async(const StringName &p_symbol_id, const Vector2i &p_size) {
+    return rasterize_async(p_symbol_id, p_size, premultiplied_output);
+}
+
+int64_t PonSVGResource::rasterize_async(const StringName &p_symbol_id, const Vector2i &p_size, bool p_premultiplied, const Callable &p_callback) {
+    std::shared_ptr<PonSVGParsedDocument> document = _get_parsed();
+    ERR_FAIL_COND_V_MSG(!document, 0, "SVG document not loaded");
+    ERR_FAIL_COND_V_MSG(p_size.x <= 0 || p_size.y <= 0, 0, "Invalid size for rasterization");
+    const PonSVGSymbol *symbol = p_symbol_id.is_empty() ? nullptr : document->find_symbol(p_symbol_id);
+    ERR_FAIL_COND_V_MSG(!p_symbol_id.is_empty() && !symbol, 0, "Symbol not found: " + String(p_symbol_id));
+
+    PonSVGAsyncRender *render = memnew(PonSVGAsyncRender);
+    render->resource = Ref<PonSVGResource>(this);
+    render->parsed = document;
+    render->symbol = symbol;
+    render->request_id = ++next_async_request_id;
+    render->symbol_id = p_symbol_id;
+    render->size = p_size;
+    render->premultiplied = p_premultiplied;
+    render->callback = p_callback;
+    int64_t request_id = render->request_id;
+
+    // The task id is published under the lock the task completes under
+    std::lock_guard<std::mutex> lock(async_mutex);
+    render->task_id = WorkerThreadPool::get_singleton()->add_native_task(&PonSVGResource::_render_async_task, render, false, "PonSVG async render");
+    return request_id;
+}
+
+void PonSVGResource::_render_async_task(void *p_userdata) {
+    PonSVGAsyncRender *render = static_cast<PonSVGAsyncRender *>(p_userdata);
+    render->image = render->resource->_rasterize_content(render->parsed, render->symbol, render->size, render->premultiplied);
+    _queue_async_completion(render);
+}
+
+void PonSVGResource::_queue_async_completion(PonSVGAsyncRender *p_render) {
+    std::lock_guard<std::mutex> lock(async_mutex);
+    completed_async_renders.push_back(p_render);
+    if (!async_flush_queued) {
+        async_flush_queued = true;
+        callable_mp_static(&PonSVGResource::_flush_async_renders).call_deferred();
+    }
+}
+
+void PonSVGResource::_flush_async_renders() {
+    Vector<PonSVGAsyncRender *> renders;
+    {
+        std::lock_guard<std::mutex> lock(async_mutex);
+        renders = completed_async_renders;
+        completed_async_renders.clear();
+        async_flush_queued = false;
+    }
+
+    for (int i = 0; i < renders.size(); i++) {
+        PonSVGAsyncRender *render = renders[i];
+        if (render->task_id >= 0) {
+            // Already finished; this releases the task's bookkeeping in the pool
+            WorkerThreadPool::get_singleton()->wait_for_task_completion(render->task_id);
         }
+        render->resource->_finish_async_render(render);
+        // May free the resource if the request held the last reference
+        memdelete(render);
     }
-    
-    return result;
+}
+
+void PonSVGResource::_finish_async_render(PonSVGAsyncRender *p_render) {
+    if (p_render->callback.is_valid()) {
+        p_render->callback.call(p_render->request_id, p_render->image);
+    }
+    emit_signal("rasterization_completed", p_render->request_id, String(p_render->symbol_id), p_render->image);
+}
+
+// Batch rasterization: lookups run on the calling thread, renders on the pool, all under one
+// shared lock on the document so the whole batch sees one override state
+struct BatchRender {
+    lunasvg::Element element;  // Null for the full document
+    String content_id;
+    String cache_key;
+    Vector2i size;
+    Ref<Image> image;
+    uint64_t usec = 0;
+    bool rendered = false;
+};
+
+struct BatchRenderJob {
+    lunasvg::Document *document = nullptr;
+    bool premultiplied = false;
+    BatchRender *renders = nullptr;
+    const int *parallel_indices = nullptr;
+};
+
+static void _render_batch_item(BatchRenderJob *p_job, int p_index) {
+    BatchRender &render = p_job->renders[p_index];
+    uint64_t start_usec = Time::get_singleton()->get_ticks_usec();
+    if (render.element.isNull()) {
+        render.rendered = LunaSVGIntegration::render_document_into(p_job->document, render.image, 0x00000000, p_job->premultiplied);
+    } else {
+        render.rendered = LunaSVGIntegration::render_element_into(render.element, render.image, 0x00000000, p_job->premultiplied);
+    }
+    render.usec = Time::get_singleton()->get_ticks_usec() - start_usec;
+}
+
+static void _render_batch_task(void *p_userdata, uint32_t p_index) {
+    BatchRenderJob *job = static_cast<BatchRenderJob *>(p_userdata);
+    _render_batch_item(job, job->parallel_indices[p_index]);
+}
+
+Array PonSVGResource::rasterize_batch(const Array &p_requests) const {
+    std::shared_ptr<PonSVGParsedDocument> document = _get_parsed();
+    ERR_FAIL_COND_V_MSG(!document, Array(), "SVG document not loaded");
+
+    std::shared_lock<std::shared_mutex> lock(document->mutex);
+
+    Vector<StringName> symbol_ids;
+    Vector<Vector2i> sizes;
+    Vector<Ref<Image>> sources;
+    Vector<int> render_indices;
+    Vector<BatchRender> renders;
+    HashMap<String, int> renders_by_key;  // Identical requests share one render
+
+    for (int i = 0; i < p_requests.size(); i++) {
+        // Requests are [symbol_id, size] pairs or {"symbol_id", "size"} dictionaries; "" renders the full SVG
+        StringName symbol_id;
+        Vector2i size;
+        if (p_requests[i].get_type() == Variant::ARRAY) {
+            Array pair = p_requests[i];
+            if (pair.size() == 2) {
+                symbol_id = pair[0];
+                size = pair[1];
+            }
+        } else if (p_requests[i].get_type() == Variant::DICTIONARY) {
+            Dictionary request = p_requests[i];
+            symbol_id = request.get("symbol_id", StringName());
+            size = request.get("size", Vector2i());
+        }
+
+        symbol_ids.push_back(symbol_id);
+        sizes.push_back(size);
+        sources.push_back(Ref<Image>());
+        render_indices.push_back(-1);
+
+        if (size.x <= 0 || size.y <= 0) {
+            ERR_PRINT(vformat("Invalid batch request at index %d", i));
+            continue;
+        }
+        const PonSVGSymbol *symbol = symbol_id.is_empty() ? nullptr : document->find_symbol(symbol_id);
+        if (!symbol_id.is_empty() && !symbol) {
+            ERR_PRINT("Symbol not found: " + String(symbol_id));
+            continue;
+        }
+
+        String content_id = symbol ? symbol->content_id : String("full_svg");
+        Vector2i render_size = _get_bucket_size(calculate_lod_size(size));
+        Ref<Image> source = _find_cached_source(document->content_key, content_id, render_size, premultiplied_output);
+        if (source.is_valid()) {
+            sources.write[i] = source;
+            continue;
+        }
+
+        String cache_key = _generate_cache_key(content_id, render_size, premultiplied_output);
+        if (renders_by_key.has(cache_key)) {
+            render_indices.write[i] = renders_by_key[cache_key];
+            continue;
+        }
+
+        BatchRender render;
+        if (symbol) {
+            render.element = symbol->element;
+        }
+        render.content_id = content_id;
+        render.cache_key = cache_key;
+        render.size = render_size;
+        render.image = PonSVGImagePool::acquire(render_size.x, render_size.y, Image::FORMAT_RGBA8);
+
+        renders_by_key.insert(cache_key, renders.size());
+        render_indices.write[i] = renders.size();
+        renders.push_back(render);
+    }
+
+    if (!renders.is_empty()) {
+        // Large renders already tile across the pool themselves, so they run on this thread
+        Vector<int> parallel_indices;
+        Vector<int> serial_indices;
+        for (int i = 0; i < renders.size(); i++) {
+            const Vector2i &size = renders[i].size;
+            if (int64_t(size.x) * size.y >= LunaSVGIntegration::TILED_RENDER_MIN_PIXELS) {
+                serial_indices.push_back(i);
+            } else {
+                parallel_indices.push_back(i);
+            }
+        }
+
+        BatchRenderJob job;
+        job.document = document->document.get();
+        job.premultiplied = premultiplied_output;
+        job.renders = renders.ptrw();
+        job.parallel_indices = parallel_indices.ptr();
+
+        if (!parallel_indices.is_empty()) {
+            WorkerThreadPool *pool = WorkerThreadPool::get_singleton();
+            int64_t group_id = pool->add_native_group_task(&_render_batch_task, &job, parallel_indices.size(), -1, true, "PonSVG batch render");
+            pool->wait_for_group_task_completion(group_id);
+        }
+        for (int i = 0; i < serial_indices.size(); i++) {
+            _render_batch_item(&job, serial_indices[i]);
+        }
+
+        for (int i = 0; i < renders.size(); i++) {
+            if (renders[i].rendered) {
+                _store_cached_image(document->content_key, renders[i].cache_key, renders[i].content_id, renders[i].size, renders[i].image);
+            }
+        }
+    }
+
+    Array results;
+    for (int i = 0; i < symbol_ids.size(); i++) {
+        Ref<Image> image = sources[i];
+        uint64_t usec = 0;
+        int render_index = render_indices[i];
+        if (render_index >= 0 && renders[render_index].rendered) {
+            image = renders[render_index].image;
+            usec = renders[render_index].usec;
+        }
+        if (image.is_valid() && image->get_size() != sizes[i]) {
+            image = LunaSVGIntegration::resample_image(image, sizes[i], premultiplied_output);
+        }
+
+        Dictionary result;
+        result["symbol_id"] = String(symbol_ids[i]);
+        result["size"] = sizes[i];
+        result["image"] = image;
+        result["cached"] = sources[i].is_valid();
+        result["usec"] = (int64_t)usec;
+        results.push_back(result);
+    }
+    return results;
+}
+
+// Packs the symbols into a new atlas in one packing pass and one batch render
+Ref<PonSVGAtlas> PonSVGResource::build_atlas(const PackedStringArray &p_symbol_ids, const Vector2i &p_size) {
+    Ref<PonSVGAtlas> atlas;
+    atlas.instantiate();
+    atlas->set_ponsvg_resource(Ref<PonSVGResource>(this));
+    atlas->add_symbols(p_symbol_ids, p_size);
+    return atlas;
+}
+
+// Tiled rasterization: regions are rendered in parallel and skip the raster cache,
+// since each piece is typically consumed once (streamed to disk or into a TileMap)
+Array PonSVGResource::rasterize_tiles(const Vector2i &p_size, const Vector2i &p_tile_size, const String &p_symbol_id) const {
+    ERR_FAIL_COND_V_MSG(p_tile_size.x <= 0 || p_tile_size.y <= 0, Array(), "Invalid tile size");
+
+    Vector<Rect2i> regions;
+    for (int y = 0; y < p_size.y; y += p_tile_size.y) {
+        for (int x = 0; x < p_size.x; x += p_tile_size.x) {
+            regions.push_back(Rect2i(x, y, MIN(p_tile_size.x, p_size.x - x), MIN(p_tile_size.y, p_size.y - y)));
+        }
+    }
+
+    Vector<Ref<Image>> images = _rasterize_regions(p_size, regions, p_symbol_id);
+    Array tiles;
+    for (int i = 0; i < images.size(); i++) {
+        if (images[i].is_null()) {
+            continue;
+        }
+        Dictionary tile;
+        tile["rect"] = regions[i];
+        tile["image"] = images[i];
+        tiles.push_back(tile);
+    }
+    return tiles;
+}
+
+Ref<Image> PonSVGResource::rasterize_region(const Vector2i &p_size, const Rect2i &p_region, const String &p_symbol_id) const {
+    Vector<Rect2i> regions;
+    regions.push_back(p_region);
+    Vector<Ref<Image>> images = _rasterize_regions(p_size, regions, p_symbol_id);
+    return images.is_empty() ? Ref<Image>() : images[0];
+}
+
+Vector<Ref<Image>> PonSVGResource::_rasterize_regions(const Vector2i &p_size, const Vector<Rect2i> &p_regions, const String &p_symbol_id) const {
+    std::shared_ptr<PonSVGParsedDocument> document = _get_parsed();
+    ERR_FAIL_COND_V_MSG(!document, Vector<Ref<Image>>(), "SVG document not loaded");
+    ERR_FAIL_COND_V_MSG(p_size.x <= 0 || p_size.y <= 0, Vector<Ref<Image>>(), "Invalid size for rasterization");
+
+    std::shared_lock<std::shared_mutex> lock(document->mutex);
+    if (p_symbol_id.is_empty()) {
+        return LunaSVGIntegration::rasterize_regions(document->document.get(), lunasvg::Element(), p_size, p_regions, 0x00000000, premultiplied_output);
+    }
+
+    const PonSVGSymbol *symbol = document->find_symbol(p_symbol_id);
+    ERR_FAIL_COND_V_MSG(!symbol, Vector<Ref<Image>>(), "Symbol not found: " + p_symbol_id);
+
+    return LunaSVGIntegration::rasterize_regions(nullptr, symbol->element, p_size, p_regions, 0x00000000, premultiplied_output);
 }
 
 // Shader override implementation
 Ref<Image> PonSVGResource::rasterize_element_with_shader(const String &p_element_id, const Vector2i &p_size, Ref<Shader> p_shader) const {
-    ERR_FAIL_COND_V_MSG(document == nullptr, Ref<Image>(), "SVG document not loaded");
+    std::shared_ptr<PonSVGParsedDocument> document = _get_parsed();
+    ERR_FAIL_COND_V_MSG(!document, Ref<Image>(), "SVG document not loaded");
     ERR_FAIL_COND_V_MSG(p_size.x <= 0 || p_size.y <= 0, Ref<Image>(), "Invalid size for rasterization");
     ERR_FAIL_COND_V_MSG(p_shader.is_null(), Ref<Image>(), "Shader is null");
       // For now, this renders the element normally and then applies the shader as a post-process
     // A more advanced implementation would integrate with Godot's rendering pipeline
-    lunasvg::Element element = LunaSVGIntegration::find_element_by_id(document.get(), p_element_id);
-    if (element.isNull()) {
-        ERR_PRINT("Could not find element with ID: " + p_element_id);
-        return Ref<Image>();
+    Ref<Image> base_image;
+    {
+        std::shared_lock<std::shared_mutex> lock(document->mutex);
+        lunasvg::Element element = document->find_element(p_element_id);
+        if (element.isNull()) {
+            ERR_PRINT("Could not find element with ID: " + p_element_id);
+            return Ref<Image>();
+        }
+        
+        // First, render the element normally
+        base_image = LunaSVGIntegration::rasterize_element(element, p_size);
     }
-      // Apply style overrides before rasterization
-    _apply_overrides_to_element(element, p_element_id);
-    
-    // First, render the element normally
-    Ref<Image> base_image = LunaSVGIntegration::rasterize_element(element, p_size);
     if (base_image.is_null()) {
         return Ref<Image>();
     }
@@ -454,18 +1689,18 @@ Ref<Image> PonSVGResource::rasterize_element_with_shader(const String &p_element
     return base_image;
 }
 
-void PonSVGResource::_apply_stored_overrides() {
-    if (!document) {
-        return;
-    }
-    
+void PonSVGResource::_apply_stored_overrides(PonSVGParsedDocument &r_parsed) const {
     // Apply stored fill overrides
     Array fill_keys = fill_overrides.keys();
     for (int i = 0; i < fill_keys.size(); i++) {
         String element_id = fill_keys[i];
         Color color = fill_overrides[element_id];
+        if (element_id.begins_with(".")) {
+            _apply_class_override(r_parsed, element_id, color, false);
+            continue;
+        }
         
-        lunasvg::Element element = LunaSVGIntegration::find_element_by_id(document.get(), element_id);
+        lunasvg::Element element = r_parsed.find_element(element_id);
         if (!element.isNull()) {
             LunaSVGIntegration::apply_fill_color(element, color);
         }
@@ -476,96 +1711,86 @@ void PonSVGResource::_apply_stored_overrides() {
     for (int i = 0; i < stroke_keys.size(); i++) {
         String element_id = stroke_keys[i];
         Color color = stroke_overrides[element_id];
+        if (element_id.begins_with(".")) {
+            _apply_class_override(r_parsed, element_id, color, true);
+            continue;
+        }
         
-        lunasvg::Element element = LunaSVGIntegration::find_element_by_id(document.get(), element_id);
+        lunasvg::Element element = r_parsed.find_element(element_id);
         if (!element.isNull()) {
             LunaSVGIntegration::apply_stroke_color(element, color);
         }
     }
     
-    print_line("Applied " + String::num_int64(fill_keys.size() + stroke_keys.size()) + " style overrides");
+    // Apply stored CSS property overrides
+    Array css_keys = css_overrides.keys();
+    for (int i = 0; i < css_keys.size(); i++) {
+        String element_id = css_keys[i];
+        Dictionary element_css = css_overrides[element_id];
+        
+        lunasvg::Element element = r_parsed.find_element(element_id);
+        if (!element.isNull()) {
+            Array properties = element_css.keys();
+            for (int j = 0; j < properties.size(); j++) {
+                String property = properties[j];
+                LunaSVGIntegration::apply_css_style(element, property, element_css[property]);
+            }
+        }
+    }
+    
+    if (OS::get_singleton()->is_stdout_verbose()) {
+        print_line("Applied " + String::num_int64(fill_keys.size() + stroke_keys.size() + css_keys.size()) + " style overrides");
+    }
 }
 
-void PonSVGResource::_apply_overrides_to_element(lunasvg::Element& element, const String& element_id) const {
-    if (element.isNull()) {
+// Applies the current overrides of one key, in the same order as _apply_stored_overrides
+void PonSVGResource::_apply_key_overrides(PonSVGParsedDocument &r_parsed, const String &p_key) const {
+    if (p_key.begins_with(".")) {
+        if (fill_overrides.has(p_key)) {
+            _apply_class_override(r_parsed, p_key, fill_overrides[p_key], false);
+        }
+        if (stroke_overrides.has(p_key)) {
+            _apply_class_override(r_parsed, p_key, stroke_overrides[p_key], true);
+        }
         return;
     }
     
-    // Apply fill override if exists
-    if (fill_overrides.has(element_id)) {
-        Color color = fill_overrides[element_id];
-        LunaSVGIntegration::apply_fill_color(element, color);
+    lunasvg::Element element = r_parsed.find_element(p_key);
+    if (element.isNull()) {
+        return;
     }
-    
-    // Apply stroke override if exists  
-    if (stroke_overrides.has(element_id)) {
-        Color color = stroke_overrides[element_id];
-        LunaSVGIntegration::apply_stroke_color(element, color);
+    if (fill_overrides.has(p_key)) {
+        LunaSVGIntegration::apply_fill_color(element, fill_overrides[p_key]);
     }
-      // Apply CSS property overrides if they exist
-    if (css_overrides.has(element_id)) {
-        Dictionary element_css = css_overrides[element_id];
-        Array css_keys = element_css.keys();
-        for (int i = 0; i < css_keys.size(); i++) {
-            String property = css_keys[i];
-            String value = element_css[property];
-            LunaSVGIntegration::apply_css_style(element, property, value);
-        }
+    if (stroke_overrides.has(p_key)) {
+        LunaSVGIntegration::apply_stroke_color(element, stroke_overrides[p_key]);
     }
-    
-    // Apply shader override if exists
-    if (shader_overrides.has(element_id)) {
-        // Shader overrides are handled at the texture level, not at the SVG level
-        // This is noted for the calling code to handle appropriately
-        print_line("Shader override detected for element: " + element_id + " (handled at texture level)");
+    if (css_overrides.has(p_key)) {
+        Dictionary element_css = css_overrides[p_key];
+        Array properties = element_css.keys();
+        for (int i = 0; i < properties.size(); i++) {
+            LunaSVGIntegration::apply_css_style(element, properties[i], element_css[properties[i]]);
+        }
     }
-    
-    // Apply overrides to child elements recursively (for comprehensive styling)
-    _apply_overrides_to_children(element, element_id);
 }
 
-void PonSVGResource::_apply_overrides_to_children(lunasvg::Element& parent_element, const String& base_id) const {
-    if (parent_element.isNull()) {
-        return;
-    }
-      // Get all child elements and apply matching overrides
-    auto children = parent_element.children();
-    for (const auto& child : children) {
-        if (child.isNull() || !child.isElement()) continue;
-        
-        // Convert Node to Element
-        lunasvg::Element child_element = child.toElement();
-        if (child_element.isNull()) continue;
-        
-        // Check if child has an ID that matches our overrides
-        String child_id = LunaSVGIntegration::get_element_attribute(child_element, "id");
-        if (!child_id.is_empty()) {
-            // Apply overrides for this specific child ID
-            if (fill_overrides.has(child_id)) {
-                Color color = fill_overrides[child_id];
-                LunaSVGIntegration::apply_fill_color(child_element, color);
-            }
-            if (stroke_overrides.has(child_id)) {
-                Color color = stroke_overrides[child_id];
-                LunaSVGIntegration::apply_stroke_color(child_element, color);
-            }        }
-        
-        // Also check for class-based or tag-based overrides
-        String child_class = LunaSVGIntegration::get_element_attribute(child_element, "class");
-        if (!child_class.is_empty()) {
-            String class_override_key = "." + child_class;
-            if (fill_overrides.has(class_override_key)) {
-                Color color = fill_overrides[class_override_key];
-                LunaSVGIntegration::apply_fill_color(child_element, color);
-            }
-            if (stroke_overrides.has(class_override_key)) {
-                Color color = stroke_overrides[class_override_key];
-                LunaSVGIntegration::apply_stroke_color(child_element, color);
-            }
+// Class keys are "." plus a class attribute; every listed class must be present, as in ".a.b".
+// An override on the element's id is more specific and wins regardless of the order they were set in.
+// Members come from the class index, so the cost follows the matches, not the document size.
+void PonSVGResource::_apply_class_override(PonSVGParsedDocument &r_parsed, const String &p_class_key, const Color &p_color, bool p_stroke) const {
+    const Dictionary &id_overrides = p_stroke ? stroke_overrides : fill_overrides;
+    Vector<PonSVGClassMember> members = _get_class_members(r_parsed, p_class_key);
+    for (int i = 0; i < members.size(); i++) {
+        const PonSVGClassMember &member = members[i];
+        if (!member.id.is_empty() && id_overrides.has(member.id)) {
+            continue;
+        }
+        lunasvg::Element element = member.element;
+        if (p_stroke) {
+            LunaSVGIntegration::apply_stroke_color(element, p_color);
+        } else {
+            LunaSVGIntegration::apply_fill_color(element, p_color);
         }
-        
-        // Recursively apply to grandchildren
-        _apply_overrides_to_children(child_element, base_id);
     }
 }
 
@@ -575,9 +1800,9 @@ void PonSVGResource::set_lod_enabled(bool p_enabled) {
         lod_enabled = p_enabled;
         if (lod_enabled) {
             // Clear cache when enabling LOD to recalculate sizes
-            needs_cache_clear = true;
+            _clear_cache();
         }
-        emit_changed();
+        _notify_changed();
     }
 }
 
@@ -590,9 +1815,9 @@ void PonSVGResource::set_lod_bias(float p_bias) {
     if (lod_bias != p_bias) {
         lod_bias = p_bias;
         if (lod_enabled) {
-            needs_cache_clear = true;
+            _clear_cache();
         }
-        emit_changed();
+        _notify_changed();
     }
 }
 
@@ -607,7 +1832,7 @@ Vector2i PonSVGResource::calculate_lod_size(const Vector2i &p_requested_size) co
     
     // Calculate LOD level based on size and bias
     // Smaller sizes get lower detail, larger sizes get higher detail
-    Vector2i max_size = Vector2i(4096, 4096); // Maximum detail size
+    Vector2i max_size = Vector2i(MAX_RENDER_SIZE, MAX_RENDER_SIZE); // Maximum detail size
     Vector2i min_size = Vector2i(32, 32);     // Minimum detail size
     
     float scale_factor = lod_bias;
@@ -633,6 +1858,67 @@ Vector2i PonSVGResource::calculate_lod_size(const Vector2i &p_requested_size) co
     return lod_size;
 }
 
+// Premultiplied output skips un-premultiplying; draw such images with a premultiplied-alpha blend mode
+void PonSVGResource::set_premultiplied_output(bool p_enabled) {
+    if (premultiplied_output != p_enabled) {
+        premultiplied_output = p_enabled;
+        _notify_changed();
+    }
+}
+
+bool PonSVGResource::is_premultiplied_output() const {
+    return premultiplied_output;
+}
+
+// Size buckets
+void PonSVGResource::set_size_bucket_mode(SizeBucketMode p_mode) {
+    if (size_bucket_mode != p_mode) {
+        size_bucket_mode = p_mode;
+        _notify_changed();
+    }
+}
+
+PonSVGResource::SizeBucketMode PonSVGResource::get_size_bucket_mode() const {
+    return size_bucket_mode;
+}
+
+void PonSVGResource::set_size_bucket_step(int p_step) {
+    p_step = MAX(p_step, 1);
+    if (size_bucket_step != p_step) {
+        size_bucket_step = p_step;
+        if (size_bucket_mode == SIZE_BUCKET_STEP) {
+            _notify_changed();
+        }
+    }
+}
+
+int PonSVGResource::get_size_bucket_step() const {
+    return size_bucket_step;
+}
+
+Vector2i PonSVGResource::_get_bucket_size(const Vector2i &p_size) const {
+    switch (size_bucket_mode) {
+        case SIZE_BUCKET_POWER_OF_TWO:
+            return Vector2i(MIN(next_power_of_2((uint32_t)p_size.x), (uint32_t)MAX_RENDER_SIZE), MIN(next_power_of_2((uint32_t)p_size.y), (uint32_t)MAX_RENDER_SIZE));
+        case SIZE_BUCKET_STEP: {
+            Vector2i bucket = ((p_size + Vector2i(size_bucket_step - 1, size_bucket_step - 1)) / size_bucket_step) * size_bucket_step;
+            return Vector2i(MIN(bucket.x, MAX_RENDER_SIZE), MIN(bucket.y, MAX_RENDER_SIZE));
+        }
+        default:
+            return p_size;
+    }
+}
+
+Vector2i PonSVGResource::_get_next_bucket_size(const Vector2i &p_bucket_size) const {
+    Vector2i next = p_bucket_size;
+    if (size_bucket_mode == SIZE_BUCKET_POWER_OF_TWO) {
+        next = p_bucket_size * 2;
+    } else if (size_bucket_mode == SIZE_BUCKET_STEP) {
+        next = p_bucket_size + Vector2i(size_bucket_step, size_bucket_step);
+    }
+    return Vector2i(MIN(next.x, MAX_RENDER_SIZE), MIN(next.y, MAX_RENDER_SIZE));
+}
+
 // Shader processing implementation
 Ref<Image> PonSVGResource::_apply_shader_to_image(const Ref<Image> &p_base_image, Ref<Shader> p_shader, const Vector2i &p_size) const {
     if (p_base_image.is_null() || p_shader.is_null()) {
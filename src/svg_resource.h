@@ -14,8 +14,12 @@
 #include <godot_cpp/variant/color.hpp>
 #include <godot_cpp/classes/image.hpp>
 #include <memory>
+#include <mutex>
+#include <shared_mutex>
 
 #include "lunasvg_integration.h"
+#include "svg_cache_manager.h"
+#include "svg_document_store.h"
 
 namespace lunasvg {
     class Document;
@@ -23,47 +27,139 @@ namespace lunasvg {
 
 using namespace godot;
 
-// Cache entry for rendered SVG content
-struct PonSVGCacheEntry {
-    Ref<Image> image;
-    Vector2i size;
-    String cache_key;
-    uint64_t timestamp;
-    bool is_dirty;
-    
-    PonSVGCacheEntry() : timestamp(0), is_dirty(true) {}
-};
+struct PonSVGAsyncRender;
+class PonSVGAtlas;
 
+// Concurrency model:
+// - Rasterize methods (sync, batch, tiled, async) may be called from any thread at once.
+//   Each takes a snapshot of the parsed document and holds the document's lock shared
+//   while it reads the tree; renders never write to the tree.
+// - Overrides are written into the tree when they are set (or when the enclosing
+//   override transaction commits), never during a render. A
+//   document used by anyone else (another resource, a render in flight) is never written:
+//   the change goes to a re-parsed copy, which is published only once complete. The
+//   exclusively owned document is edited in place under its lock held exclusively.
+// - Rasters are cached under the key of the state the document reflected while rendering.
+//   Fill and stroke changes record the area they repaint, so a full raster of an earlier
+//   state is patched by re-rendering that area instead of the whole document.
+// - Loading, overrides and property setters belong to one thread at a time (normally the
+//   main thread). Setting changes apply to renders that start afterwards.
 class PonSVGResource : public Resource {
     GDCLASS(PonSVGResource, Resource);
 
+public:
+    // Quantization of render sizes so animated sizes reuse cached rasters
+    enum SizeBucketMode {
+        SIZE_BUCKET_NONE,           // Render at the exact requested size
+        SIZE_BUCKET_POWER_OF_TWO,   // Render at the next power of two per axis
+        SIZE_BUCKET_STEP,           // Render at the next multiple of size_bucket_step
+    };
+
+    // Compiled form (compile / load_compiled, .psvg files): header, symbol table, zstd-compressed
+    // source and rasters baked at fixed sizes.
+    // Bump the version whenever the layout changes; older files are rejected and must be recompiled.
+    static constexpr uint32_t COMPILED_MAGIC = 0x42565350; // "PSVB"
+    static constexpr uint32_t COMPILED_FORMAT_VERSION = 2;
+
 private:
-    String svg_data;
-    std::unique_ptr<lunasvg::Document> document;
-    Dictionary symbols;
+    static constexpr int MAX_RENDER_SIZE = 16384;  // Large renders are tiled across worker threads
+    static constexpr int BUCKET_PROBE_LEVELS = 2;  // Larger cached buckets checked before rendering
+    static constexpr int MAX_PATCH_HISTORY = 8;    // Earlier states a full raster can be patched from
+
+
+    PackedByteArray svg_source;  // UTF-8 source, zstd-compressed while compress_source is set
+    int64_t svg_source_size;     // Uncompressed size of svg_source
+    bool compress_source;
+    // Shared with resources of identical content; set by the first snapshot when parsing is deferred
+    mutable std::shared_ptr<PonSVGParsedDocument> parsed;
+    mutable std::mutex parsed_mutex;                // Guards replacing parsed against render snapshots
+    // Compiled files are parsed on first use; until then symbol queries read this documentless table
+    mutable bool parse_deferred;
+    mutable std::shared_ptr<PonSVGParsedDocument> symbol_table;
+    // Rasters baked into a compiled file, by cache key; they show the state of baked_key only
+    HashMap<String, Ref<Image>> baked_rasters;
+    uint64_t baked_key;
+    uint64_t source_hash;   // Hash of the UTF-8 source
+    uint64_t content_key;   // Source hash combined with the override state; addresses documents and rasters
     Dictionary fill_overrides;
     Dictionary stroke_overrides;
     Dictionary shader_overrides;
     Dictionary css_overrides;  // For generic CSS property overrides
+    Vector<PonSVGDocumentPatch> pending_patches;  // Patch history for the in-place edit being committed
+    
+    // Override changes recorded by the setters, applied to the document together
+    struct PendingOverrides {
+        HashSet<String> keys;    // Element ids and ".class" keys whose overrides changed
+        bool all = false;        // Any override may have changed
+        bool reparse = false;    // A removed override needs the original attribute values back
+        bool paint_only = true;  // Only fill and stroke colors changed
+    };
+    PendingOverrides pending_overrides;
+    int override_batch_depth;   // Nesting of begin_overrides()
+    bool change_pending;        // A change notification is held back by a transaction
+    uint64_t revision;          // Bumped with every change notification
+    HashSet<String> changed_contents;   // Content ids touched by the overrides since the last notification
+    bool all_contents_changed;          // Something since the last notification may touch every content
+    HashMap<String, uint64_t> content_revisions;  // Revision of the last override change per content id
+    uint64_t all_contents_revision;     // Revision of the last change that touched every content
     
     // Performance optimization - caching system
-    mutable Dictionary cache_entries; // String -> PonSVGCacheEntry
-    mutable uint64_t last_modification_time;
-    mutable bool needs_cache_clear;
-    mutable bool cache_enabled;
+    // Rendered images live in the global PonSVGCacheManager, keyed by content_key
+    bool cache_enabled;
     
     // LOD system
     bool lod_enabled;
     float lod_bias;
-      void _parse_svg();
-    void _extract_symbols();
-    void _apply_stored_overrides();
-    void _apply_overrides_to_element(lunasvg::Element& element, const String& element_id) const;
-    void _apply_overrides_to_children(lunasvg::Element& parent_element, const String& base_id) const;
+    
+    // Size buckets
+    SizeBucketMode size_bucket_mode;
+    int size_bucket_step;
+    
+    bool premultiplied_output;
+    
+    void _parse_svg();
+    std::shared_ptr<PonSVGParsedDocument> _build_document() const;
+    std::unique_ptr<lunasvg::Document> _load_source_document() const;
+    
+    // Document setup helpers work on a document before it is published
+    void _index_elements(PonSVGParsedDocument &r_parsed) const;
+    void _extract_symbols(PonSVGParsedDocument &r_parsed) const;
+    void _collect_dependencies(const PonSVGParsedDocument &p_parsed, const lunasvg::Element &p_element, HashSet<String> &r_dependencies, HashSet<String> &r_visited) const;
+    void _collect_referenced_ids(PonSVGParsedDocument &r_parsed) const;
+    bool _get_override_bounds(const PonSVGParsedDocument &p_parsed, const String &p_override_key, Rect2 &r_bounds) const;
+    uint64_t _compute_content_key() const;
+    // Key of the source with no overrides, whatever the resource currently has
+    uint64_t _compute_base_content_key() const;
+    HashSet<String> _get_dependent_contents(const String &p_override_key) const;
+    bool _update_content_key(const PendingOverrides &p_changes);
+    void _queue_override_change(const String &p_key, bool p_paint_only = true, bool p_reparse = false);
+    void _flush_override_changes();
+    // Changes whose touched content ids were recorded in changed_contents pass true
+    void _notify_changed(bool p_contents_recorded = false);
+    void _apply_stored_overrides(PonSVGParsedDocument &r_parsed) const;
+    void _apply_key_overrides(PonSVGParsedDocument &r_parsed, const String &p_key) const;
+    void _apply_class_override(PonSVGParsedDocument &r_parsed, const String &p_class_key, const Color &p_color, bool p_stroke) const;
+    std::shared_ptr<PonSVGParsedDocument> _get_parsed() const;
+    std::shared_ptr<PonSVGParsedDocument> _get_symbol_table() const;
+    Ref<Image> _find_raster_before_parse(const StringName &p_symbol_id, const Vector2i &p_size, bool p_premultiplied) const;
+    void _set_parsed(const std::shared_ptr<PonSVGParsedDocument> &p_parsed);
+    // Call with the document locked exclusively after editing it in place
+    void _commit_document_edit();
+    Vector<Ref<Image>> _rasterize_regions(const Vector2i &p_size, const Vector<Rect2i> &p_regions, const String &p_symbol_id) const;
     void _clear_cache() const;
-    String _generate_cache_key(const String &p_content_id, const Vector2i &p_size) const;
-    Ref<Image> _get_cached_image(const String &p_cache_key, const Vector2i &p_size) const;
-    void _store_cached_image(const String &p_cache_key, const Vector2i &p_size, const Ref<Image> &p_image) const;
+    String _generate_cache_key(const String &p_content_id, const Vector2i &p_size, bool p_premultiplied) const;
+    Ref<Image> _get_cached_image(uint64_t p_owner, const String &p_cache_key, const String &p_content_id, const Vector2i &p_size) const;
+    // Only full renders of the override-free state are persisted to the disk cache
+    void _store_cached_image(uint64_t p_owner, const String &p_cache_key, const String &p_content_id, const Vector2i &p_size, const Ref<Image> &p_image, bool p_full_render = true) const;
+    Ref<Image> _find_cached_source(uint64_t p_owner, const String &p_content_id, const Vector2i &p_render_size, bool p_premultiplied) const;
+    Ref<Image> _patch_cached_render(const PonSVGParsedDocument &p_parsed, const Vector2i &p_render_size, bool p_premultiplied) const;
+    Ref<Image> _rasterize_content(const std::shared_ptr<PonSVGParsedDocument> &p_parsed, const PonSVGSymbol *p_symbol, const Vector2i &p_size, bool p_premultiplied) const;
+    void _finish_async_render(PonSVGAsyncRender *p_render);
+    static void _render_async_task(void *p_userdata);
+    static void _queue_async_completion(PonSVGAsyncRender *p_render);
+    static void _flush_async_renders();
+    Vector2i _get_bucket_size(const Vector2i &p_size) const;
+    Vector2i _get_next_bucket_size(const Vector2i &p_bucket_size) const;
     
     // Shader processing helpers
     Ref<Image> _apply_shader_to_image(const Ref<Image> &p_base_image, Ref<Shader> p_shader, const Vector2i &p_size) const;
@@ -79,11 +175,18 @@ public:
     // Core loading functionality
     Error load_from_file(const String &p_path);
     Error load_from_string(const String &p_svg_string);
+    // UTF-8 bytes go to the parser as they are; load_from_file reads the file into one buffer and uses this
+    Error load_from_buffer(const PackedByteArray &p_buffer);
+    // Compiled form: loading reads the symbol table and defers the SVG parse until a render needs it
+    // p_baked_sizes maps symbol ids ("" for the full document) to arrays of Vector2i sizes to bake
+    PackedByteArray compile(const Dictionary &p_baked_sizes = Dictionary()) const;
+    Error load_compiled(const PackedByteArray &p_data);
     
     // Symbol management
     PackedStringArray get_symbol_ids() const;
-    bool has_symbol(const String &p_id) const;
-    Dictionary get_symbol_data(const String &p_id) const;
+    bool has_symbol(const StringName &p_id) const;
+    Dictionary get_symbol_data(const StringName &p_id) const;
+    PackedStringArray get_symbol_dependencies(const StringName &p_id) const;
     
     // Style overrides
     void override_fill(const String &p_element_id, const Color &p_color);
@@ -102,25 +205,59 @@ public:
     void clear_shader_override(const String &p_element_id);
     void clear_all_overrides();
     
+    // Override transactions: everything set between begin and commit is applied to the
+    // document in one pass and emits changed once. Transactions nest.
+    void begin_overrides();
+    void commit_overrides();
+    // {"fill": {key: Color}, "stroke": {key: Color}, "css": {id: {property: value}}} as one transaction
+    void apply_overrides(const Dictionary &p_overrides);
+    uint64_t get_revision() const;
+    // Revision that last changed what the symbol ("" for the full SVG) renders
+    uint64_t get_content_revision(const StringName &p_symbol_id) const;
+    
     // Getters
-    String get_svg_data() const { return svg_data; }
-    Dictionary get_symbols() const { return symbols; }
+    // Decoded from the stored UTF-8 source on every call
+    String get_svg_data() const;
+    PackedByteArray get_svg_buffer() const;
+    void set_compress_source(bool p_enabled);
+    bool is_compress_source() const { return compress_source; }
+    Dictionary get_symbols() const;
     Dictionary get_fill_overrides() const { return fill_overrides; }
     Dictionary get_stroke_overrides() const { return stroke_overrides; }
     Dictionary get_shader_overrides() const { return shader_overrides; }
     
-    // Document access for internal use    lunasvg::Document* get_document() const { return document.get(); }
+    // Document access for internal use on the thread that owns the resource; renders use snapshots
+    lunasvg::Document* get_document() const {
+        std::shared_ptr<PonSVGParsedDocument> document = _get_parsed();
+        return document ? document->document.get() : nullptr;
+    }
     
     // Rasterization support
     Ref<Image> rasterize_full(const Vector2i &p_size) const;
-    Ref<Image> rasterize_symbol(const String &p_symbol_id, const Vector2i &p_size) const;
+    Ref<Image> rasterize_symbol(const StringName &p_symbol_id, const Vector2i &p_size) const;
+    // Explicit alpha mode, used by textures and sprites that request premultiplied rasters themselves
+    Ref<Image> rasterize_full_with_alpha(const Vector2i &p_size, bool p_premultiplied) const;
+    Ref<Image> rasterize_symbol_with_alpha(const StringName &p_symbol_id, const Vector2i &p_size, bool p_premultiplied) const;
     Ref<Image> rasterize_element_with_shader(const String &p_element_id, const Vector2i &p_size, Ref<Shader> p_shader) const;
+    // Renders many (symbol_id, size) requests across worker threads, filling the raster cache
+    Array rasterize_batch(const Array &p_requests) const;
+    // Packs the symbols at one size into shared page textures for batched drawing
+    Ref<PonSVGAtlas> build_atlas(const PackedStringArray &p_symbol_ids, const Vector2i &p_size);
+    // Renders on a worker thread; completes on the main thread with rasterization_completed
+    // (and p_callback(request_id, image) when given). An empty symbol id renders the full SVG.
+    int64_t rasterize_symbol_async(const StringName &p_symbol_id, const Vector2i &p_size);
+    int64_t rasterize_async(const StringName &p_symbol_id, const Vector2i &p_size, bool p_premultiplied, const Callable &p_callback = Callable());
+    // Pieces of a p_size render, each its own image, so huge renders never need one full-size buffer
+    Array rasterize_tiles(const Vector2i &p_size, const Vector2i &p_tile_size, const String &p_symbol_id = "") const;
+    Ref<Image> rasterize_region(const Vector2i &p_size, const Rect2i &p_region, const String &p_symbol_id = "") const;
     
     // Performance and caching
     void clear_cache();
-    int get_cache_size() const;
+    Dictionary get_cache_size() const;
     void set_cache_enabled(bool p_enabled);
     bool is_cache_enabled() const;
+    static Dictionary get_render_stats();
+    static void reset_render_stats();
     
     // LOD (Level of Detail) system
     void set_lod_enabled(bool p_enabled);
@@ -128,6 +265,17 @@ public:
     void set_lod_bias(float p_bias);
     float get_lod_bias() const;
     Vector2i calculate_lod_size(const Vector2i &p_requested_size) const;
+    
+    // Size buckets
+    void set_size_bucket_mode(SizeBucketMode p_mode);
+    SizeBucketMode get_size_bucket_mode() const;
+    void set_size_bucket_step(int p_step);
+    int get_size_bucket_step() const;
+    
+    void set_premultiplied_output(bool p_enabled);
+    bool is_premultiplied_output() const;
 };
 
+VARIANT_ENUM_CAST(PonSVGResource::SizeBucketMode);
+
 #endif // PONSVG_RESOURCE_H
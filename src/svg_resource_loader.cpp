@@ -0,0 +1,90 @@
+#include "svg_resource_loader.h"
+
+#include <godot_cpp/classes/config_file.hpp>
+#include <godot_cpp/classes/file_access.hpp>
+
+#include "svg_resource.h"
+
+using namespace godot;
+
+// Sources the importer turned into something else ("keep" leaves the file as is)
+bool PonSVGResourceFormatLoader::_is_imported(const String &p_path) {
+    String import_path = p_path + ".import";
+    if (!FileAccess::file_exists(import_path)) {
+        return false;
+    }
+    Ref<ConfigFile> config;
+    config.instantiate();
+    if (config->load(import_path) != OK) {
+        return false;
+    }
+    String importer = config->get_value("remap", "importer", String());
+    return !importer.is_empty() && importer != "keep";
+}
+
+PackedStringArray PonSVGResourceFormatLoader::_get_recognized_extensions() const {
+    PackedStringArray extensions;
+    extensions.push_back("svg");
+    extensions.push_back("psvg");
+    return extensions;
+}
+
+bool PonSVGResourceFormatLoader::_handles_type(const StringName &p_type) const {
+    return p_type == StringName("PonSVGResource") || p_type == StringName("Resource");
+}
+
+bool PonSVGResourceFormatLoader::_recognize_path(const String &p_path, const StringName &p_type) const {
+    String extension = p_path.get_extension().to_lower();
+    return extension == "psvg" || (extension == "svg" && !_is_imported(p_path));
+}
+
+String PonSVGResourceFormatLoader::_get_resource_type(const String &p_path) const {
+    return _recognize_path(p_path, StringName()) ? "PonSVGResource" : "";
+}
+
+Variant PonSVGResourceFormatLoader::_load(const String &p_path, const String &p_original_path, bool p_use_sub_threads, int32_t p_cache_mode) const {
+    Ref<PonSVGResource> resource;
+    resource.instantiate();
+    if (p_path.get_extension().to_lower() == "psvg") {
+        // Compiled files only read their symbol table here; the document is parsed on first render
+        PackedByteArray data = FileAccess::get_file_as_bytes(p_path);
+        ERR_FAIL_COND_V_MSG(data.is_empty(), ERR_FILE_CANT_OPEN, "Cannot open compiled SVG file: " + p_path);
+        Error err = resource->load_compiled(data);
+        if (err != OK) {
+            return err;
+        }
+        return resource;
+    }
+    
+    Error err = resource->load_from_file(p_path);
+    if (err != OK) {
+        return err;
+    }
+    // The resource is not shared with anyone yet, so its document can be checked without a snapshot
+    ERR_FAIL_COND_V_MSG(!resource->get_document(), ERR_PARSE_ERROR, "Failed to parse SVG file: " + p_path);
+    return resource;
+}
+
+Error PonSVGResourceFormatSaver::_save(const Ref<Resource> &p_resource, const String &p_path, uint32_t p_flags) {
+    Ref<PonSVGResource> resource = p_resource;
+    ERR_FAIL_COND_V(resource.is_null(), ERR_INVALID_PARAMETER);
+
+    Ref<FileAccess> file = FileAccess::open(p_path, FileAccess::WRITE);
+    ERR_FAIL_COND_V_MSG(file.is_null(), ERR_FILE_CANT_WRITE, "Cannot write SVG file: " + p_path);
+    file->store_buffer(p_path.get_extension().to_lower() == "psvg" ? resource->compile() : resource->get_svg_buffer());
+    file->close();
+    return OK;
+}
+
+bool PonSVGResourceFormatSaver::_recognize(const Ref<Resource> &p_resource) const {
+    return Object::cast_to<PonSVGResource>(p_resource.ptr()) != nullptr;
+}
+
+PackedStringArray PonSVGResourceFormatSaver::_get_recognized_extensions(const Ref<Resource> &p_resource) const {
+    PackedStringArray extensions;
+    if (_recognize(p_resource)) {
+        extensions.push_back("svg");
+        extensions.push_back("psvg");
+    }
+    return extensions;
+}
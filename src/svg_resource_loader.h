@@ -0,0 +1,45 @@
+#ifndef PONSVG_RESOURCE_LOADER_H
+#define PONSVG_RESOURCE_LOADER_H
+
+#include <godot_cpp/classes/resource_format_loader.hpp>
+#include <godot_cpp/classes/resource_format_saver.hpp>
+
+using namespace godot;
+
+// Loads .svg files as PonSVGResource through ResourceLoader, so load(), preload() and
+// load_threaded_request() work and results go through Godot's resource cache.
+// Parsing and symbol extraction run on whichever thread ResourceLoader loads on.
+// In the editor, .svg files are imported as textures by default; set their import
+// mode to "Keep File" for this loader to see them. Sources with any other importer
+// are declined, so load() keeps returning what they were imported as. Compiled .psvg files
+// (PonSVGResource::compile) load without parsing the SVG up front.
+class PonSVGResourceFormatLoader : public ResourceFormatLoader {
+    GDCLASS(PonSVGResourceFormatLoader, ResourceFormatLoader);
+
+    static bool _is_imported(const String &p_path);
+
+protected:
+    static void _bind_methods() {}
+
+public:
+    virtual PackedStringArray _get_recognized_extensions() const override;
+    virtual bool _handles_type(const StringName &p_type) const override;
+    virtual bool _recognize_path(const String &p_path, const StringName &p_type) const override;
+    virtual String _get_resource_type(const String &p_path) const override;
+    virtual Variant _load(const String &p_path, const String &p_original_path, bool p_use_sub_threads, int32_t p_cache_mode) const override;
+};
+
+// Writes a PonSVGResource's source back out as .svg, or compiled as .psvg; overrides are runtime state and are not saved
+class PonSVGResourceFormatSaver : public ResourceFormatSaver {
+    GDCLASS(PonSVGResourceFormatSaver, ResourceFormatSaver);
+
+protected:
+    static void _bind_methods() {}
+
+public:
+    virtual Error _save(const Ref<Resource> &p_resource, const String &p_path, uint32_t p_flags) override;
+    virtual bool _recognize(const Ref<Resource> &p_resource) const override;
+    virtual PackedStringArray _get_recognized_extensions(const Ref<Resource> &p_resource) const override;
+};
+
+#endif // PONSVG_RESOURCE_LOADER_H
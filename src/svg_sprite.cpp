@@ -1,18 +1,29 @@
 #include "svg_sprite.h"
+#include <godot_cpp/classes/material.hpp>
 #include <godot_cpp/classes/rendering_server.hpp>
 
+#include "svg_image_pool.h"
+#include "svg_render_scheduler.h"
+#include "svg_texture_registry.h"
+
 PonSVGSprite2D::PonSVGSprite2D() {
     draw_size = Vector2(64, 64);
     centered = true;
     modulate_color = Color(1, 1, 1, 1);
     needs_update = true;
-    texture_rid = RenderingServer::get_singleton()->texture_2d_create(Ref<Image>());
+    premultiplied_output = false;
+    premultiplied_material_applied = false;
+    async_rendering = false;
+    pending_request = 0;
+    render_priority = 0;
 }
 
 PonSVGSprite2D::~PonSVGSprite2D() {
-    if (texture_rid.is_valid()) {
-        RenderingServer::get_singleton()->free_rid(texture_rid);
+    if (PonSVGRenderScheduler::get_singleton()) {
+        PonSVGRenderScheduler::get_singleton()->cancel(this);
     }
+    PonSVGTextureRegistry::release(texture_key);
+    PonSVGTextureRegistry::release(pending_key);
 }
 
 void PonSVGSprite2D::_bind_methods() {    ClassDB::bind_method(D_METHOD("set_ponsvg_resource", "resource"), &PonSVGSprite2D::set_ponsvg_resource);
@@ -33,6 +44,21 @@ void PonSVGSprite2D::_bind_methods() {    ClassDB::bind_method(D_METHOD("set_pon
     ClassDB::bind_method(D_METHOD("set_material_override", "material"), &PonSVGSprite2D::set_material_override);
     ClassDB::bind_method(D_METHOD("get_material_override"), &PonSVGSprite2D::get_material_override);
     
+    ClassDB::bind_method(D_METHOD("set_premultiplied_output", "enabled"), &PonSVGSprite2D::set_premultiplied_output);
+    ClassDB::bind_method(D_METHOD("is_premultiplied_output"), &PonSVGSprite2D::is_premultiplied_output);
+    
+    ClassDB::bind_method(D_METHOD("set_async_rendering", "enabled"), &PonSVGSprite2D::set_async_rendering);
+    ClassDB::bind_method(D_METHOD("is_async_rendering"), &PonSVGSprite2D::is_async_rendering);
+    
+    ClassDB::bind_method(D_METHOD("set_placeholder_size", "size"), &PonSVGSprite2D::set_placeholder_size);
+    ClassDB::bind_method(D_METHOD("get_placeholder_size"), &PonSVGSprite2D::get_placeholder_size);
+    
+    ClassDB::bind_method(D_METHOD("set_render_priority", "priority"), &PonSVGSprite2D::set_render_priority);
+    ClassDB::bind_method(D_METHOD("get_render_priority"), &PonSVGSprite2D::get_render_priority);
+    
+    ClassDB::bind_method(D_METHOD("set_atlas", "atlas"), &PonSVGSprite2D::set_atlas);
+    ClassDB::bind_method(D_METHOD("get_atlas"), &PonSVGSprite2D::get_atlas);
+    
     ClassDB::bind_method(D_METHOD("force_update"), &PonSVGSprite2D::force_update);
     ClassDB::bind_method(D_METHOD("get_rect"), &PonSVGSprite2D::get_rect);
     
@@ -42,6 +68,13 @@ void PonSVGSprite2D::_bind_methods() {    ClassDB::bind_method(D_METHOD("set_pon
     ADD_PROPERTY(PropertyInfo(Variant::BOOL, "centered"), "set_centered", "is_centered");
     ADD_PROPERTY(PropertyInfo(Variant::COLOR, "modulate"), "set_modulate", "get_modulate");
     ADD_PROPERTY(PropertyInfo(Variant::OBJECT, "material_override", PROPERTY_HINT_RESOURCE_TYPE, "ShaderMaterial"), "set_material_override", "get_material_override");
+    ADD_PROPERTY(PropertyInfo(Variant::BOOL, "premultiplied_output"), "set_premultiplied_output", "is_premultiplied_output");
+    ADD_PROPERTY(PropertyInfo(Variant::BOOL, "async_rendering"), "set_async_rendering", "is_async_rendering");
+    ADD_PROPERTY(PropertyInfo(Variant::VECTOR2I, "placeholder_size"), "set_placeholder_size", "get_placeholder_size");
+    ADD_PROPERTY(PropertyInfo(Variant::INT, "render_priority"), "set_render_priority", "get_render_priority");
+    ADD_PROPERTY(PropertyInfo(Variant::OBJECT, "atlas", PROPERTY_HINT_RESOURCE_TYPE, "PonSVGAtlas"), "set_atlas", "get_atlas");
+    
+    ADD_SIGNAL(MethodInfo("render_completed"));
 }
 
 void PonSVGSprite2D::_notification(int p_what) {
@@ -52,26 +85,128 @@ void PonSVGSprite2D::_notification(int p_what) {
     }
 }
 
-void PonSVGSprite2D::_update_texture() {
+void PonSVGSprite2D::_update_texture(bool p_background) {
     if (!needs_update || svg_resource.is_null()) {
         return;
     }
     
     Vector2i size = Vector2i(int(draw_size.x), int(draw_size.y));
+    needs_update = false;
+    bool premultiplied = _uses_premultiplied_alpha();
+    bool async = async_rendering || p_background;
+    
+    // Identical sprites share one texture, so only the first of them rasterizes and uploads
+    String key = PonSVGTextureRegistry::make_key(svg_resource.ptr(), symbol_id, size, premultiplied);
+    if (key == texture_key || (async && key == pending_key)) {
+        return;
+    }
+    if (PonSVGTextureRegistry::get_texture(key).is_valid()) {
+        _cancel_pending_render();
+        _set_texture_key(key);
+        emit_signal("render_completed");
+        return;
+    }
+    
+    if (async) {
+        // Keep drawing the previous raster; a cheap placeholder covers the very first one
+        if (texture_key.is_empty() && placeholder_size.x > 0 && placeholder_size.y > 0) {
+            String placeholder_key = PonSVGTextureRegistry::make_key(svg_resource.ptr(), symbol_id, placeholder_size, premultiplied);
+            _set_texture_key(placeholder_key);
+            if (!PonSVGTextureRegistry::get_texture(placeholder_key).is_valid()) {
+                PonSVGTextureRegistry::upload(placeholder_key, _rasterize(placeholder_size, premultiplied));
+            }
+        }
+        // The pending key is held from the request on, so the result lands in the shared entry
+        _cancel_pending_render();
+        PonSVGTextureRegistry::acquire(key);
+        pending_key = key;
+        pending_request = svg_resource->rasterize_async(symbol_id, size, premultiplied, callable_mp(this, &PonSVGSprite2D::_on_async_render_completed));
+        return;
+    }
+    
+    _cancel_pending_render();
+    Ref<Image> image = _rasterize(size, premultiplied);
+    if (image.is_valid()) {
+        _set_texture_key(key);
+        PonSVGTextureRegistry::upload(key, image);
+        // The texture holds the pixels now; if nothing else shares the raster, the next render reuses its memory
+        PonSVGImagePool::release(image);
+        emit_signal("render_completed");
+    }
+}
+
+// Dirty sprites queue their render with the scheduler and keep drawing the previous raster
+bool PonSVGSprite2D::_schedule_update() {
+    // Only re-renders wait: with nothing to show yet, the sprite would draw blank
+    PonSVGRenderScheduler *scheduler = PonSVGRenderScheduler::get_singleton();
+    if (!scheduler || texture_key.is_empty()) {
+        return false;
+    }
+    
+    Vector2i size = Vector2i(int(draw_size.x), int(draw_size.y));
+    bool premultiplied = _uses_premultiplied_alpha();
+    // Switching to a texture another sprite already uploaded costs nothing to do now
+    if (PonSVGTextureRegistry::get_texture(PonSVGTextureRegistry::make_key(svg_resource.ptr(), symbol_id, size, premultiplied)).is_valid()) {
+        return false;
+    }
     
+    Vector2 scale = get_global_transform_with_canvas().get_scale().abs();
+    int64_t screen_area = int64_t(draw_size.x * scale.x) * int64_t(draw_size.y * scale.y);
+    int64_t render_pixels = int64_t(size.x) * size.y;
+    if (async_rendering) {
+        // Nothing is rendered on the main thread
+        render_pixels = 0;
+    }
+    return scheduler->schedule(this, callable_mp(this, &PonSVGSprite2D::_run_scheduled_update), render_priority, screen_area, render_pixels);
+}
+
+void PonSVGSprite2D::_run_scheduled_update(bool p_background) {
+    _update_texture(p_background);
+    queue_redraw();
+}
+
+Ref<Image> PonSVGSprite2D::_rasterize(const Vector2i &p_size, bool p_premultiplied) {
     if (symbol_id.is_empty()) {
         // Render full SVG
-        cached_image = svg_resource->rasterize_full(size);
-    } else {
-        // Render specific symbol
-        cached_image = svg_resource->rasterize_symbol(symbol_id, size);
+        return svg_resource->rasterize_full_with_alpha(p_size, p_premultiplied);
     }
-    
-    if (cached_image.is_valid()) {
-        RenderingServer::get_singleton()->texture_2d_update(texture_rid, cached_image, 0);
+    // Render specific symbol
+    return svg_resource->rasterize_symbol_with_alpha(symbol_id, p_size, p_premultiplied);
+}
+
+void PonSVGSprite2D::_on_async_render_completed(int64_t p_request_id, const Ref<Image> &p_image) {
+    // Results of superseded requests are dropped
+    if (p_request_id != pending_request) {
+        return;
     }
+    pending_request = 0;
+    String key = pending_key;
+    pending_key = String();
     
-    needs_update = false;
+    if (p_image.is_valid()) {
+        // Another sprite may have uploaded the same content while this render ran
+        if (!PonSVGTextureRegistry::get_texture(key).is_valid()) {
+            PonSVGTextureRegistry::upload(key, p_image);
+        }
+        _set_texture_key(key);
+        PonSVGImagePool::release(p_image);
+        queue_redraw();
+        emit_signal("render_completed");
+    }
+    PonSVGTextureRegistry::release(key);
+}
+
+void PonSVGSprite2D::_cancel_pending_render() {
+    pending_request = 0;
+    PonSVGTextureRegistry::release(pending_key);
+    pending_key = String();
+}
+
+void PonSVGSprite2D::_set_texture_key(const String &p_key) {
+    // Acquire before releasing, so switching to the same key never frees its texture
+    PonSVGTextureRegistry::acquire(p_key);
+    PonSVGTextureRegistry::release(texture_key);
+    texture_key = p_key;
 }
 
 void PonSVGSprite2D::_draw_sprite() {
@@ -79,25 +214,105 @@ void PonSVGSprite2D::_draw_sprite() {
         return;
     }
     
-    _update_texture();
+    Vector2 pos = Vector2();
+    if (centered) {
+        pos = -draw_size / 2.0;
+    }
+    
+    Rect2 dst_rect = Rect2(pos, draw_size);
     
-    if (!texture_rid.is_valid()) {
+    // Premultiplied blending expects the modulate color premultiplied as well
+    Color modulate = modulate_color;
+    if (_uses_premultiplied_alpha()) {
+        modulate = Color(modulate.r * modulate.a, modulate.g * modulate.a, modulate.b * modulate.a, modulate.a);
+    }
+    
+    // Sprites sharing an atlas draw regions of the same texture, which the canvas renderer batches
+    RID atlas_texture;
+    Rect2 atlas_region;
+    if (_find_atlas_region(atlas_texture, atlas_region)) {
+        _release_texture();
+        _update_canvas_material();
+        RenderingServer::get_singleton()->canvas_item_add_texture_rect_region(get_canvas_item(), dst_rect, atlas_texture, atlas_region, modulate);
         return;
     }
     
-    Vector2 pos = Vector2();
-    if (centered) {
-        pos = -draw_size / 2.0;
+    if (needs_update && svg_resource.is_valid() && !_schedule_update()) {
+        _update_texture();
+    }
+    
+    RID texture = PonSVGTextureRegistry::get_texture(texture_key);
+    if (!texture.is_valid()) {
+        return;
+    }
+    
+    _update_canvas_material();
+    
+    // Draw texture, stretched over the sprite while a smaller placeholder is shown
+    RenderingServer::get_singleton()->canvas_item_add_texture_rect(get_canvas_item(), dst_rect, texture, false, modulate);
+}
+
+bool PonSVGSprite2D::_find_atlas_region(RID &r_texture, Rect2 &r_region) {
+    if (atlas.is_null() || atlas->get_ponsvg_resource() != svg_resource || atlas->is_premultiplied() != _uses_premultiplied_alpha()) {
+        return false;
+    }
+    
+    Vector2i size = Vector2i(int(draw_size.x), int(draw_size.y));
+    if (atlas->find_entry(symbol_id, size, r_texture, r_region)) {
+        return true;
+    }
+    
+    // Misses are added with the atlas's next deferred update, at a quantized size so resizing reuses entries;
+    // until then the sprite draws its own texture
+    Vector2i atlas_size = PonSVGAtlas::quantize_size(size);
+    if (atlas->find_entry(symbol_id, atlas_size, r_texture, r_region)) {
+        return true;
+    }
+    atlas->request_symbol(symbol_id, atlas_size);
+    return false;
+}
+
+// Drawing from the atlas, the sprite's own texture is dead weight
+void PonSVGSprite2D::_release_texture() {
+    if (PonSVGRenderScheduler::get_singleton()) {
+        PonSVGRenderScheduler::get_singleton()->cancel(this);
+    }
+    if (texture_key.is_empty() && pending_key.is_empty()) {
+        return;
     }
+    _cancel_pending_render();
+    PonSVGTextureRegistry::release(texture_key);
+    texture_key = String();
+    needs_update = true;
+}
+
+bool PonSVGSprite2D::_uses_premultiplied_alpha() const {
+    return premultiplied_output || (svg_resource.is_valid() && svg_resource->is_premultiplied_output());
+}
+
+void PonSVGSprite2D::_update_canvas_material() {
+    RenderingServer *rendering_server = RenderingServer::get_singleton();
     
-    Rect2 src_rect = Rect2(Vector2(), draw_size);
-    Rect2 dst_rect = Rect2(pos, draw_size);      if (material_override.is_valid()) {
-        // Set material on canvas item
-        RenderingServer::get_singleton()->canvas_item_set_material(get_canvas_item(), material_override->get_rid());
+    if (material_override.is_valid()) {
+        // Set material on canvas item; with premultiplied output its shader needs render_mode blend_premul_alpha
+        rendering_server->canvas_item_set_material(get_canvas_item(), material_override->get_rid());
+        premultiplied_material_applied = false;
+        return;
     }
     
-    // Draw texture
-    RenderingServer::get_singleton()->canvas_item_add_texture_rect_region(get_canvas_item(), dst_rect, texture_rid, src_rect, modulate_color, false, true);
+    if (_uses_premultiplied_alpha()) {
+        if (premultiplied_material.is_null()) {
+            premultiplied_material.instantiate();
+            premultiplied_material->set_blend_mode(CanvasItemMaterial::BLEND_MODE_PREMULT_ALPHA);
+        }
+        rendering_server->canvas_item_set_material(get_canvas_item(), premultiplied_material->get_rid());
+        premultiplied_material_applied = true;
+    } else if (premultiplied_material_applied) {
+        // Hand the canvas item back to the node's own material
+        Ref<Material> own_material = get_material();
+        rendering_server->canvas_item_set_material(get_canvas_item(), own_material.is_valid() ? own_material->get_rid() : RID());
+        premultiplied_material_applied = false;
+    }
 }
 
 void PonSVGSprite2D::set_ponsvg_resource(const Ref<PonSVGResource> &p_resource) {
@@ -124,17 +339,18 @@ Ref<PonSVGResource> PonSVGSprite2D::get_ponsvg_resource() const {
 }
 
 void PonSVGSprite2D::set_symbol_id(const String &p_id) {
-    if (symbol_id == p_id) {
+    StringName id = p_id;
+    if (symbol_id == id) {
         return;
     }
     
-    symbol_id = p_id;
+    symbol_id = id;
     needs_update = true;
     queue_redraw();
 }
 
 String PonSVGSprite2D::get_symbol_id() const {
-    return symbol_id;
+    return String(symbol_id);
 }
 
 void PonSVGSprite2D::set_draw_size(const Vector2 &p_size) {
@@ -190,6 +406,67 @@ Ref<ShaderMaterial> PonSVGSprite2D::get_material_override() const {
     return material_override;
 }
 
+void PonSVGSprite2D::set_premultiplied_output(bool p_enabled) {
+    if (premultiplied_output == p_enabled) {
+        return;
+    }
+    
+    premultiplied_output = p_enabled;
+    needs_update = true;
+    queue_redraw();
+}
+
+bool PonSVGSprite2D::is_premultiplied_output() const {
+    return premultiplied_output;
+}
+
+void PonSVGSprite2D::set_async_rendering(bool p_enabled) {
+    async_rendering = p_enabled;
+}
+
+bool PonSVGSprite2D::is_async_rendering() const {
+    return async_rendering;
+}
+
+void PonSVGSprite2D::set_placeholder_size(const Vector2i &p_size) {
+    placeholder_size = p_size;
+}
+
+Vector2i PonSVGSprite2D::get_placeholder_size() const {
+    return placeholder_size;
+}
+
+void PonSVGSprite2D::set_atlas(const Ref<PonSVGAtlas> &p_atlas) {
+    if (atlas == p_atlas) {
+        return;
+    }
+    
+    if (atlas.is_valid()) {
+        atlas->disconnect("changed", callable_mp((CanvasItem *)this, &CanvasItem::queue_redraw));
+    }
+    
+    atlas = p_atlas;
+    
+    if (atlas.is_valid()) {
+        // Repacking moves regions and overrides repaint them
+        atlas->connect("changed", callable_mp((CanvasItem *)this, &CanvasItem::queue_redraw));
+    }
+    
+    queue_redraw();
+}
+
+Ref<PonSVGAtlas> PonSVGSprite2D::get_atlas() const {
+    return atlas;
+}
+
+void PonSVGSprite2D::set_render_priority(int p_priority) {
+    render_priority = p_priority;
+}
+
+int PonSVGSprite2D::get_render_priority() const {
+    return render_priority;
+}
+
 void PonSVGSprite2D::force_update() {
     needs_update = true;
     queue_redraw();
@@ -5,8 +5,10 @@
 
 using namespace godot;
 #include <godot_cpp/classes/shader_material.hpp>
+#include <godot_cpp/classes/canvas_item_material.hpp>
 
 using namespace godot;
+#include "svg_atlas.h"
 #include "svg_resource.h"
 
 class PonSVGSprite2D : public Node2D {
@@ -14,18 +16,38 @@ class PonSVGSprite2D : public Node2D {
 
 private:
     Ref<PonSVGResource> svg_resource;
-    String symbol_id;
+    StringName symbol_id;  // Interned once here, so per-draw symbol lookups hash a pointer
     Vector2 draw_size;
     bool centered;
     Color modulate_color;
     Ref<ShaderMaterial> material_override;
+    bool premultiplied_output;
+    Ref<CanvasItemMaterial> premultiplied_material;  // Created on first use
+    bool premultiplied_material_applied;
     
-    Ref<Image> cached_image;
-    RID texture_rid;
+    bool async_rendering;
+    Vector2i placeholder_size;    // Shown until the first async raster arrives; zero disables it
+    int64_t pending_request;      // Async request whose result will be shown, 0 when none
+    int render_priority;          // Scheduled renders of higher priority run first
+    
+    Ref<PonSVGAtlas> atlas;       // Drawn from when it holds (or can take) this sprite's symbol and size
+    
+    String texture_key;           // Shared registry texture being drawn, empty before the first raster
+    String pending_key;           // Registry entry the pending async request will fill
     bool needs_update;
     
-    void _update_texture();
+    void _update_texture(bool p_background = false);
+    bool _schedule_update();
+    void _run_scheduled_update(bool p_background);
+    Ref<Image> _rasterize(const Vector2i &p_size, bool p_premultiplied);
+    void _on_async_render_completed(int64_t p_request_id, const Ref<Image> &p_image);
+    void _cancel_pending_render();
+    void _set_texture_key(const String &p_key);
     void _draw_sprite();
+    bool _find_atlas_region(RID &r_texture, Rect2 &r_region);
+    void _release_texture();
+    bool _uses_premultiplied_alpha() const;
+    void _update_canvas_material();
 
 protected:
     static void _bind_methods();
@@ -52,6 +74,21 @@ public:
     void set_material_override(const Ref<ShaderMaterial> &p_material);
     Ref<ShaderMaterial> get_material_override() const;
     
+    void set_premultiplied_output(bool p_enabled);
+    bool is_premultiplied_output() const;
+    
+    void set_async_rendering(bool p_enabled);
+    bool is_async_rendering() const;
+    
+    void set_placeholder_size(const Vector2i &p_size);
+    Vector2i get_placeholder_size() const;
+    
+    void set_atlas(const Ref<PonSVGAtlas> &p_atlas);
+    Ref<PonSVGAtlas> get_atlas() const;
+    
+    void set_render_priority(int p_priority);
+    int get_render_priority() const;
+    
     // Utility methods
     void force_update();
     Rect2 get_rect() const;
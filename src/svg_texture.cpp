@@ -1,13 +1,25 @@
 #include "svg_texture.h"
 #include <godot_cpp/classes/rendering_server.hpp>
 
+#include "svg_image_pool.h"
+#include "svg_render_scheduler.h"
+#include "svg_render_stats.h"
+
 PonSVGTexture::PonSVGTexture() {
     render_size = Vector2i(256, 256);
     needs_update = true;
-    texture_rid = RenderingServer::get_singleton()->texture_2d_create(Ref<Image>());
+    premultiplied_output = false;
+    async_rendering = false;
+    pending_request = 0;
+    render_priority = 0;
+    // Replaced by the first upload
+    texture_rid = RenderingServer::get_singleton()->texture_2d_placeholder_create();
 }
 
 PonSVGTexture::~PonSVGTexture() {
+    if (PonSVGRenderScheduler::get_singleton()) {
+        PonSVGRenderScheduler::get_singleton()->cancel(this);
+    }
     if (texture_rid.is_valid()) {
         RenderingServer::get_singleton()->free_rid(texture_rid);
     }
@@ -19,24 +31,123 @@ void PonSVGTexture::_bind_methods() {    ClassDB::bind_method(D_METHOD("set_pons
     ClassDB::bind_method(D_METHOD("set_render_size", "size"), &PonSVGTexture::set_render_size);
     ClassDB::bind_method(D_METHOD("get_render_size"), &PonSVGTexture::get_render_size);
     
+    ClassDB::bind_method(D_METHOD("set_premultiplied_output", "enabled"), &PonSVGTexture::set_premultiplied_output);
+    ClassDB::bind_method(D_METHOD("is_premultiplied_output"), &PonSVGTexture::is_premultiplied_output);
+    
+    ClassDB::bind_method(D_METHOD("set_async_rendering", "enabled"), &PonSVGTexture::set_async_rendering);
+    ClassDB::bind_method(D_METHOD("is_async_rendering"), &PonSVGTexture::is_async_rendering);
+    
+    ClassDB::bind_method(D_METHOD("set_placeholder_size", "size"), &PonSVGTexture::set_placeholder_size);
+    ClassDB::bind_method(D_METHOD("get_placeholder_size"), &PonSVGTexture::get_placeholder_size);
+    
+    ClassDB::bind_method(D_METHOD("set_render_priority", "priority"), &PonSVGTexture::set_render_priority);
+    ClassDB::bind_method(D_METHOD("get_render_priority"), &PonSVGTexture::get_render_priority);
+    
     ClassDB::bind_method(D_METHOD("force_update"), &PonSVGTexture::force_update);
     
     ADD_PROPERTY(PropertyInfo(Variant::OBJECT, "ponsvg_resource", PROPERTY_HINT_RESOURCE_TYPE, "PonSVGResource"), "set_ponsvg_resource", "get_ponsvg_resource");
     ADD_PROPERTY(PropertyInfo(Variant::VECTOR2I, "render_size"), "set_render_size", "get_render_size");
+    ADD_PROPERTY(PropertyInfo(Variant::BOOL, "premultiplied_output"), "set_premultiplied_output", "is_premultiplied_output");
+    ADD_PROPERTY(PropertyInfo(Variant::BOOL, "async_rendering"), "set_async_rendering", "is_async_rendering");
+    ADD_PROPERTY(PropertyInfo(Variant::VECTOR2I, "placeholder_size"), "set_placeholder_size", "get_placeholder_size");
+    ADD_PROPERTY(PropertyInfo(Variant::INT, "render_priority"), "set_render_priority", "get_render_priority");
+    
+    ADD_SIGNAL(MethodInfo("render_completed"));
 }
 
-void PonSVGTexture::_update_image() {
+void PonSVGTexture::_update_image(bool p_background) {
     if (!needs_update || svg_resource.is_null()) {
         return;
     }
     
-    cached_image = svg_resource->rasterize_full(render_size);
+    needs_update = false;
+    bool premultiplied = _uses_premultiplied_alpha();
+    
+    if (async_rendering || p_background) {
+        // Keep showing the previous raster; a cheap placeholder covers the very first one
+        if (uploaded_size == Vector2i() && placeholder_size.x > 0 && placeholder_size.y > 0) {
+            _upload_image(svg_resource->rasterize_full_with_alpha(placeholder_size, premultiplied));
+        }
+        pending_request = svg_resource->rasterize_async(String(), render_size, premultiplied, callable_mp(this, &PonSVGTexture::_on_async_render_completed));
+        return;
+    }
+    
+    // Hand the previous raster back first: if nothing else shares it, the new render reuses its memory
+    PonSVGImagePool::release(cached_image);
+    cached_image.unref();
     
+    cached_image = svg_resource->rasterize_full_with_alpha(render_size, premultiplied);
     if (cached_image.is_valid()) {
-        RenderingServer::get_singleton()->texture_2d_update(texture_rid, cached_image, 0);
+        _upload_image(cached_image);
+        emit_signal("render_completed");
+    }
+}
+
+// Drawing a dirty texture queues its render with the scheduler; the previous raster is drawn meanwhile
+void PonSVGTexture::_request_update(const Rect2 &p_rect) {
+    if (!needs_update || svg_resource.is_null()) {
+        return;
     }
     
-    needs_update = false;
+    // Only re-renders wait: with nothing to show yet, the texture would draw blank
+    PonSVGRenderScheduler *scheduler = PonSVGRenderScheduler::get_singleton();
+    if (scheduler && uploaded_size != Vector2i()) {
+        int64_t screen_area = int64_t(Math::abs(p_rect.size.x)) * int64_t(Math::abs(p_rect.size.y));
+        int64_t render_pixels = int64_t(render_size.x) * render_size.y;
+        if (async_rendering) {
+            // Nothing is rendered on the main thread
+            render_pixels = 0;
+        }
+        if (scheduler->schedule(this, callable_mp(this, &PonSVGTexture::_run_scheduled_update), render_priority, screen_area, render_pixels)) {
+            return;
+        }
+    }
+    _update_image();
+}
+
+void PonSVGTexture::_run_scheduled_update(bool p_background) {
+    _update_image(p_background);
+    // Lets whatever draws this texture redraw with the new raster
+    emit_changed();
+}
+
+void PonSVGTexture::_on_async_render_completed(int64_t p_request_id, const Ref<Image> &p_image) {
+    // Results of superseded requests are dropped
+    if (p_request_id != pending_request) {
+        return;
+    }
+    pending_request = 0;
+    if (p_image.is_null()) {
+        return;
+    }
+    
+    PonSVGImagePool::release(cached_image);
+    cached_image = p_image;
+    _upload_image(cached_image);
+    emit_changed();
+    emit_signal("render_completed");
+}
+
+void PonSVGTexture::_upload_image(const Ref<Image> &p_image) {
+    if (p_image.is_null()) {
+        return;
+    }
+    
+    PonSVGScopedTimer timer(PonSVGRenderStats::TIMING_UPLOAD);
+    RenderingServer *rendering_server = RenderingServer::get_singleton();
+    if (p_image->get_size() == uploaded_size) {
+        rendering_server->texture_2d_update(texture_rid, p_image, 0);
+    } else {
+        // Updates must keep the texture's size; a new size swaps in a new texture behind the same RID
+        rendering_server->texture_replace(texture_rid, rendering_server->texture_2d_create(p_image));
+        uploaded_size = p_image->get_size();
+    }
+    PonSVGRenderStats::record_upload_bytes(Image::get_image_data_size(p_image->get_width(), p_image->get_height(), p_image->get_format(), p_image->has_mipmaps()));
+}
+
+// Either side can ask for premultiplied data; the canvas item drawing it needs a premultiplied blend mode
+bool PonSVGTexture::_uses_premultiplied_alpha() const {
+    return premultiplied_output || (svg_resource.is_valid() && svg_resource->is_premultiplied_output());
 }
 
 int32_t PonSVGTexture::_get_width() const {
@@ -51,6 +162,29 @@ bool PonSVGTexture::_has_alpha() const {
     return true; // SVGs typically have alpha
 }
 
+void PonSVGTexture::_draw(const RID &p_to_canvas_item, const Vector2 &p_pos, const Color &p_modulate, bool p_transpose) const {
+    _draw_rect(p_to_canvas_item, Rect2(p_pos, render_size), false, p_modulate, p_transpose);
+}
+
+void PonSVGTexture::_draw_rect(const RID &p_to_canvas_item, const Rect2 &p_rect, bool p_tile, const Color &p_modulate, bool p_transpose) const {
+    const_cast<PonSVGTexture *>(this)->_request_update(p_rect);
+    if (uploaded_size == Vector2i()) {
+        return;
+    }
+    RenderingServer::get_singleton()->canvas_item_add_texture_rect(p_to_canvas_item, p_rect, texture_rid, p_tile, p_modulate, p_transpose);
+}
+
+void PonSVGTexture::_draw_rect_region(const RID &p_to_canvas_item, const Rect2 &p_rect, const Rect2 &p_src_rect, const Color &p_modulate, bool p_transpose, bool p_clip_uv) const {
+    const_cast<PonSVGTexture *>(this)->_request_update(p_rect);
+    if (uploaded_size == Vector2i()) {
+        return;
+    }
+    // Regions are in render_size pixels; a placeholder has fewer
+    Vector2 scale = Vector2(uploaded_size) / Vector2(render_size);
+    Rect2 src_rect = Rect2(p_src_rect.position * scale, p_src_rect.size * scale);
+    RenderingServer::get_singleton()->canvas_item_add_texture_rect_region(p_to_canvas_item, p_rect, texture_rid, src_rect, p_modulate, p_transpose, p_clip_uv);
+}
+
 void PonSVGTexture::set_ponsvg_resource(const Ref<PonSVGResource> &p_resource) {
     if (svg_resource == p_resource) {
         return;
@@ -88,6 +222,44 @@ Vector2i PonSVGTexture::get_render_size() const {
     return render_size;
 }
 
+void PonSVGTexture::set_premultiplied_output(bool p_enabled) {
+    if (premultiplied_output == p_enabled) {
+        return;
+    }
+    
+    premultiplied_output = p_enabled;
+    needs_update = true;
+    emit_changed();
+}
+
+bool PonSVGTexture::is_premultiplied_output() const {
+    return premultiplied_output;
+}
+
+void PonSVGTexture::set_async_rendering(bool p_enabled) {
+    async_rendering = p_enabled;
+}
+
+bool PonSVGTexture::is_async_rendering() const {
+    return async_rendering;
+}
+
+void PonSVGTexture::set_placeholder_size(const Vector2i &p_size) {
+    placeholder_size = p_size;
+}
+
+Vector2i PonSVGTexture::get_placeholder_size() const {
+    return placeholder_size;
+}
+
+void PonSVGTexture::set_render_priority(int p_priority) {
+    render_priority = p_priority;
+}
+
+int PonSVGTexture::get_render_priority() const {
+    return render_priority;
+}
+
 void PonSVGTexture::force_update() {
     needs_update = true;
     emit_changed();
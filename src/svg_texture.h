@@ -14,8 +14,19 @@ private:
     Vector2i render_size;
     Ref<Image> cached_image;
     bool needs_update;
+    bool premultiplied_output;
+    bool async_rendering;
+    Vector2i placeholder_size;    // Shown until the first async raster arrives; zero disables it
+    int64_t pending_request;      // Async request whose result will be shown, 0 when none
+    Vector2i uploaded_size;       // Size of the texture behind texture_rid
+    int render_priority;          // Scheduled renders of higher priority run first
     
-    void _update_image();
+    void _update_image(bool p_background = false);
+    void _request_update(const Rect2 &p_rect);
+    void _run_scheduled_update(bool p_background);
+    void _upload_image(const Ref<Image> &p_image);
+    void _on_async_render_completed(int64_t p_request_id, const Ref<Image> &p_image);
+    bool _uses_premultiplied_alpha() const;
 
 protected:
     static void _bind_methods();
@@ -25,13 +36,30 @@ public:
     ~PonSVGTexture();    // Texture2D interface
     virtual int32_t _get_width() const override;
     virtual int32_t _get_height() const override;
-    virtual bool _has_alpha() const override;// PonSVG-specific methods
+    virtual bool _has_alpha() const override;
+    // Drawing renders (or requests) the raster on first use
+    virtual void _draw(const RID &p_to_canvas_item, const Vector2 &p_pos, const Color &p_modulate, bool p_transpose) const override;
+    virtual void _draw_rect(const RID &p_to_canvas_item, const Rect2 &p_rect, bool p_tile, const Color &p_modulate, bool p_transpose) const override;
+    virtual void _draw_rect_region(const RID &p_to_canvas_item, const Rect2 &p_rect, const Rect2 &p_src_rect, const Color &p_modulate, bool p_transpose, bool p_clip_uv) const override;
+// PonSVG-specific methods
     void set_ponsvg_resource(const Ref<PonSVGResource> &p_resource);
     Ref<PonSVGResource> get_ponsvg_resource() const;
     
     void set_render_size(const Vector2i &p_size);
     Vector2i get_render_size() const;
     
+    void set_premultiplied_output(bool p_enabled);
+    bool is_premultiplied_output() const;
+    
+    void set_async_rendering(bool p_enabled);
+    bool is_async_rendering() const;
+    
+    void set_placeholder_size(const Vector2i &p_size);
+    Vector2i get_placeholder_size() const;
+    
+    void set_render_priority(int p_priority);
+    int get_render_priority() const;
+    
     void force_update();
 
 private:
@@ -0,0 +1,83 @@
+#include "svg_texture_registry.h"
+
+#include <godot_cpp/classes/rendering_server.hpp>
+
+#include "svg_render_stats.h"
+#include "svg_resource.h"
+
+using namespace godot;
+
+HashMap<String, PonSVGTextureRegistry::Entry> PonSVGTextureRegistry::entries;
+uint64_t PonSVGTextureRegistry::texture_count = 0;
+
+String PonSVGTextureRegistry::make_key(const PonSVGResource *p_resource, const StringName &p_symbol_id, const Vector2i &p_size, bool p_premultiplied) {
+    // The content revision changes with every override or reload that affects this symbol, so stale content
+    // never matches while textures of untouched symbols stay shared
+    return vformat("%d:%d:%s:%dx%d%s", (int64_t)p_resource->get_instance_id(), (int64_t)p_resource->get_content_revision(p_symbol_id), String(p_symbol_id), p_size.x, p_size.y, p_premultiplied ? String(":pm") : String());
+}
+
+void PonSVGTextureRegistry::acquire(const String &p_key) {
+    if (p_key.is_empty()) {
+        return;
+    }
+    if (!entries.has(p_key)) {
+        entries.insert(p_key, Entry());
+    }
+    entries[p_key].references++;
+}
+
+void PonSVGTextureRegistry::release(const String &p_key) {
+    Entry *entry = entries.getptr(p_key);
+    if (!entry) {
+        return;
+    }
+    entry->references--;
+    if (entry->references > 0) {
+        return;
+    }
+    if (entry->texture.is_valid()) {
+        RenderingServer::get_singleton()->free_rid(entry->texture);
+        texture_count--;
+    }
+    entries.erase(p_key);
+}
+
+RID PonSVGTextureRegistry::get_texture(const String &p_key) {
+    const Entry *entry = entries.getptr(p_key);
+    return entry ? entry->texture : RID();
+}
+
+void PonSVGTextureRegistry::upload(const String &p_key, const Ref<Image> &p_image) {
+    Entry *entry = entries.getptr(p_key);
+    ERR_FAIL_COND_MSG(!entry, "Texture uploaded without acquiring its key: " + p_key);
+    if (p_image.is_null()) {
+        return;
+    }
+
+    PonSVGScopedTimer timer(PonSVGRenderStats::TIMING_UPLOAD);
+    RenderingServer *rendering_server = RenderingServer::get_singleton();
+    if (entry->texture.is_valid() && p_image->get_size() == entry->size) {
+        rendering_server->texture_2d_update(entry->texture, p_image, 0);
+    } else if (entry->texture.is_valid()) {
+        // Updates must keep the texture's size; a new size swaps in a new texture behind the same RID
+        rendering_server->texture_replace(entry->texture, rendering_server->texture_2d_create(p_image));
+    } else {
+        entry->texture = rendering_server->texture_2d_create(p_image);
+        texture_count++;
+    }
+    entry->size = p_image->get_size();
+    PonSVGRenderStats::record_upload_bytes(Image::get_image_data_size(p_image->get_width(), p_image->get_height(), p_image->get_format(), p_image->has_mipmaps()));
+}
+
+Dictionary PonSVGTextureRegistry::get_stats() {
+    int64_t references = 0;
+    for (const KeyValue<String, Entry> &E : entries) {
+        references += E.value.references;
+    }
+
+    Dictionary stats;
+    stats["entries"] = (int64_t)entries.size();
+    stats["textures"] = (int64_t)texture_count;
+    stats["references"] = references;
+    return stats;
+}
@@ -0,0 +1,42 @@
+#ifndef PONSVG_TEXTURE_REGISTRY_H
+#define PONSVG_TEXTURE_REGISTRY_H
+
+#include <godot_cpp/classes/image.hpp>
+#include <godot_cpp/templates/hash_map.hpp>
+#include <godot_cpp/variant/dictionary.hpp>
+#include <godot_cpp/variant/rid.hpp>
+#include <godot_cpp/variant/string.hpp>
+#include <godot_cpp/variant/string_name.hpp>
+
+using namespace godot;
+
+class PonSVGResource;
+
+// GPU textures shared by every sprite showing the same content.
+// Keys combine the resource, its revision, the symbol, the size and the alpha
+// mode, so ten thousand identical sprites hold one texture and rasterize once.
+// Entries are reference counted by the sprites that acquired them; the texture
+// is only created by the first upload, so content that is never drawn never
+// allocates one. Main thread only, like the nodes using it.
+class PonSVGTextureRegistry {
+    struct Entry {
+        RID texture;
+        Vector2i size;
+        int references = 0;
+    };
+
+    static HashMap<String, Entry> entries;
+    static uint64_t texture_count;
+
+public:
+    static String make_key(const PonSVGResource *p_resource, const StringName &p_symbol_id, const Vector2i &p_size, bool p_premultiplied);
+    static void acquire(const String &p_key);
+    // Frees the texture with the last reference
+    static void release(const String &p_key);
+    // Invalid until some holder of the key uploads an image
+    static RID get_texture(const String &p_key);
+    static void upload(const String &p_key, const Ref<Image> &p_image);
+    static Dictionary get_stats();
+};
+
+#endif // PONSVG_TEXTURE_REGISTRY_H
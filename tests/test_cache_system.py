@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the global PonSVG render cache.
+Covers the process-wide byte budget, LRU eviction across resources,
+the per-resource cache statistics, dependency-based invalidation,
+content-addressed sharing between identical resources, size buckets
+and the persistent disk cache.
+"""
+
+# GDScript test code (to be run in Godot)
+cache_test_script = '''
+extends Node
+
+const ICON_SVG = """<svg width="64" height="64" xmlns="http://www.w3.org/2000/svg">
+    <defs>
+        <symbol id="dot" viewBox="0 0 24 24"><circle id="dot_circle" cx="12" cy="12" r="10" fill="blue"/></symbol>
+        <symbol id="box" viewBox="0 0 24 24"><rect id="box_rect" x="2" y="2" width="20" height="20" fill="red"/></symbol>
+    </defs>
+    <use href="#dot"/>
+</svg>"""
+
+func _ready():
+    print("=== PonSVG Cache System Test ===")
+    test_cache_size_reporting()
+    test_budget_eviction()
+    test_selective_invalidation()
+    test_shared_content()
+    test_size_buckets()
+    test_buffer_pool()
+    test_disk_cache()
+    print("=== Cache System Tests Complete ===")
+
+func test_cache_size_reporting():
+    print("\\n--- Cache Size Reporting ---")
+    PonSVGCacheManager.clear()
+
+    var resource = PonSVGResource.new()
+    resource.load_from_string(ICON_SVG)
+    resource.rasterize_full(Vector2i(128, 128))
+
+    var stats = resource.get_cache_size()
+    print("Cache size: ", stats)
+    if stats["entries"] == 1 and stats["bytes"] == 128 * 128 * 4:
+        print("✅ Entry count and byte usage reported")
+    else:
+        print("❌ Unexpected cache statistics")
+
+func test_budget_eviction():
+    print("\\n--- Global Budget Eviction ---")
+    PonSVGCacheManager.clear()
+    var previous_budget = PonSVGCacheManager.memory_budget
+
+    # Room for exactly two 128x128 RGBA rasters
+    PonSVGCacheManager.memory_budget = 2 * 128 * 128 * 4
+
+    var first = PonSVGResource.new()
+    first.load_from_string(ICON_SVG)
+    var second = PonSVGResource.new()
+    second.load_from_string(ICON_SVG)
+
+    first.rasterize_full(Vector2i(128, 128))
+    second.rasterize_full(Vector2i(128, 128))
+    first.rasterize_full(Vector2i(128, 128))  # Touch: second is now least recently used
+    first.rasterize_symbol("box", Vector2i(128, 128))
+
+    if second.get_cache_size()["entries"] == 0 and first.get_cache_size()["entries"] == 2:
+        print("✅ Least recently used raster evicted across resources")
+    else:
+        print("❌ LRU eviction order incorrect: ", PonSVGCacheManager.get_stats())
+
+    if PonSVGCacheManager.get_memory_usage() <= PonSVGCacheManager.memory_budget:
+        print("✅ Cache stays within its byte budget")
+
+    PonSVGCacheManager.memory_budget = previous_budget
+
+func test_selective_invalidation():
+    print("\\n--- Per-Element Invalidation ---")
+    PonSVGCacheManager.clear()
+
+    var resource = PonSVGResource.new()
+    resource.load_from_string(ICON_SVG)
+    print("Dependencies of 'dot': ", resource.get_symbol_dependencies("dot"))
+
+    var box_before = resource.rasterize_symbol("box", Vector2i(64, 64))
+    resource.rasterize_symbol("dot", Vector2i(64, 64))
+    resource.rasterize_full(Vector2i(64, 64))
+
+    # Only the 'dot' symbol and the full document contain dot_circle
+    resource.override_fill("dot_circle", Color.GREEN)
+
+    if resource.get_cache_size()["entries"] == 1:
+        print("✅ Override invalidated only dependent rasters")
+    else:
+        print("❌ Unexpected entries after override: ", resource.get_cache_size())
+
+    if resource.rasterize_symbol("box", Vector2i(64, 64)) == box_before:
+        print("✅ Unrelated symbol served from cache")
+
+func test_shared_content():
+    print("\\n--- Shared Content Between Identical Resources ---")
+    PonSVGCacheManager.clear()
+    var documents_before = PonSVGCacheManager.get_stats()["shared_documents"]
+
+    var copies = []
+    for i in range(100):
+        var copy = PonSVGResource.new()
+        copy.load_from_string(ICON_SVG)
+        copies.append(copy)
+
+    if PonSVGCacheManager.get_stats()["shared_documents"] == documents_before + 1:
+        print("✅ 100 identical resources share one parsed document")
+
+    var first_image = copies[0].rasterize_symbol("dot", Vector2i(64, 64))
+    if copies[99].rasterize_symbol("dot", Vector2i(64, 64)) == first_image:
+        print("✅ Raster rendered once and shared")
+
+    # Copy-on-write: an override on one copy must not leak into the others
+    copies[0].override_fill("dot_circle", Color.RED)
+    if copies[1].rasterize_symbol("dot", Vector2i(64, 64)) == first_image and copies[0].rasterize_symbol("dot", Vector2i(64, 64)) != first_image:
+        print("✅ Overrides stay local to the modified copy")
+
+    # A second copy reaching the same override state shares again
+    copies[1].override_fill("dot_circle", Color.RED)
+    if copies[1].rasterize_symbol("dot", Vector2i(64, 64)) == copies[0].rasterize_symbol("dot", Vector2i(64, 64)):
+        print("✅ Identical override state shares rasters")
+
+func test_size_buckets():
+    print("\\n--- Size Buckets ---")
+    PonSVGCacheManager.clear()
+
+    var resource = PonSVGResource.new()
+    resource.load_from_string(ICON_SVG)
+    resource.size_bucket_mode = PonSVGResource.SIZE_BUCKET_POWER_OF_TWO
+
+    # Simulate a zoom tween: every intermediate size falls into the 128px bucket
+    var sizes_ok = true
+    for size in range(65, 129, 3):
+        var image = resource.rasterize_full(Vector2i(size, size))
+        sizes_ok = sizes_ok and image.get_size() == Vector2i(size, size)
+
+    if sizes_ok:
+        print("✅ Every request returned at its exact size")
+    if resource.get_cache_size()["entries"] == 1:
+        print("✅ Intermediate sizes served from one cached bucket")
+    else:
+        print("❌ Unexpected entries: ", resource.get_cache_size())
+
+    # Shrinking below the bucket reuses the larger cached bucket instead of rendering
+    resource.rasterize_full(Vector2i(40, 40))
+    if resource.get_cache_size()["entries"] == 1:
+        print("✅ Smaller size downsampled from a larger cached bucket")
+
+    resource.size_bucket_mode = PonSVGResource.SIZE_BUCKET_STEP
+    resource.size_bucket_step = 32
+    print("Step bucket render size: ", resource.rasterize_full(Vector2i(70, 70)).get_size())
+
+func test_buffer_pool():
+    print("\\n--- Render Buffer Pool ---")
+    PonSVGCacheManager.clear()
+
+    var resource = PonSVGResource.new()
+    resource.load_from_string(ICON_SVG)
+
+    # Animated override: each change invalidates the cached raster, whose buffer the next render reuses
+    resource.rasterize_full(Vector2i(128, 128))
+    var before = PonSVGCacheManager.get_stats()["image_pool"]
+    for i in range(10):
+        resource.override_fill("dot_circle", Color(i / 10.0, 0.5, 1.0))
+        resource.rasterize_full(Vector2i(128, 128))
+    var after = PonSVGCacheManager.get_stats()["image_pool"]
+    print("Image pool: ", after)
+
+    if after["allocations"] == before["allocations"]:
+        print("✅ Steady-state re-renders reuse pooled buffers")
+    else:
+        print("❌ Re-renders allocated ", after["allocations"] - before["allocations"], " buffers")
+
+func test_disk_cache():
+    print("\\n--- Persistent Disk Cache ---")
+    PonSVGCacheManager.clear()
+    PonSVGCacheManager.disk_cache_enabled = true
+    PonSVGCacheManager.clear_disk_cache()
+
+    var resource = PonSVGResource.new()
+    resource.load_from_string(ICON_SVG)
+    var rendered = resource.rasterize_symbol("dot", Vector2i(96, 96))
+
+    # Simulate a warm start: memory is empty, the raster comes back from disk
+    PonSVGCacheManager.clear()
+    var restored = resource.rasterize_symbol("dot", Vector2i(96, 96))
+    var disk_stats = PonSVGCacheManager.get_stats()["disk"]
+    print("Disk cache: ", disk_stats)
+
+    if disk_stats["hits"] == 1 and restored.get_data() == rendered.get_data():
+        print("✅ Raster restored from disk without re-rendering")
+    else:
+        print("❌ Disk cache miss on warm start")
+
+    if PonSVGCacheManager.get_stats()["entries"] == 1:
+        print("✅ Disk hit promoted into the memory cache")
+
+    PonSVGCacheManager.clear_disk_cache()
+    PonSVGCacheManager.disk_cache_enabled = false
+'''
+
+print("PonSVG Cache System Test Script")
+print("=" * 50)
+print("Set the budget for a project with:")
+print("  Project Settings > ponsvg/cache/memory_budget_mb")
+print("Persist rasters across runs with:")
+print("  Project Settings > ponsvg/disk_cache/enabled")
+print()
+print("To run the test, attach this GDScript to a Node in a Godot scene:")
+print()
+print(cache_test_script)
@@ -25,6 +25,54 @@ func _ready():
     # Test performance optimization
     test_performance_optimization()
     
+    # Test pixel conversion accuracy
+    test_pixel_conversion()
+    
+    # Test tiled rendering of large targets
+    test_tiled_rendering()
+    
+    # Test batch rasterization across worker threads
+    test_batch_rasterization()
+    
+    # Test background rasterization
+    await test_async_rendering()
+    
+    # Test concurrent rasterization from worker threads
+    test_concurrent_rasterization()
+    
+    # Test partial re-rendering after paint changes
+    test_partial_rerender()
+    
+    # Test the id and symbol index across document copies
+    test_symbol_index()
+    
+    # Test override transactions
+    test_override_transactions()
+    
+    # Test paint values written by overrides
+    test_paint_values()
+    
+    # Test class overrides through the class index
+    test_class_index()
+    
+    # Test loading from UTF-8 bytes and the compressed source
+    test_buffer_loading()
+    
+    # Test loading .svg files through ResourceLoader on a loader thread
+    await test_resource_loader()
+    
+    # Test the compiled binary form
+    test_compiled_documents()
+    
+    # Test symbol atlas packing
+    await test_symbol_atlas()
+    
+    # Test textures shared between identical sprites
+    await test_shared_sprite_textures()
+    
+    # Test frame-budgeted render scheduling
+    await test_render_scheduler()
+    
     print("=== All Enhanced Tests Complete ===")
 
 func test_basic_functionality():
@@ -103,6 +151,45 @@ func test_caching_system():
     print("Cache disabled: ", !ponsvg_resource.is_cache_enabled())
     ponsvg_resource.set_cache_enabled(true)
     print("✅ Cache re-enabled: ", ponsvg_resource.is_cache_enabled())
+    
+    # Rasters carried over to a new override state are accounted once
+    var two_circles = """
+    <svg width="100" height="100" xmlns="http://www.w3.org/2000/svg">
+        <circle id="kept" cx="25" cy="50" r="20" fill="green"/>
+        <circle id="changed" cx="75" cy="50" r="20" fill="green"/>
+    </svg>
+    """
+    var symbols = PonSVGResource.new()
+    symbols.load_from_string(two_circles)
+    symbols.rasterize_symbol("kept", Vector2i(64, 64))
+    var before = symbols.get_cache_size()
+    symbols.override_fill("changed", Color.RED)
+    var after = symbols.get_cache_size()
+    if after["bytes"] == before["bytes"] and after["total_bytes"] == before["total_bytes"]:
+        print("✅ Moved rasters leave the old state's accounting")
+    
+    # The twin keeps the original state alive, so its rasters are copied instead
+    var original = PonSVGResource.new()
+    original.load_from_string(two_circles)
+    var twin = PonSVGResource.new()
+    twin.load_from_string(two_circles)
+    twin.rasterize_symbol("kept", Vector2i(64, 64))
+    before = twin.get_cache_size()
+    twin.override_fill("changed", Color.BLUE)
+    after = twin.get_cache_size()
+    if after["bytes"] == before["bytes"] and after["total_bytes"] == before["total_bytes"] and original.get_cache_size()["bytes"] == before["bytes"]:
+        print("✅ Copied rasters share their bytes with the source")
+    
+    # Clearing every override leaves nothing of the old state behind
+    var cleared = PonSVGResource.new()
+    cleared.load_from_string(two_circles.replace("green", "olive"))
+    cleared.override_fill("changed", Color.RED)
+    cleared.rasterize_full(Vector2i(64, 64))
+    before = cleared.get_cache_size()
+    cleared.clear_all_overrides()
+    after = cleared.get_cache_size()
+    if after["entries"] == 0 and after["total_bytes"] == before["total_bytes"] - before["bytes"]:
+        print("✅ Clearing all overrides releases the old state's rasters")
 
 func test_lod_system():
     print("\\n--- Testing LOD System ---")
@@ -195,6 +282,13 @@ func test_performance_optimization():
     print("Total render time: ", total_time, "ms")
     print("Final cache size: ", ponsvg_resource.get_cache_size())
     
+    # Global counters and timing histograms (also exposed as PonSVG/* Performance monitors)
+    var stats = PonSVGResource.get_render_stats()
+    print("Cache hits/misses: ", stats["cache_hits"], "/", stats["cache_misses"])
+    print("Render time: ", stats["render"]["total_usec"], "us over ", stats["render"]["count"], " renders")
+    if Performance.has_custom_monitor("PonSVG/render_msec_per_frame"):
+        print("✅ PonSVG Performance monitors registered")
+    
     # Test style overrides with caching
     print("\\n--- Testing Style Overrides with Caching ---")
     ponsvg_resource.clear_cache()
@@ -210,6 +304,633 @@ func test_performance_optimization():
     
     print("✅ Performance optimization tests complete")
 
+func test_pixel_conversion():
+    print("\\n--- Testing Pixel Conversion ---")
+    
+    # Opaque, semi-transparent and empty regions exercise every conversion path
+    var ponsvg_resource = PonSVGResource.new()
+    ponsvg_resource.load_from_string("""
+    <svg width="96" height="32" xmlns="http://www.w3.org/2000/svg">
+        <rect x="0" y="0" width="32" height="32" fill="rgb(255,128,0)"/>
+        <rect x="32" y="0" width="32" height="32" fill="rgb(0,64,255)" fill-opacity="0.5"/>
+    </svg>
+    """)
+    
+    var image = ponsvg_resource.rasterize_full(Vector2i(96, 32))
+    var opaque = image.get_pixel(16, 16)
+    var translucent = image.get_pixel(48, 16)
+    var empty = image.get_pixel(80, 16)
+    print("Opaque: ", opaque, " translucent: ", translucent, " empty: ", empty)
+    
+    if opaque.r8 == 255 and opaque.g8 == 128 and opaque.b8 == 0 and opaque.a8 == 255:
+        print("✅ Opaque pixels keep their color and channel order")
+    if abs(translucent.b8 - 255) <= 1 and abs(translucent.g8 - 64) <= 1 and abs(translucent.a8 - 128) <= 1:
+        print("✅ Translucent pixels un-premultiplied")
+    if empty.a8 == 0:
+        print("✅ Transparent pixels stay transparent")
+    
+    # Premultiplied output keeps LunaSVG's color: 50% blue stays (0, 32, 128, 128)
+    ponsvg_resource.premultiplied_output = true
+    var premultiplied = ponsvg_resource.rasterize_full(Vector2i(96, 32)).get_pixel(48, 16)
+    print("Premultiplied translucent: ", premultiplied)
+    if abs(premultiplied.b8 - 128) <= 1 and abs(premultiplied.a8 - 128) <= 1:
+        print("✅ Premultiplied output only swizzles channels")
+    ponsvg_resource.premultiplied_output = false
+    
+    # Large render to compare conversion cost with the render itself
+    PonSVGResource.reset_render_stats()
+    ponsvg_resource.rasterize_full(Vector2i(2048, 2048))
+    var stats = PonSVGResource.get_render_stats()
+    print("2048x2048 render: ", stats["render"]["total_usec"], "us, conversion: ", stats["convert"]["total_usec"], "us")
+
+func test_tiled_rendering():
+    print("\\n--- Testing Tiled Rendering ---")
+    
+    var ponsvg_resource = PonSVGResource.new()
+    ponsvg_resource.load_from_string("""
+    <svg width="100" height="100" xmlns="http://www.w3.org/2000/svg">
+        <rect x="0" y="0" width="50" height="100" fill="rgb(255,0,0)"/>
+        <circle cx="75" cy="50" r="20" fill="rgb(0,0,255)"/>
+    </svg>
+    """)
+    
+    # Above one megapixel the render is split into tiles; seams must not show
+    var full = ponsvg_resource.rasterize_full(Vector2i(2000, 2000))
+    var left = full.get_pixel(511, 1000)
+    var across_seam = full.get_pixel(512, 1000)
+    if left == across_seam and left.r8 == 255:
+        print("✅ Tiles line up across the seam")
+    
+    # Separate tiles cover the target and match the single-image render
+    var tiles = ponsvg_resource.rasterize_tiles(Vector2i(2000, 2000), Vector2i(768, 768))
+    print("Tiles: ", tiles.size())
+    if tiles.size() == 9:
+        print("✅ Tile grid covers the target")
+    var last = tiles[tiles.size() - 1]
+    if last["rect"] == Rect2i(1536, 1536, 464, 464) and last["image"].get_size() == Vector2i(464, 464):
+        print("✅ Edge tiles are clipped to the target")
+    
+    # A single region streams out of a render too big to allocate at once
+    var region = ponsvg_resource.rasterize_region(Vector2i(16000, 16000), Rect2i(11500, 7900, 256, 256))
+    if region and region.get_pixel(128, 128).b8 == 255:
+        print("✅ Region of a huge render rendered without the full buffer")
+
+func test_batch_rasterization():
+    print("\\n--- Testing Batch Rasterization ---")
+    
+    var ponsvg_resource = PonSVGResource.new()
+    var symbols = ""
+    for i in range(64):
+        symbols += '<symbol id="icon%d" viewBox="0 0 24 24"><circle cx="12" cy="12" r="%d" fill="blue"/></symbol>' % [i, 4 + i % 8]
+    ponsvg_resource.load_from_string('<svg width="100" height="100" xmlns="http://www.w3.org/2000/svg"><defs>%s</defs></svg>' % symbols)
+    
+    var requests = []
+    for i in range(64):
+        requests.append(["icon%d" % i, Vector2i(128, 128)])
+    requests.append({"symbol_id": "icon0", "size": Vector2i(128, 128)})
+    requests.append(["missing", Vector2i(128, 128)])
+    
+    var start_time = Time.get_ticks_usec()
+    var results = ponsvg_resource.rasterize_batch(requests)
+    var batch_time = Time.get_ticks_usec() - start_time
+    
+    var rendered = 0
+    var render_usec = 0
+    for result in results:
+        if result["image"]:
+            rendered += 1
+            render_usec += result["usec"]
+    print("Batch of ", requests.size(), ": ", batch_time, "us wall, ", render_usec, "us summed render time")
+    if results.size() == requests.size() and rendered == 65 and results[65]["image"] == null:
+        print("✅ Batch returns one result per request")
+    
+    # The batch filled the cache, so single requests are now hits
+    var before = PonSVGResource.get_render_stats()["cache_hits"]
+    ponsvg_resource.rasterize_symbol("icon10", Vector2i(128, 128))
+    if PonSVGResource.get_render_stats()["cache_hits"] > before:
+        print("✅ Batch results are cached")
+    
+    var cached = ponsvg_resource.rasterize_batch(requests.slice(0, 8))
+    if cached.all(func(result): return result["cached"]):
+        print("✅ Repeated batch served from cache")
+
+func test_async_rendering():
+    print("\\n--- Testing Async Rendering ---")
+    
+    var ponsvg_resource = PonSVGResource.new()
+    ponsvg_resource.load_from_string("""
+    <svg width="100" height="100" xmlns="http://www.w3.org/2000/svg">
+        <defs>
+            <symbol id="icon" viewBox="0 0 24 24"><rect width="24" height="24" fill="red"/></symbol>
+        </defs>
+        <circle cx="50" cy="50" r="40" fill="green"/>
+    </svg>
+    """)
+    
+    # The request returns immediately; the image arrives on the main thread
+    var request_id = ponsvg_resource.rasterize_symbol_async("icon", Vector2i(256, 256))
+    var result = await ponsvg_resource.rasterization_completed
+    if result[0] == request_id and result[1] == "icon" and result[2].get_size() == Vector2i(256, 256):
+        print("✅ Async symbol raster delivered")
+    
+    # Sprites keep drawing (a placeholder here) until the background render is uploaded
+    var sprite = PonSVGSprite2D.new()
+    sprite.async_rendering = true
+    sprite.placeholder_size = Vector2i(16, 16)
+    sprite.ponsvg_resource = ponsvg_resource
+    sprite.draw_size = Vector2(512, 512)
+    add_child(sprite)
+    await sprite.render_completed
+    print("✅ Async sprite raster uploaded")
+    sprite.queue_free()
+    
+    var texture = PonSVGTexture.new()
+    texture.async_rendering = true
+    texture.ponsvg_resource = ponsvg_resource
+    texture.render_size = Vector2i(1024, 1024)
+    var rect = TextureRect.new()
+    rect.texture = texture
+    add_child(rect)
+    await texture.render_completed
+    print("✅ Async texture raster uploaded")
+    rect.queue_free()
+
+var stress_resource: PonSVGResource
+var stress_failures := 0
+var stress_mutex := Mutex.new()
+
+func test_concurrent_rasterization():
+    print("\\n--- Testing Concurrent Rasterization ---")
+    
+    stress_resource = PonSVGResource.new()
+    var symbols = ""
+    for i in range(16):
+        symbols += '<symbol id="icon%d" viewBox="0 0 24 24"><rect id="shape%d" class="themed" width="24" height="24" fill="red"/></symbol>' % [i, i]
+    stress_resource.load_from_string('<svg width="100" height="100" xmlns="http://www.w3.org/2000/svg"><defs>%s</defs></svg>' % symbols)
+    
+    # Workers render every symbol at varying sizes while the main thread keeps changing overrides
+    stress_failures = 0
+    var group_id = WorkerThreadPool.add_group_task(_stress_rasterize, 2000, -1, true)
+    var colors = [Color.BLUE, Color.GREEN, Color.YELLOW]
+    var changes = 0
+    while not WorkerThreadPool.is_group_task_completed(group_id):
+        stress_resource.override_fill("shape%d" % (changes % 16), colors[changes % 3])
+        stress_resource.override_fill_by_class("themed", colors[(changes + 1) % 3])
+        if changes % 5 == 0:
+            stress_resource.clear_all_overrides()
+        changes += 1
+    WorkerThreadPool.wait_for_group_task_completion(group_id)
+    print("Override changes during the stress run: ", changes)
+    
+    if stress_failures == 0:
+        print("✅ 2000 concurrent renders all produced images")
+    else:
+        print("❌ Concurrent renders failed: ", stress_failures)
+    
+    # After the dust settles, renders reflect the final override state; id overrides beat class overrides
+    stress_resource.override_fill("shape3", Color(0, 1, 0))
+    stress_resource.override_fill_by_class("themed", Color(0, 0, 1))
+    var pixel = stress_resource.rasterize_symbol("icon3", Vector2i(32, 32)).get_pixel(16, 16)
+    if pixel.g8 == 255 and pixel.r8 == 0:
+        print("✅ Final override state rendered")
+
+func _stress_rasterize(index: int):
+    var size = Vector2i(16 + (index % 4) * 16, 16 + (index % 4) * 16)
+    var image = stress_resource.rasterize_symbol("icon%d" % (index % 16), size)
+    if image == null or image.get_size() != size:
+        stress_mutex.lock()
+        stress_failures += 1
+        stress_mutex.unlock()
+
+func test_partial_rerender():
+    print("\\n--- Testing Partial Re-rendering ---")
+    
+    var ponsvg_resource = PonSVGResource.new()
+    ponsvg_resource.load_from_string("""
+    <svg width="100" height="100" xmlns="http://www.w3.org/2000/svg">
+        <rect x="0" y="0" width="100" height="100" fill="rgb(40,40,40)"/>
+        <circle id="indicator" cx="20" cy="20" r="5" fill="red"/>
+        <rect class="led" x="70" y="70" width="10" height="10" fill="red"/>
+        <circle id="referenced" cx="50" cy="80" r="5" fill="red"/>
+        <use href="#referenced" x="-30"/>
+    </svg>
+    """)
+    
+    var size = Vector2i(2048, 2048)
+    var full_time = Time.get_ticks_usec()
+    ponsvg_resource.rasterize_full(size)
+    full_time = Time.get_ticks_usec() - full_time
+    
+    # A small repaint patches the previous raster instead of rendering the whole document
+    PonSVGResource.reset_render_stats()
+    ponsvg_resource.override_fill("indicator", Color(0, 1, 0))
+    var patch_time = Time.get_ticks_usec()
+    var patched = ponsvg_resource.rasterize_full(size)
+    patch_time = Time.get_ticks_usec() - patch_time
+    print("Full render: ", full_time, "us, patched re-render: ", patch_time, "us")
+    if PonSVGResource.get_render_stats()["partial_renders"] == 1:
+        print("✅ Indicator change re-rendered only its area")
+    if patched.get_pixel(410, 410).g8 == 255 and patched.get_pixel(1024, 1024).r8 == 40:
+        print("✅ Patched raster shows the change and keeps the rest")
+    
+    # Consecutive changes without a render in between combine their areas
+    ponsvg_resource.override_fill("indicator", Color(0, 0, 1))
+    ponsvg_resource.override_fill_by_class("led", Color(0, 1, 0))
+    patched = ponsvg_resource.rasterize_full(size)
+    var reference = PonSVGResource.new()
+    reference.load_from_string(ponsvg_resource.get_svg_data())
+    reference.override_fill("indicator", Color(0, 0, 1))
+    reference.override_fill_by_class("led", Color(0, 1, 0))
+    reference.cache_enabled = false
+    if PonSVGResource.get_render_stats()["partial_renders"] == 2 and patched.get_data() == reference.rasterize_full(size).get_data():
+        print("✅ Patched raster matches a full render")
+    
+    # An element drawn elsewhere through <use> needs the full document
+    ponsvg_resource.override_fill("referenced", Color(0, 1, 0))
+    patched = ponsvg_resource.rasterize_full(size)
+    if PonSVGResource.get_render_stats()["partial_renders"] == 2 and patched.get_pixel(410, 1638).g8 == 255:
+        print("✅ Referenced element change rendered in full")
+    
+    # Strokes widened through CSS are invisible to the attribute-based bounds, so these render in full
+    # Only the width comes from CSS: a CSS stroke color would win over the override's attribute
+    for styling in ['style="stroke-width:30"', 'class="wide"']:
+        var sheet = "<style>.wide { stroke-width: 30; }</style>" if styling.begins_with("class") else ""
+        var styled = PonSVGResource.new()
+        styled.load_from_string("""
+        <svg width="100" height="100" xmlns="http://www.w3.org/2000/svg">
+            %s
+            <rect id="framed" x="40" y="40" width="20" height="20" fill="gray" stroke="red" %s/>
+        </svg>
+        """ % [sheet, styling])
+        styled.rasterize_full(Vector2i(100, 100))
+        styled.override_stroke("framed", Color(0, 0, 1))
+        if styled.rasterize_full(Vector2i(100, 100)).get_pixel(30, 50).b8 == 255:
+            print("✅ CSS-styled stroke repainted in full (%s)" % styling.get_slice("=", 0))
+    
+    # A sharp join under a raised miter limit reaches far past the stroke width
+    var mitered = PonSVGResource.new()
+    mitered.load_from_string("""
+    <svg width="100" height="100" xmlns="http://www.w3.org/2000/svg">
+        <polyline id="spike" points="10,50 60,47 10,44" fill="none" stroke="red" stroke-width="4" stroke-miterlimit="20"/>
+    </svg>
+    """)
+    mitered.rasterize_full(Vector2i(100, 100))
+    mitered.override_stroke("spike", Color(0, 0, 1))
+    var tip = mitered.rasterize_full(Vector2i(100, 100)).get_pixel(72, 47)
+    if tip.b8 > tip.r8:
+        print("✅ Miter joins repainted up to the miter limit")
+    
+    # Relative stroke widths are not resolved, so the change renders in full
+    var relative = PonSVGResource.new()
+    relative.load_from_string("""
+    <svg width="100" height="100" xmlns="http://www.w3.org/2000/svg">
+        <rect id="framed" x="40" y="40" width="20" height="20" fill="gray" stroke="red" stroke-width="10%"/>
+    </svg>
+    """)
+    relative.rasterize_full(Vector2i(100, 100))
+    PonSVGResource.reset_render_stats()
+    relative.override_stroke("framed", Color(0, 0, 1))
+    relative.rasterize_full(Vector2i(100, 100))
+    if PonSVGResource.get_render_stats()["partial_renders"] == 0:
+        print("✅ Percentage stroke width rendered in full")
+
+func test_symbol_index():
+    print("\\n--- Testing Symbol Index ---")
+    
+    var svg = """
+    <svg width="100" height="100" xmlns="http://www.w3.org/2000/svg">
+        <defs>
+            <symbol id="badge" viewBox="0 0 10 10"><rect id="badge_bg" width="10" height="10" fill="red"/></symbol>
+            <symbol id="dot" viewBox="0 0 10 10"><circle cx="5" cy="5" r="5" fill="blue"/></symbol>
+        </defs>
+    </svg>
+    """
+    var first = PonSVGResource.new()
+    first.load_from_string(svg)
+    var second = PonSVGResource.new()
+    second.load_from_string(svg)
+    
+    if first.get_symbol_ids() == PackedStringArray(["badge", "dot"]) and first.has_symbol(&"badge"):
+        print("✅ Symbols listed in document order")
+    var data = first.get_symbol_data("badge")
+    if data["viewBox"] == "0 0 10 10" and first.get_symbols().size() == 2:
+        print("✅ Symbol data built from the symbol table")
+    
+    # The shared document is copied on write; the copy's symbols resolve into its own tree
+    second.override_fill("badge_bg", Color(0, 1, 0))
+    var original = first.rasterize_symbol("badge", Vector2i(16, 16)).get_pixel(8, 8)
+    var changed = second.rasterize_symbol(&"badge", Vector2i(16, 16)).get_pixel(8, 8)
+    if original.r8 == 255 and changed.g8 == 255:
+        print("✅ Symbols of a copied document render the copy")
+    
+    var start_time = Time.get_ticks_usec()
+    for i in range(10000):
+        first.has_symbol(&"dot")
+    print("10000 symbol lookups: ", Time.get_ticks_usec() - start_time, "us")
+
+var changed_count := 0
+
+func _on_resource_changed():
+    changed_count += 1
+
+func test_override_transactions():
+    print("\\n--- Testing Override Transactions ---")
+    
+    var ponsvg_resource = PonSVGResource.new()
+    var shapes = ""
+    for i in range(40):
+        shapes += '<rect id="swatch%d" class="swatch" x="%d" y="0" width="2" height="10" fill="black" stroke-width="0"/>' % [i, i * 2]
+    ponsvg_resource.load_from_string('<svg width="80" height="10" xmlns="http://www.w3.org/2000/svg">%s</svg>' % shapes)
+    ponsvg_resource.changed.connect(_on_resource_changed)
+    
+    # A 40-color theme arrives as one change
+    changed_count = 0
+    var revision = ponsvg_resource.get_revision()
+    var theme = {}
+    for i in range(40):
+        theme["swatch%d" % i] = Color(float(i) / 40.0, 1, 0)
+    ponsvg_resource.apply_overrides({"fill": theme, "stroke": {".swatch": Color.WHITE}})
+    if changed_count == 1 and ponsvg_resource.get_revision() == revision + 1:
+        print("✅ apply_overrides emitted changed once")
+    var pixel = ponsvg_resource.rasterize_full(Vector2i(80, 10)).get_pixel(79, 5)
+    if pixel.g8 == 255 and pixel.r8 > 200:
+        print("✅ Every override of the transaction rendered")
+    
+    # Setters inside begin/commit are held back until the outermost commit
+    changed_count = 0
+    ponsvg_resource.begin_overrides()
+    ponsvg_resource.override_fill("swatch0", Color.RED)
+    ponsvg_resource.begin_overrides()
+    ponsvg_resource.clear_fill_override("swatch1")
+    ponsvg_resource.commit_overrides()
+    var held_back = changed_count == 0
+    ponsvg_resource.commit_overrides()
+    if held_back and changed_count == 1:
+        print("✅ Nested transactions emit changed once, at the outermost commit")
+    var image = ponsvg_resource.rasterize_full(Vector2i(80, 10))
+    if image.get_pixel(1, 5).r8 == 255 and image.get_pixel(3, 5).g8 == 0:
+        print("✅ Cleared override restored the original fill")
+
+func test_paint_values():
+    print("\\n--- Testing Paint Values ---")
+    
+    var ponsvg_resource = PonSVGResource.new()
+    ponsvg_resource.load_from_string("""
+    <svg width="10" height="10" xmlns="http://www.w3.org/2000/svg">
+        <rect id="box" width="10" height="10" fill="black"/>
+    </svg>
+    """)
+    
+    ponsvg_resource.override_fill("box", Color(1, 0.5, 0, 1))
+    var opaque = ponsvg_resource.rasterize_full(Vector2i(10, 10)).get_pixel(5, 5)
+    if opaque.r8 == 255 and opaque.g8 == 127 and opaque.a8 == 255:
+        print("✅ Opaque fill written as a hex color")
+    
+    ponsvg_resource.override_fill("box", Color(0, 0, 1, 0.25))
+    var translucent = ponsvg_resource.rasterize_full(Vector2i(10, 10)).get_pixel(5, 5)
+    if translucent.b8 >= 250 and abs(translucent.a8 - 64) <= 1:
+        print("✅ Translucent fill keeps its alpha")
+
+func test_class_index():
+    print("\\n--- Testing Class Index ---")
+    
+    var ponsvg_resource = PonSVGResource.new()
+    ponsvg_resource.load_from_string("""
+    <svg width="30" height="10" xmlns="http://www.w3.org/2000/svg">
+        <rect id="a" class="tile warm" x="0" width="10" height="10" fill="black"/>
+        <rect id="b" class="tile" x="10" width="10" height="10" fill="black"/>
+        <rect id="c" class="warm  tile" x="20" width="10" height="10" fill="black"/>
+    </svg>
+    """)
+    
+    ponsvg_resource.override_fill_by_class("tile", Color(0, 0, 1))
+    ponsvg_resource.override_fill_by_class("tile.warm", Color(1, 0, 0))
+    ponsvg_resource.override_fill("c", Color(0, 1, 0))
+    var image = ponsvg_resource.rasterize_full(Vector2i(30, 10))
+    var a = image.get_pixel(5, 5)
+    var b = image.get_pixel(15, 5)
+    var c = image.get_pixel(25, 5)
+    if a.r8 == 255 and b.b8 == 255 and b.r8 == 0 and c.g8 == 255:
+        print("✅ Class overrides reach every member, multi-class keys match all classes, id overrides win")
+
+func test_buffer_loading():
+    print("\\n--- Testing Buffer Loading ---")
+    
+    var source = '<svg width="10" height="10" xmlns="http://www.w3.org/2000/svg"><rect id="box" width="10" height="10" fill="red"/></svg>'
+    var ponsvg_resource = PonSVGResource.new()
+    ponsvg_resource.compress_source = true
+    if ponsvg_resource.load_from_buffer(source.to_utf8_buffer()) == OK and ponsvg_resource.rasterize_full(Vector2i(10, 10)).get_pixel(5, 5).r8 == 255:
+        print("✅ SVG loaded from UTF-8 bytes")
+    
+    # Clearing an override re-parses from the compressed source
+    ponsvg_resource.override_fill("box", Color(0, 0, 1))
+    ponsvg_resource.clear_fill_override("box")
+    var pixel = ponsvg_resource.rasterize_full(Vector2i(10, 10)).get_pixel(5, 5)
+    if pixel.r8 == 255 and ponsvg_resource.get_svg_data() == source:
+        print("✅ Compressed source re-parses and decodes intact")
+
+func test_resource_loader():
+    print("\\n--- Testing Resource Loader ---")
+    
+    var path = "user://ponsvg_loader_test.svg"
+    var file = FileAccess.open(path, FileAccess.WRITE)
+    file.store_string('<svg width="24" height="24" xmlns="http://www.w3.org/2000/svg"><symbol id="dot" viewBox="0 0 24 24"><circle cx="12" cy="12" r="10"/></symbol></svg>')
+    file.close()
+    
+    ResourceLoader.load_threaded_request(path, "PonSVGResource")
+    while ResourceLoader.load_threaded_get_status(path) == ResourceLoader.THREAD_LOAD_IN_PROGRESS:
+        await get_tree().process_frame
+    var resource = ResourceLoader.load_threaded_get(path)
+    if resource is PonSVGResource and resource.has_symbol("dot"):
+        print("✅ Threaded load produced a parsed PonSVGResource")
+    if load(path) == resource:
+        print("✅ Repeated loads come from the resource cache")
+
+func test_compiled_documents():
+    print("\\n--- Testing Compiled Documents ---")
+    
+    var source = PonSVGResource.new()
+    source.load_from_string('<svg width="24" height="24" xmlns="http://www.w3.org/2000/svg"><symbol id="mark" viewBox="0 0 24 24"><rect id="mark_fill" width="24" height="24" fill="red"/></symbol><rect width="24" height="24" fill="blue"/></svg>')
+    var data = source.compile()
+    
+    var compiled = PonSVGResource.new()
+    if compiled.load_compiled(data) == OK and compiled.has_symbol("mark") and compiled.get_symbol_dependencies("mark").has("mark_fill"):
+        print("✅ Compiled document answers symbol queries")
+    
+    var expected = source.rasterize_full(Vector2i(24, 24))
+    var actual = compiled.rasterize_full(Vector2i(24, 24))
+    if actual.get_data() == expected.get_data():
+        print("✅ Compiled document renders like its source")
+    
+    var baked = PonSVGResource.new()
+    baked.load_compiled(source.compile({"mark": [Vector2i(16, 16)]}))
+    PonSVGResource.reset_render_stats()
+    var baked_image = baked.rasterize_symbol("mark", Vector2i(16, 16))
+    if baked_image.get_pixel(8, 8).r8 == 255 and PonSVGResource.get_render_stats()["cache_misses"] == 0:
+        print("✅ Baked sizes are served without rendering")
+    
+    # Bakes are override-free, so a resource that already has overrides renders its own state
+    var overridden = PonSVGResource.new()
+    overridden.override_fill("mark_fill", Color(0, 1, 0))
+    overridden.load_compiled(source.compile({"mark": [Vector2i(16, 16)]}))
+    if overridden.rasterize_symbol("mark", Vector2i(16, 16)).get_pixel(8, 8).g8 == 255:
+        print("✅ Baked rasters are not served for overridden state")
+    
+    data[4] = 99
+    if PonSVGResource.new().load_compiled(data) != OK:
+        print("✅ Unknown format versions are rejected")
+
+func test_symbol_atlas():
+    print("\\n--- Testing Symbol Atlas ---")
+    
+    var symbols = ""
+    for i in range(20):
+        symbols += '<symbol id="s%d" viewBox="0 0 10 10"><rect id="r%d" width="10" height="10" fill="red"/></symbol>' % [i, i]
+    var ponsvg_resource = PonSVGResource.new()
+    ponsvg_resource.load_from_string('<svg width="10" height="10" xmlns="http://www.w3.org/2000/svg">%s</svg>' % symbols)
+    
+    var atlas = ponsvg_resource.build_atlas(ponsvg_resource.get_symbol_ids(), Vector2i(32, 32))
+    atlas.page_size = 256
+    if atlas.get_page_count() == 1 and atlas.get_region("s0", Vector2i(32, 32)).size == Vector2i(32, 32):
+        print("✅ Symbols packed into shared pages")
+    
+    var page = atlas.get_page_texture(atlas.get_page("s3", Vector2i(32, 32))).get_image()
+    var region = atlas.get_region("s3", Vector2i(32, 32))
+    if page.get_pixel(region.position.x + 16, region.position.y + 16).r8 == 255:
+        print("✅ Atlas regions hold the symbol rasters")
+    
+    # A larger entry still fits the one page after repacking
+    atlas.add_symbol("s0", Vector2i(64, 64))
+    if atlas.has_symbol("s0", Vector2i(64, 64)) and atlas.get_page_count() == 1:
+        print("✅ Atlas grows by repacking")
+    
+    # Only the touched symbol changes, and the atlas re-renders it once, deferred
+    var s4_revision = ponsvg_resource.get_content_revision("s4")
+    ponsvg_resource.override_fill("r3", Color(0, 1, 0))
+    ponsvg_resource.override_fill("r3", Color(0, 0, 1))
+    if ponsvg_resource.get_content_revision("s4") == s4_revision and ponsvg_resource.get_content_revision("s3") == ponsvg_resource.get_revision():
+        print("✅ Overrides only touch their own symbols")
+    await get_tree().process_frame
+    page = atlas.get_page_texture(atlas.get_page("s3", Vector2i(32, 32))).get_image()
+    region = atlas.get_region("s3", Vector2i(32, 32))
+    if page.get_pixel(region.position.x + 16, region.position.y + 16).b8 == 255:
+        print("✅ Overrides re-render atlas entries")
+    
+    # Sprite sizes missing from the atlas are requested, not rendered while drawing, and capped per symbol
+    for size in [40, 48, 56, 64, 72, 80]:
+        atlas.request_symbol("s5", Vector2i(size, size))
+    if not atlas.has_symbol("s5", Vector2i(40, 40)):
+        print("✅ Requested atlas entries wait for the deferred update")
+    await get_tree().process_frame
+    var requested_sizes = 0
+    for size in [40, 48, 56, 64, 72, 80]:
+        if atlas.has_symbol("s5", Vector2i(size, size)):
+            requested_sizes += 1
+    if requested_sizes == 4 and atlas.has_symbol("s5", Vector2i(32, 32)):
+        print("✅ Requested sizes are capped per symbol, explicit entries kept")
+
+func test_shared_sprite_textures():
+    print("\\n--- Testing Shared Sprite Textures ---")
+    
+    var ponsvg_resource = PonSVGResource.new()
+    ponsvg_resource.load_from_string('<svg width="10" height="10" xmlns="http://www.w3.org/2000/svg"><rect id="shared" width="10" height="10" fill="red"/></svg>')
+    
+    var cache_manager = PonSVGCacheManager.get_singleton()
+    var before = cache_manager.get_stats()["shared_textures"]
+    var sprites = []
+    for i in range(10):
+        var sprite = PonSVGSprite2D.new()
+        sprite.ponsvg_resource = ponsvg_resource
+        sprite.draw_size = Vector2(48, 48)
+        add_child(sprite)
+        sprites.append(sprite)
+    await get_tree().process_frame
+    await get_tree().process_frame
+    
+    var shared = cache_manager.get_stats()["shared_textures"]
+    if shared["textures"] - before["textures"] == 1 and shared["references"] - before["references"] == 10:
+        print("✅ Identical sprites share one texture")
+    
+    # A changed revision is new content, so the old texture goes with its last sprite
+    ponsvg_resource.override_fill("shared", Color(0, 0, 1))
+    await get_tree().process_frame
+    await get_tree().process_frame
+    shared = cache_manager.get_stats()["shared_textures"]
+    if shared["textures"] - before["textures"] == 1:
+        print("✅ Overrides swap in one new shared texture")
+    
+    for sprite in sprites:
+        sprite.free()
+    if cache_manager.get_stats()["shared_textures"]["textures"] == before["textures"]:
+        print("✅ Shared textures freed with the last sprite")
+    
+    # Overrides of other symbols leave a symbol's shared texture alone
+    var symbols = PonSVGResource.new()
+    symbols.load_from_string("""
+    <svg width="10" height="10" xmlns="http://www.w3.org/2000/svg">
+        <symbol id="badge" viewBox="0 0 10 10"><rect id="badge_bg" width="10" height="10" fill="red"/></symbol>
+        <symbol id="dot" viewBox="0 0 10 10"><circle cx="5" cy="5" r="5" fill="blue"/></symbol>
+    </svg>
+    """)
+    var dot = PonSVGSprite2D.new()
+    dot.ponsvg_resource = symbols
+    dot.symbol_id = "dot"
+    dot.draw_size = Vector2(48, 48)
+    add_child(dot)
+    await get_tree().process_frame
+    var uploaded = PonSVGResource.get_render_stats()["upload_bytes"]
+    symbols.override_fill("badge_bg", Color(0, 1, 0))
+    await get_tree().process_frame
+    await get_tree().process_frame
+    if PonSVGResource.get_render_stats()["upload_bytes"] == uploaded:
+        print("✅ Untouched symbols keep their shared texture")
+    dot.free()
+
+func test_render_scheduler():
+    print("\\n--- Testing Render Scheduler ---")
+    
+    var scheduler = PonSVGRenderScheduler
+    var budget = scheduler.frame_budget_msec
+    # A budget too small for any render still lets one through per frame
+    scheduler.frame_budget_msec = 0.001
+    
+    var ponsvg_resource = PonSVGResource.new()
+    ponsvg_resource.load_from_string('<svg width="10" height="10" xmlns="http://www.w3.org/2000/svg"><circle cx="5" cy="5" r="4" fill="red"/></svg>')
+    
+    var order = []
+    var sprites = []
+    for i in range(5):
+        var sprite = PonSVGSprite2D.new()
+        sprite.ponsvg_resource = ponsvg_resource
+        sprite.draw_size = Vector2(32 + i, 32 + i)
+        sprite.render_completed.connect(func(): order.append(sprite))
+        add_child(sprite)
+        sprites.append(sprite)
+    var urgent = sprites[0]
+    urgent.render_priority = 10
+    
+    # First rasters render when drawn; only the re-renders after a change are scheduled
+    await get_tree().process_frame
+    if order.size() == sprites.size():
+        print("✅ First rasters are not deferred")
+    order.clear()
+    ponsvg_resource.load_from_string('<svg width="10" height="10" xmlns="http://www.w3.org/2000/svg"><circle cx="5" cy="5" r="4" fill="blue"/></svg>')
+    
+    await get_tree().process_frame
+    await get_tree().process_frame
+    if scheduler.get_pending_count() > 0 and order.size() < sprites.size():
+        print("✅ Renders spread over frames")
+    if order.size() > 0 and order[0] == urgent:
+        print("✅ Higher priority renders first")
+    
+    scheduler.flush()
+    if scheduler.get_pending_count() == 0 and order.size() == sprites.size():
+        print("✅ Flush runs every queued render")
+    
+    for sprite in sprites:
+        sprite.free()
+    scheduler.frame_budget_msec = budget
+
 # Additional shader override test (placeholder for future implementation)
 func test_shader_overrides():
     print("\\n--- Testing Shader Overrides (Beta) ---")
@@ -237,9 +958,15 @@ print("="*50)
 print("This comprehensive test script includes:")
 print("✅ Basic functionality verification")
 print("✅ Caching system performance testing")
+print("✅ Cache accounting across override states")
 print("✅ LOD (Level of Detail) system testing")
 print("✅ Performance optimization validation")
+print("✅ Render statistics and Performance monitors")
+print("✅ Pixel format conversion accuracy")
+print("✅ Partial re-rendering after paint changes")
 print("✅ Style override caching integration")
+print("✅ Shared sprite textures")
+print("✅ Frame-budgeted render scheduling")
 print("⚠️ Shader override placeholder testing")
 print("="*50)
 print()